@@ -0,0 +1,428 @@
+# gausskit/backends.py
+"""
+Execution backends: one interface for getting a Gaussian .com run somewhere.
+
+Every backend implements
+
+    submit(com, nproc, partition, time_limit, mem=None) -> job ID (str) or None
+    status(jobid)                                       -> state string
+    bulk_status(jobids)                                 -> {jobid: state}
+    cancel(jobid)                                       -> bool
+    count_jobs(partition=None)                          -> active jobs of this user
+
+States are SLURM-style: PENDING, RUNNING, COMPLETED, FAILED, TIMEOUT,
+CANCELLED, UNKNOWN.  `submit` returns None when no job ID came back (try
+another partition) and raises `SubmissionError` when the submission was
+rejected outright.
+
+Built-in backends (see `make_backend`):
+  - sbatch        : renders a SLURM batch script and submits it with sbatch
+  - hgbatch, gsub : the site wrappers (`Hgbatch`/`gsub -n -p -t file.com`)
+  - local         : core-aware pool on this machine running `g16` (or any
+                    stand-in command, e.g. `python -m gausskit.fakeslurm g16`)
+"""
+
+import contextlib
+import datetime
+import getpass
+import inspect
+import os
+import re
+import shlex
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+
+from .partition import parse_slurm_time
+from .squeue_cache import SharedSqueueCache, DEFAULT_TTL
+from .utils import GDV_MODULES
+
+STATES = ("PENDING", "RUNNING", "COMPLETED", "FAILED", "TIMEOUT", "CANCELLED", "UNKNOWN")
+ACTIVE_STATES = ("PENDING", "RUNNING")
+TERMINAL_STATES = ("COMPLETED", "FAILED", "TIMEOUT", "CANCELLED")
+
+
+class SubmissionError(RuntimeError):
+    """The backend rejected a submission (bad arguments, QOS/limit errors, …)."""
+
+
+def normalize_state(text):
+    """Map raw squeue/sacct states ('CANCELLED by 123', 'PD', 'NODE_FAIL') to STATES."""
+    s = (text or "").strip().upper().split()[0] if (text or "").strip() else ""
+    s = s.rstrip("+")
+    short = {"PD": "PENDING", "R": "RUNNING", "CG": "RUNNING", "CF": "PENDING",
+             "CD": "COMPLETED", "F": "FAILED", "TO": "TIMEOUT", "CA": "CANCELLED"}
+    s = short.get(s, s)
+    if s in ("COMPLETING", "CONFIGURING", "SUSPENDED", "REQUEUED", "RESIZING"):
+        return "RUNNING"
+    if s in ("NODE_FAIL", "OUT_OF_MEMORY", "BOOT_FAIL", "DEADLINE", "PREEMPTED"):
+        return "FAILED"
+    return s if s in STATES else "UNKNOWN"
+
+
+BACKENDS = {}
+
+
+def register_backend(name):
+    """Decorator: register a backend class under `name` for `make_backend`."""
+    def deco(cls):
+        BACKENDS[name] = cls
+        cls.name = name
+        return cls
+    return deco
+
+
+def make_backend(name, **opts):
+    """
+    Build a backend by name.  Unknown names are treated as a local command
+    (so `submit_cmd="g16"` keeps meaning "run g16 directly").
+    Options a backend does not take are ignored.
+    """
+    key = (name or "hgbatch").lower()
+    if key in BACKENDS:
+        cls = BACKENDS[key]
+    else:
+        cls = BACKENDS["local"]
+        opts.setdefault("command", name)
+    accepted = inspect.signature(cls.__init__).parameters
+    return cls(**{k: v for k, v in opts.items() if k in accepted and v is not None})
+
+
+class Backend:
+    """Base class; subclasses implement submit/bulk_status/cancel/count_jobs."""
+
+    name = "base"
+
+    def submit(self, com, nproc=56, partition="medium", time_limit="23:50:00", mem=None):
+        raise NotImplementedError
+
+    def status(self, jobid):
+        return self.bulk_status([jobid]).get(str(jobid), "UNKNOWN")
+
+    def bulk_status(self, jobids):
+        raise NotImplementedError
+
+    def cancel(self, jobid):
+        raise NotImplementedError
+
+    def count_jobs(self, partition=None):
+        raise NotImplementedError
+
+
+# ── SLURM ──────────────────────────────────────────────────────────────────────
+
+class SlurmBackend(Backend):
+    """Status/cancel/count through squeue, sacct and scancel."""
+
+    def __init__(self, user=None, squeue_ttl=None):
+        self.user = user or getpass.getuser()
+        # squeue -u $USER shared with every other scheduler of this user
+        self.queue = SharedSqueueCache(self.user, ttl=DEFAULT_TTL if squeue_ttl is None else squeue_ttl)
+
+    def _run(self, cmd, **kw):
+        try:
+            return subprocess.run(cmd, capture_output=True, text=True, **kw)
+        except OSError as e:
+            raise SubmissionError(f"Could not run {cmd[0]}: {e}")
+
+    def bulk_status(self, jobids):
+        ids = [str(j) for j in jobids if j]
+        if not ids:
+            return {}
+        out = {j: "UNKNOWN" for j in ids}
+        # live jobs from the shared squeue cache, finished ones from sacct
+        for jid, st in self.queue.states(ids).items():
+            out[jid] = normalize_state(st)
+        rest = [j for j in ids if out[j] == "UNKNOWN"]
+        if rest:
+            res = self._run(["sacct", "-n", "-P", "-X", "-j", ",".join(rest), "-o", "JobID,State"])
+            for line in res.stdout.splitlines():
+                jid, _, st = line.strip().partition("|")
+                if jid in out:
+                    out[jid] = normalize_state(st)
+        return out
+
+    def cancel(self, jobid):
+        res = self._run(["scancel", str(jobid)])
+        if res.returncode == 0:
+            self.queue.invalidate()
+        return res.returncode == 0
+
+    def count_jobs(self, partition=None):
+        return self.queue.count(partition)
+
+    def _check(self, result, cmd):
+        """Raise SubmissionError on a failed submission, else return the job ID (or None)."""
+        if result.returncode != 0:
+            raise SubmissionError(f"{' '.join(cmd)} failed:\n{result.stderr.strip()}")
+        err = result.stderr.lower()
+        if "error" in err or "qos" in err or "limit" in err:
+            raise SubmissionError(f"Submission error from {cmd[0]}:\n{result.stderr.strip()}")
+        m = re.search(r"\b(\d+)\b", result.stdout)
+        jobid = m.group(1) if m else None
+        if not jobid or jobid in {"0", "00"}:
+            return None
+        self.queue.invalidate()     # quota counts must include the new job
+        return jobid
+
+
+def render_sbatch_script(com_file, nproc=56, partition="medium", time_limit="23:50:00",
+                         mem=115200, gdv="gdvj30+"):
+    """Text of the SLURM batch script that runs `com_file` with `gdv`."""
+    if gdv.lower() not in GDV_MODULES:
+        raise ValueError(f"Invalid GDV version: {gdv}")
+    filename = os.path.splitext(com_file)[0]
+    # Gaussian gets ~80% of the SLURM allocation (115200 MB → 92GB)
+    gauss_mem = max(int(mem * 0.8 / 1000), 1)
+    now = datetime.datetime.now()
+    return f"""#!/bin/bash
+#SBATCH --mail-user=$USER@ucmerced.edu
+#SBATCH --mail-type=ALL
+#SBATCH -J {filename}
+#SBATCH -o {filename}.qlog
+#SBATCH -p {partition}
+#SBATCH --time={time_limit}
+#SBATCH --mem={mem}
+#SBATCH --nodes=1
+#SBATCH --ntasks={nproc}
+
+module load {GDV_MODULES[gdv.lower()]}
+
+export My_Scratch=/scratch/$USER/$SLURM_JOBID
+export GAUSS_SCRDIR=$My_Scratch
+mkdir -p $My_Scratch
+
+gdv -m={gauss_mem}GB -p={nproc} < {com_file} >& {filename}.log
+
+rm -rf $My_Scratch
+
+# Submitted at {now.strftime('%Y-%m-%d %H:%M:%S')}
+"""
+
+
+@register_backend("sbatch")
+class SbatchBackend(SlurmBackend):
+    """Plain sbatch with a generated batch script (piped on stdin, kept as <name>.sbatch)."""
+
+    def __init__(self, gdv="gdvj30+", mem=115200, user=None, squeue_ttl=None):
+        super().__init__(user, squeue_ttl)
+        self.gdv = gdv
+        self.mem = mem
+
+    def submit(self, com, nproc=56, partition="medium", time_limit="23:50:00", mem=None):
+        filename = os.path.splitext(com)[0]
+        script = render_sbatch_script(com, nproc, partition, time_limit, mem or self.mem, self.gdv)
+        # keep a copy as <name>.sbatch: unique temp file + atomic rename, so
+        # concurrent submissions never see each other's half-written script
+        fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(filename)}.", suffix=".sbatch.tmp",
+                                   dir=os.path.dirname(os.path.abspath(com)))
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(script)
+            os.replace(tmp, f"{filename}.sbatch")
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+            raise
+        # sbatch reads the script from stdin: no chmod, no shared Gscript.sh
+        cmd = ["sbatch", "--parsable"]
+        return self._check(self._run(cmd, input=script), cmd)
+
+
+@register_backend("hgbatch")
+class HgbatchBackend(SlurmBackend):
+    """Site wrapper: `Hgbatch -n N -p PART -t TIME --gdv GDV file.com`."""
+
+    command = "Hgbatch"
+
+    def __init__(self, gdv="gdvj30+", user=None, squeue_ttl=None):
+        super().__init__(user, squeue_ttl)
+        self.gdv = gdv
+
+    def _cmd(self, com, nproc, partition, time_limit):
+        return [self.command, "-n", str(nproc), "-p", partition, "-t", time_limit,
+                "--gdv", self.gdv, com]
+
+    def submit(self, com, nproc=56, partition="medium", time_limit="23:50:00", mem=None):
+        cmd = self._cmd(com, nproc, partition, time_limit)
+        return self._check(self._run(cmd), cmd)
+
+
+@register_backend("gsub")
+class GsubBackend(HgbatchBackend):
+    """Site wrapper: `gsub -n N -p PART -t TIME file.com`."""
+
+    command = "gsub"
+
+    def _cmd(self, com, nproc, partition, time_limit):
+        return [self.command, "-n", str(nproc), "-p", partition, "-t", time_limit, com]
+
+
+# ── local workstation ─────────────────────────────────────────────────────────
+
+def _signal_group(proc, sig):
+    """Signal the job's whole process group (g16 forks its link executables)."""
+    try:
+        os.killpg(proc.pid, sig)
+    except OSError:
+        with contextlib.suppress(OSError):
+            proc.send_signal(sig)
+
+
+class _LocalJob:
+    def __init__(self, jobid, com, nproc, mem):
+        self.id = jobid
+        self.com = com
+        self.nproc = nproc
+        self.mem = mem
+        self.state = "PENDING"
+        self.proc = None
+        self.submitted = time.time()
+        self.start = self.end = None
+        self.limit = None           # seconds
+
+
+@register_backend("local")
+class LocalBackend(Backend):
+    """
+    Run jobs on this machine without a batch system.
+
+    Jobs are queued and started as soon as enough of `max_cores` are free
+    (first fit, so small jobs backfill around a large one waiting for
+    cores).  Each job runs `command < name.com > name.log` in the .com's
+    directory with GAUSS_PDEF/GAUSS_MDEF set; `{nproc}`, `{mem}`, `{com}`
+    and `{log}` in `command` are substituted, and when `{com}` is used the
+    input is not redirected on stdin.
+
+    Partitions and time limits are accepted for interface compatibility;
+    the time limit is enforced (the job ends as TIMEOUT).
+    """
+
+    def __init__(self, command="g16", max_cores=None, poll=0.2):
+        self.command = command
+        self.max_cores = max_cores or os.cpu_count() or 1
+        self.poll = poll
+        self._jobs = {}
+        self._order = []
+        self._next_id = 1
+        self._cond = threading.Condition()
+        self._thread = None
+
+    # -- dispatcher --------------------------------------------------------
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="gausskit-local", daemon=True)
+            self._thread.start()
+
+    def _used_cores(self):
+        return sum(j.nproc for j in self._jobs.values() if j.state == "RUNNING")
+
+    def _launch(self, job):
+        com = job.com
+        workdir = os.path.dirname(com)
+        log = os.path.splitext(com)[0] + ".log"
+        fields = {"nproc": job.nproc, "mem": f"{job.mem}MB" if job.mem else "", "com": com, "log": log}
+        argv = shlex.split(self.command.format(**fields))
+        env = dict(os.environ, GAUSS_PDEF=str(job.nproc))
+        if job.mem:
+            env["GAUSS_MDEF"] = f"{job.mem}MB"
+        stdin = None if "{com}" in self.command else open(com, "rb")
+        try:
+            with open(log, "wb") as out:
+                job.proc = subprocess.Popen(argv, cwd=workdir, env=env, stdin=stdin or subprocess.DEVNULL,
+                                            stdout=out, stderr=subprocess.STDOUT,
+                                            start_new_session=True)
+        except OSError as e:
+            print(f"❌ Could not start {argv[0]} for {job.com}: {e}")
+            job.state, job.end = "FAILED", time.time()
+            return
+        finally:
+            if stdin:
+                stdin.close()
+        job.state, job.start = "RUNNING", time.time()
+
+    def _step(self):
+        """Reap finished jobs, kill overdue ones, start queued ones that fit."""
+        now = time.time()
+        for job in self._jobs.values():
+            if job.state != "RUNNING":
+                continue
+            rc = job.proc.poll()
+            if rc is None:
+                if job.limit and now - job.start > job.limit:
+                    _signal_group(job.proc, signal.SIGKILL)
+                    job.proc.wait()
+                    job.state, job.end = "TIMEOUT", now
+                continue
+            job.state, job.end = ("COMPLETED" if rc == 0 else "FAILED"), now
+        free = self.max_cores - self._used_cores()
+        for jid in self._order:
+            job = self._jobs[jid]
+            if job.state == "PENDING" and job.nproc <= free:
+                self._launch(job)
+                if job.state == "RUNNING":
+                    free -= job.nproc
+        self._order = [j for j in self._order if self._jobs[j].state == "PENDING"]
+
+    def _loop(self):
+        with self._cond:
+            while True:
+                self._step()
+                if not any(j.state in ACTIVE_STATES for j in self._jobs.values()):
+                    self._thread = None
+                    return
+                self._cond.wait(self.poll)
+
+    # -- interface ---------------------------------------------------------
+
+    def submit(self, com, nproc=56, partition=None, time_limit=None, mem=None):
+        if not os.path.exists(com):
+            raise SubmissionError(f"Missing input file: {com}")
+        with self._cond:
+            jobid = str(self._next_id)
+            self._next_id += 1
+            # resolved now: the dispatcher thread may run after the caller changed directory
+            job = _LocalJob(jobid, os.path.abspath(com), max(1, min(int(nproc), self.max_cores)), mem)
+            job.limit = parse_slurm_time(time_limit) if time_limit else None
+            self._jobs[jobid] = job
+            self._order.append(jobid)
+            self._ensure_thread()
+            self._cond.notify()
+        return jobid
+
+    def bulk_status(self, jobids):
+        with self._cond:
+            return {str(j): (self._jobs[str(j)].state if str(j) in self._jobs else "UNKNOWN")
+                    for j in jobids}
+
+    def cancel(self, jobid):
+        with self._cond:
+            job = self._jobs.get(str(jobid))
+            if job is None or job.state not in ACTIVE_STATES:
+                return False
+            if job.state == "RUNNING":
+                _signal_group(job.proc, signal.SIGTERM)
+                try:
+                    job.proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    _signal_group(job.proc, signal.SIGKILL)
+            job.state, job.end = "CANCELLED", time.time()
+            self._cond.notify()
+            return True
+
+    def count_jobs(self, partition=None):
+        with self._cond:
+            return sum(1 for j in self._jobs.values() if j.state in ACTIVE_STATES)
+
+    def wait(self, timeout=None):
+        """Block until every local job has finished (or `timeout` seconds)."""
+        t0 = time.time()
+        while self.count_jobs():
+            if timeout is not None and time.time() - t0 > timeout:
+                return False
+            time.sleep(self.poll)
+        return True
+
@@ -0,0 +1,291 @@
+# gausskit/checkpoints.py
+"""
+Checkpoint lifecycle: convert, compress and prune .chk files nobody needs.
+
+Benchmark, scan and distort campaigns leave one .chk per job, while chains
+only ever read a few of them again.  `plan_checkpoints()` builds the
+workflow graph of every .com under the given directories:
+
+  - a job *writes* its %Chk
+  - a job *reads* its %OldChk, its own %Chk when the route asks for it
+    (guess=read, geom=check/allcheck, chkbasis, restart, readfc), and any
+    checkpoint named on a line of its own in the input body (the final
+    state of a Franck–Condon job)
+
+and marks each checkpoint:
+
+  in use    its writer has not finished (no log, or no termination line yet)
+  needed    its writer failed, or a reader has not finished normally
+            (pending, running, failed — a failed job may still be fixed
+            and resubmitted, and the fixes read its own checkpoint)
+  done      written by a job that finished, and every reader finished
+            normally → formchk, compress, delete the .chk
+  orphan    no input mentions it (left alone unless orphans=True)
+
+`run_lifecycle()` runs formchk (or any stand-in command with {chk} and
+{fchk}) in parallel, gzips the .fchk — or the .chk itself when formchk is
+unavailable — with at most `io_limit` compression streams at a time, deletes
+the .chk and reports the space reclaimed.
+
+    gausskit chk [dirs…] [-r] [--dry-run] [--formchk CMD] [--jobs N] [--io N]
+"""
+
+import argparse
+import gzip
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .utils import fmt_bytes
+
+FORMCHK = "formchk {chk} {fchk}"
+
+# route keywords that make a job read its own %Chk
+READS_OWN_CHK = re.compile(
+    r"guess\s*=\s*\(?[^)\s]*read|geom\s*=\s*\(?[^)\s]*check|\bchkbasis\b|\brestart\b|\breadfc\b", re.I)
+
+
+def resolve_chk(directory, name):
+    """Absolute .chk path for a %Chk/%OldChk value given relative to `directory`."""
+    path = os.path.normpath(os.path.join(directory, os.path.expanduser(name.strip().strip('"'))))
+    return path if path.lower().endswith(".chk") else path + ".chk"
+
+
+def parse_chk_refs(com):
+    """(writes, reads): sets of absolute .chk paths of one input, over all --Link1-- steps."""
+    d = os.path.dirname(os.path.abspath(com))
+    writes, reads = set(), set()
+    with open(com, "r", errors="ignore") as f:
+        lines = f.read().splitlines()
+    chk, route, in_route = None, [], False
+    for L in lines + ["--link1--"]:
+        s = L.strip()
+        low = s.lower()
+        if low == "--link1--":
+            if chk and READS_OWN_CHK.search(" ".join(route)):
+                reads.add(chk)
+            chk, route, in_route = None, [], False
+            continue
+        if low.startswith("%chk="):
+            chk = resolve_chk(d, s.split("=", 1)[1])
+            writes.add(chk)
+        elif low.startswith("%oldchk="):
+            reads.add(resolve_chk(d, s.split("=", 1)[1]))
+        elif s.startswith("#") and not route:
+            in_route = True
+            route.append(s)
+        elif in_route:
+            if s:
+                route.append(s)
+            else:
+                in_route = False
+        elif low.endswith(".chk") and len(s.split()) == 1:
+            reads.add(resolve_chk(d, s))
+    return writes, reads
+
+
+def job_state(base):
+    """'ok' / 'failed' / 'running' (log without termination) / 'pending' (no log)."""
+    try:
+        with open(f"{base}.log", "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - 4096, 0))
+            tail = f.read().decode(errors="ignore")
+    except OSError:
+        return "pending"
+    n, e = tail.rfind("Normal termination"), tail.rfind("Error termination")
+    if n < 0 and e < 0:
+        return "running"
+    return "ok" if n > e else "failed"
+
+
+class CheckpointInfo:
+    def __init__(self, path):
+        self.path = path
+        self.writers = []       # input bases
+        self.readers = []
+        self.status = None      # in use / needed / done / orphan
+        self.reason = ""
+        self.size = 0
+        self.result = None      # what run_lifecycle did
+        self.freed = 0
+
+
+def _inputs(dirs, recursive):
+    for d in dirs:
+        if os.path.isfile(d):
+            yield os.path.abspath(d)
+            continue
+        if recursive:
+            for root, _, files in os.walk(d):
+                for f in files:
+                    if f.endswith(".com"):
+                        yield os.path.abspath(os.path.join(root, f))
+        else:
+            for f in os.listdir(d):
+                if f.endswith(".com"):
+                    yield os.path.abspath(os.path.join(d, f))
+
+
+def _checkpoints_on_disk(dirs, recursive):
+    for d in dirs:
+        d = os.path.dirname(d) if os.path.isfile(d) else d
+        walker = os.walk(d) if recursive else [(d, None, os.listdir(d))]
+        for root, _, files in walker:
+            for f in files:
+                if f.lower().endswith(".chk"):
+                    yield os.path.abspath(os.path.join(root, f))
+
+
+def plan_checkpoints(dirs=(".",), recursive=False, orphans=False):
+    """{chk path: CheckpointInfo} for every checkpoint that exists on disk under `dirs`."""
+    graph = {}
+    states = {}
+    for com in _inputs(dirs, recursive):
+        base = com[:-4]
+        try:
+            writes, reads = parse_chk_refs(com)
+        except OSError:
+            continue
+        states[base] = job_state(base)
+        for p in writes:
+            graph.setdefault(p, CheckpointInfo(p)).writers.append(base)
+        for p in reads:
+            graph.setdefault(p, CheckpointInfo(p)).readers.append(base)
+
+    plan = {}
+    for path in sorted(set(_checkpoints_on_disk(dirs, recursive))):
+        info = graph.get(path) or CheckpointInfo(path)
+        info.size = os.path.getsize(path)
+        busy = [w for w in info.writers if states[w] in ("pending", "running")]
+        broken = [w for w in info.writers if states[w] == "failed"]
+        waiting = [r for r in info.readers if states[r] != "ok"]
+        if not info.writers and not info.readers:
+            info.status, info.reason = ("done", "orphan") if orphans else ("orphan", "no input refers to it")
+        elif busy:
+            info.status, info.reason = "in use", f"written by {_names(busy)} ({states[busy[0]]})"
+        elif broken:
+            info.status = "needed"
+            info.reason = f"writer failed: {_names(broken)}; may be fixed and resubmitted"
+        elif waiting:
+            info.status, info.reason = "needed", f"read by {_names(waiting)} ({states[waiting[0]]})"
+        else:
+            info.status = "done"
+            info.reason = f"readers done: {_names(info.readers)}" if info.readers else "no readers"
+        plan[path] = info
+    return plan
+
+
+def _names(bases, limit=3):
+    names = [os.path.basename(b) for b in bases]
+    more = f" +{len(names) - limit}" if len(names) > limit else ""
+    return ", ".join(names[:limit]) + more
+
+
+def _gzip(src, dst, io_sem):
+    with io_sem:
+        tmp = dst + ".part"
+        with open(src, "rb") as fi, gzip.open(tmp, "wb", compresslevel=6) as fo:
+            shutil.copyfileobj(fi, fo, 1 << 20)
+        os.replace(tmp, dst)
+    return os.path.getsize(dst)
+
+
+def _process(info, formchk, io_sem, keep_data):
+    chk = info.path
+    stem = chk[:-4]
+    fchk = stem + ".fchk"
+    kept = 0
+    try:
+        if keep_data:
+            converted = os.path.exists(fchk)
+            if not converted and formchk:
+                cmd = shlex.split(formchk.format(chk=shlex.quote(chk), fchk=shlex.quote(fchk)))
+                try:
+                    res = subprocess.run(cmd, capture_output=True, text=True, cwd=os.path.dirname(chk))
+                    converted = res.returncode == 0 and os.path.exists(fchk)
+                except OSError:
+                    converted = False
+            if converted:
+                kept = _gzip(fchk, fchk + ".gz", io_sem)
+                os.remove(fchk)
+                info.result = f"→ {os.path.basename(fchk)}.gz"
+            else:
+                # no formchk: keep the binary checkpoint, compressed
+                kept = _gzip(chk, chk + ".gz", io_sem)
+                info.result = f"→ {os.path.basename(chk)}.gz (no formchk)"
+        else:
+            info.result = "deleted"
+        with io_sem:
+            os.remove(chk)
+        info.freed = info.size - kept
+    except OSError as e:
+        info.result = f"error: {e}"
+        info.freed = 0
+    return info
+
+
+def run_lifecycle(plan, formchk=FORMCHK, jobs=None, io_limit=2, keep_data=True, dry_run=False):
+    """
+    Process every checkpoint marked 'done' in `plan`: formchk with up to
+    `jobs` parallel workers, gzip under an `io_limit` semaphore, delete the
+    .chk.  Returns the total bytes reclaimed.
+    """
+    todo = [i for i in plan.values() if i.status == "done"]
+    if dry_run:
+        for i in todo:
+            i.result = "would convert/compress/delete" if keep_data else "would delete"
+        return 0
+    io_sem = threading.BoundedSemaphore(max(int(io_limit), 1))
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 4) as ex:
+        list(ex.map(lambda i: _process(i, formchk, io_sem, keep_data), todo))
+    return sum(i.freed for i in todo)
+
+
+def print_plan(plan, root="."):
+    if not plan:
+        print("ℹ️ No checkpoint files found.")
+        return
+    icon = {"done": "🗜️", "needed": "🔗", "in use": "⏳", "orphan": "❔"}
+    for info in plan.values():
+        what = info.result or info.reason
+        print(f"{icon.get(info.status, ' ')} {os.path.relpath(info.path, root):<40} "
+              f"{fmt_bytes(info.size):>10}  {info.status:<7} {what}")
+
+
+def chk_cli(argv=None):
+    ap = argparse.ArgumentParser(prog="gausskit chk",
+                                 description="Convert, compress and delete checkpoints no downstream job needs.")
+    ap.add_argument("dirs", nargs="*", default=["."], help="directories (or .com files) [default: .]")
+    ap.add_argument("-r", "--recursive", action="store_true")
+    ap.add_argument("--dry-run", action="store_true", help="only show what would happen")
+    ap.add_argument("--formchk", default=FORMCHK, help=f"conversion command with {{chk}} and {{fchk}} [{FORMCHK}]")
+    ap.add_argument("--no-formchk", action="store_true", help="skip conversion; gzip the .chk itself")
+    ap.add_argument("--delete", action="store_true", help="delete without keeping a compressed copy")
+    ap.add_argument("--orphans", action="store_true", help="also process checkpoints no input refers to")
+    ap.add_argument("--jobs", type=int, default=None, help="parallel formchk runs [CPU count]")
+    ap.add_argument("--io", type=int, default=2, help="concurrent compress/delete streams [2]")
+    args = ap.parse_args(argv)
+
+    plan = plan_checkpoints(args.dirs, args.recursive, args.orphans)
+    done = [i for i in plan.values() if i.status == "done"]
+    freed = run_lifecycle(plan, None if args.no_formchk else args.formchk, args.jobs, args.io,
+                          keep_data=not args.delete, dry_run=args.dry_run)
+    print_plan(plan, os.path.commonpath([os.path.abspath(d) for d in args.dirs]) if args.dirs else ".")
+    total = sum(i.size for i in plan.values())
+    if args.dry_run:
+        print(f"📋 {len(done)} of {len(plan)} checkpoint(s) can go "
+              f"({fmt_bytes(sum(i.size for i in done))} of {fmt_bytes(total)}).")
+    else:
+        errors = sum(1 for i in done if i.result and i.result.startswith("error"))
+        print(f"✅ Reclaimed {fmt_bytes(freed)} from {len(done) - errors} checkpoint(s) "
+              f"({fmt_bytes(total)} before)" + (f"; {errors} error(s)" if errors else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(chk_cli())
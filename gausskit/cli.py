@@ -58,9 +58,21 @@ Subcommands:
   input, generate, 2   Ground‐state input generator
   fc, franck, 3        Franck–Condon input generator
   schedule, 4          Job Scheduler
+  schedule stats       Queue wait / runtime / chain latency percentiles
+  submit, status,      Hand jobs to / query / cancel / follow the
+  cancel, attach       per-user scheduler daemon
+  daemon start|stop    Start or stop the scheduler daemon
+  simulate             Replay scheduler policies on a model cluster
+  chk                  formchk, compress and prune unneeded checkpoints
+  lint                 Check .com inputs for mistakes before submitting
+  triage               Classify failed logs, write a report, fix inputs in bulk
+  fixes                Success rate of each error fix applied so far
+  rewrite              Add/remove route keywords or Link 0 lines in many inputs
   benchmark, 5         Benchmark input generator
   analyze, 6           Log Analyzer CLI
   vibronic, 7          Vibronic summary & plotting
+  vibronic batch       Render spectra of many FC logs in parallel (no prompts)
+  vibronic fit         Fit FC spectra to an experimental curve and rank them
 
 No args: interactive menu.
 """.strip())
@@ -330,9 +342,40 @@ def main():
             return
 
         if cmd in ("schedule", "scheduler", "4"):
+            if len(sys.argv) > 2 and sys.argv[2] == "stats":
+                from .metrics import stats_cli
+                return stats_cli(sys.argv[3:])
             run_job_scheduler()
             return
 
+        if cmd == "rewrite":
+            from .comfile import rewrite_cli
+            return rewrite_cli(sys.argv[2:])
+
+        if cmd == "fixes":
+            from .fixdb import fixes_cli
+            return fixes_cli(sys.argv[2:])
+
+        if cmd == "triage":
+            from .triage import triage_cli
+            return triage_cli(sys.argv[2:])
+
+        if cmd == "lint":
+            from .lint import lint_cli
+            return lint_cli(sys.argv[2:])
+
+        if cmd in ("chk", "checkpoints"):
+            from .checkpoints import chk_cli
+            return chk_cli(sys.argv[2:])
+
+        if cmd in ("simulate", "sim"):
+            from .simulate import simulate_cli
+            return simulate_cli(sys.argv[2:])
+
+        if cmd in ("submit", "status", "cancel", "attach", "daemon"):
+            from .daemon import client_main
+            return client_main(cmd, sys.argv[2:])
+
         if cmd in ("benchmark", "5"):
             create_benchmark_inputs()
             return
@@ -343,6 +386,12 @@ def main():
             return
 
         if cmd in ("vibronic", "7"):
+            if len(sys.argv) > 2 and sys.argv[2] == "batch":
+                from .vibronic_batch import batch_cli
+                return batch_cli(sys.argv[3:])
+            if len(sys.argv) > 2 and sys.argv[2] == "fit":
+                from .specfit import fit_cli
+                return fit_cli(sys.argv[3:])
             # remove the subcommand token so vib_main() sees only its flags/logfiles
             sys.argv.pop(1)
             from gausskit.vibronic import main as vib_main
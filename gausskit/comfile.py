@@ -0,0 +1,710 @@
+# gausskit/comfile.py
+"""
+Parsed model of Gaussian inputs (.com / .gjf).
+
+    doc = read_input("h2o.com")
+    step = doc.steps[0]                 # one per --Link1-- section
+    step.link0.get("chk")               # %Chk value
+    step.route.add("opt=(calcfc,maxcycle=200)")
+    step.route.remove("freq")
+    step.molecule.charge, step.molecule.mult
+    step.variables.values()             # {'R1': 0.96, 'A1': 104.5}
+    doc.write()                         # only edited sections are re-rendered
+
+Every step is a list of sections in file order — link0, route, title,
+molecule (charge/multiplicity + atoms), variables, modredundant, basis,
+ecp, include (@file), other, and the blank runs between them — each
+keeping its original lines, so `parse_input(text).dumps() == text` for any
+input and an edit only touches the section it changes.
+
+The route is a keyword tree: `opt=(ts,calcfc,maxcycle=100)` is keyword
+`opt` with options `ts`, `calcfc`, `maxcycle=100`.  `Route.add()` merges
+options into an existing keyword (replacing the value of an option given
+again, and dropping options it excludes, e.g. calcfc ↔ calcall);
+`Route.remove("opt=modredundant")` removes one option,
+`Route.remove("freq")` the whole keyword.  Works for #, #P, #N and #T
+routes over any number of lines.
+
+`rewrite_inputs()` applies an edit function to many inputs on a thread
+pool and writes the changed ones atomically.
+
+    gausskit rewrite [files/dirs…] [-r] [--add KW] [--remove KW]
+                     [--link0 KEY=VALUE] [--dry-run] [--no-backup] [--jobs N]
+"""
+
+import argparse
+import difflib
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+_ROUTE_PREFIX = re.compile(r"^\s*(#[pnt]?)", re.I)
+_CM_RE = re.compile(r"^\s*[-+]?\d+\s+\d+(\s+[-+]?\d+\s+\d+)*\s*$")
+_MODRED_RE = re.compile(
+    r"^\s*(?:[BADLXO]\s+)?(?:(?:\d+|\*)\s+)*(?:\d+|\*)(?:\s+[FARBKSDH](?:\s+[-+]?[\d.]+)*)?\s*$", re.I)
+_VAR_RE = re.compile(r"^(\s*)([A-Za-z][\w.]*)(\s*=\s*|\s+)([-+]?(?:\d+\.?\d*|\.\d+)(?:[eEdD][-+]?\d+)?)(.*)$")
+_NUM = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+_CART_RE = re.compile(rf"^\s*(\S+)(?:\s+-?\d+)?\s+({_NUM})\s+({_NUM})\s+({_NUM})\s*$")
+
+# alternative spellings Gaussian accepts for the same keyword / option
+_ALIASES = {"frequency": "freq", "optimize": "opt", "geometry": "geom", "checkpoint": "check",
+            "allcheckpoint": "allcheck", "chk": "check", "allchk": "allcheck", "modred": "modredundant",
+            "maxcycles": "maxcycle", "integral": "int", "nproc": "nprocshared",
+            "ultrafinegrid": "ultrafine", "superfinegrid": "superfine", "finegrid": "fine",
+            "coarsegrid": "coarse", "sg1grid": "sg1"}
+
+# options of one keyword that cannot be combined: adding one drops the others
+_EXCLUSIVE = {
+    "opt": [{"calcfc", "calcall", "readfc", "rcfc", "calchffc", "readcartesianfc"},
+            {"cartesian", "redundant", "zmatrix", "gic"},
+            {"ts", "qst2", "qst3", "minimum"}],
+    "guess": [{"read", "huckel", "harris", "core", "indo", "am1"}],
+    "scf": [{"qc", "xqc", "yqc"}],
+    "int": [{"ultrafine", "superfine", "fine", "coarse", "sg1", "grid"}],
+    "geom": [{"check", "allcheck"}],
+}
+
+
+def _canon(name):
+    low = name.strip().lower()
+    return _ALIASES.get(low, low)
+
+
+def _split_top(text, sep=","):
+    """Split at `sep` outside parentheses."""
+    parts, depth, cur = [], 0, ""
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == sep and depth == 0:
+            parts.append(cur)
+            cur = ""
+        else:
+            cur += ch
+    parts.append(cur)
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _split_words(text):
+    """Route text → keyword tokens (whitespace outside parentheses; 'opt = (a, b)' kept whole)."""
+    text = re.sub(r"\s*=\s*", "=", text.strip())
+    text = re.sub(r"\(\s*", "(", re.sub(r"\s*\)", ")", text))
+    text = re.sub(r"\s*,\s*", ",", text)
+    words, depth, cur = [], 0, ""
+    for ch in text:
+        depth += (ch == "(") - (ch == ")")
+        if ch.isspace() and depth == 0:
+            if cur:
+                words.append(cur)
+            cur = ""
+        else:
+            cur += ch
+    if cur:
+        words.append(cur)
+    return words
+
+
+# ── route ───────────────────────────────────────────────────────────────────
+
+class Keyword:
+    """Route keyword or option: name, optional value, child options."""
+
+    def __init__(self, name, value=None, options=None, paren=False, sep="=", model=False):
+        self.name = name
+        self.value = value          # 'maxcycle=200' as an option; 'opt=ts' is keyword opt with option ts
+        self.options = options or []
+        self.paren = paren          # options were written in parentheses
+        self.sep = sep              # '=' in 'opt=(…)', '' in 'scf(…)' / 'iop(…)'
+        self.model = model          # method/basis token 'b3lyp/6-31g(d)'
+
+    @classmethod
+    def parse(cls, token):
+        token = token.strip()
+        if "/" in token.split("(")[0] and not token.lower().startswith("iop"):
+            return cls(token, model=True)
+        m = re.match(r"^([^=(]+)(?:(=?)\((.*)\)|=(.*))?$", token)
+        if not m:
+            return cls(token)
+        name, sep, inner, single = m.groups()
+        if inner is not None:
+            return cls(name, options=[cls._option(o) for o in _split_top(inner)], paren=True, sep=sep)
+        if single is not None:
+            return cls(name, options=[cls._option(single)])
+        return cls(name)
+
+    @classmethod
+    def _option(cls, text):
+        if "=" in text and not text.startswith("("):
+            name, value = text.split("=", 1)
+            if value.startswith("(") and value.endswith(")"):
+                return cls(name, options=[cls._option(o) for o in _split_top(value[1:-1])], paren=True)
+            return cls(name, value)
+        return cls.parse(text)
+
+    @property
+    def key(self):
+        return "/" if self.model else _canon(self.name)
+
+    def option(self, name):
+        key = _canon(name)
+        return next((o for o in self.options if o.key == key), None)
+
+    def __str__(self):
+        if self.value is not None:
+            return f"{self.name}={self.value}"
+        if not self.options:
+            return self.name
+        if len(self.options) == 1 and not self.paren and not self.options[0].options:
+            return f"{self.name}{self.sep}{self.options[0]}"
+        return f"{self.name}{self.sep}(" + ",".join(str(o) for o in self.options) + ")"
+
+    def __repr__(self):
+        return f"Keyword({str(self)!r})"
+
+
+class Section:
+    """A run of input lines of one kind, written back verbatim unless edited."""
+
+    def __init__(self, kind, lines):
+        self.kind = kind
+        self.lines = list(lines)
+
+    def render(self):
+        return self.lines
+
+    def __repr__(self):
+        return f"<{self.kind}: {len(self.lines)} line(s)>"
+
+
+class Route(Section):
+    """Route section (#, #P, #N, #T; one or more lines) as a list of Keywords."""
+
+    def __init__(self, lines=("#P",)):
+        super().__init__("route", lines)
+        text = " ".join(L.strip() for L in self.lines if not L.lstrip().startswith("!"))
+        m = _ROUTE_PREFIX.match(text)
+        self.prefix = m.group(1) if m else "#"
+        rest = text[m.end():] if m else text
+        self.keywords = [Keyword.parse(w) for w in _split_words(rest)]
+        self.edited = False
+
+    @classmethod
+    def parse(cls, text):
+        """Route from a route string ('#P b3lyp/… opt'; the # may be left out)."""
+        return cls([text if _ROUTE_PREFIX.match(text) else f"# {text}"])
+
+    def get(self, name):
+        key = "/" if name == "/" else _canon(name)
+        return next((k for k in self.keywords if k.key == key), None)
+
+    def has(self, name, option=None):
+        kw = self.get(name)
+        return kw is not None and (option is None or kw.option(option) is not None)
+
+    @property
+    def method(self):
+        kw = self.get("/")
+        return kw.name.split("/", 1)[0] if kw else None
+
+    @property
+    def basis(self):
+        kw = self.get("/")
+        return kw.name.split("/", 1)[1] if kw else None
+
+    def add(self, text):
+        """Merge keyword(s) like 'opt=(calcfc,maxcycle=200)' into the route. True if anything changed."""
+        before = str(self)
+        for w in _split_words(text):
+            new = Keyword.parse(w)
+            old = self.get(new.key) if new.key != "/" else None
+            if old is None:
+                self.keywords.append(new)
+                continue
+            for opt in new.options:
+                for group in _EXCLUSIVE.get(old.key, ()):
+                    if opt.key in group:
+                        old.options = [o for o in old.options if o.key == opt.key or o.key not in group]
+                cur = old.option(opt.key)
+                if cur is None:
+                    old.options.append(opt)
+                elif str(cur).lower() != str(opt).lower():
+                    old.options[old.options.index(cur)] = opt
+            if new.value is not None:
+                old.value = new.value
+        return self._touch(before)
+
+    def remove(self, text):
+        """Remove 'freq' (whole keyword) or 'opt=modredundant' (one option). True if anything changed."""
+        before = str(self)
+        for w in _split_words(text):
+            gone = Keyword.parse(w)
+            old = self.get(gone.key) if gone.key != "/" else None
+            if old is None:
+                if gone.key == "/":
+                    self.keywords = [k for k in self.keywords if k.name.lower() != gone.name.lower()]
+                continue
+            if not gone.options:
+                self.keywords.remove(old)
+                continue
+            keys = {o.key for o in gone.options}
+            old.options = [o for o in old.options if o.key not in keys]
+        return self._touch(before)
+
+    def _touch(self, before):
+        changed = str(self) != before
+        self.edited = self.edited or changed
+        return changed
+
+    def __str__(self):
+        return " ".join([self.prefix] + [str(k) for k in self.keywords])
+
+    def render(self):
+        if not self.edited:
+            return self.lines
+        if len(self.lines) < 2:
+            return [str(self)]
+        # a route that was spread over several lines stays wrapped at 80 columns
+        lines, cur = [], self.prefix
+        for k in map(str, self.keywords):
+            if len(cur) + 1 + len(k) > 80 and cur.strip():
+                lines.append(cur)
+                cur = k
+            else:
+                cur += " " + k
+        return lines + [cur]
+
+
+class Link0(Section):
+    """%Key=value lines before the route."""
+
+    def __init__(self, lines=()):
+        super().__init__("link0", lines)
+
+    def _find(self, key):
+        key = _canon(key.lstrip("%"))
+        for i, L in enumerate(self.lines):
+            s = L.strip()
+            if s.startswith("%") and _canon(s[1:].split("=", 1)[0]) == key:
+                return i
+        return None
+
+    def get(self, key, default=None):
+        i = self._find(key)
+        if i is None:
+            return default
+        s = self.lines[i].strip()
+        return s.split("=", 1)[1].strip() if "=" in s else ""
+
+    def set(self, key, value):
+        i = self._find(key)
+        if i is None:
+            self.lines.append(f"%{key.lstrip('%')}={value}")
+        else:
+            name = self.lines[i].strip().split("=", 1)[0]
+            self.lines[i] = f"{name}={value}"
+
+    def remove(self, key):
+        i = self._find(key)
+        if i is not None:
+            del self.lines[i]
+        return i is not None
+
+    def items(self):
+        return [(s[1:].split("=", 1)[0].strip().lower(), s.split("=", 1)[1].strip() if "=" in s else "")
+                for s in (L.strip() for L in self.lines) if s.startswith("%")]
+
+
+class Molecule(Section):
+    """Charge/multiplicity line followed by the atoms (Cartesian or Z-matrix)."""
+
+    def __init__(self, lines):
+        super().__init__("molecule", lines)
+
+    @property
+    def pairs(self):
+        tok = self.lines[0].split()
+        return [(int(tok[i]), int(tok[i + 1])) for i in range(0, len(tok) - 1, 2)]
+
+    @property
+    def charge(self):
+        return self.pairs[0][0]
+
+    @charge.setter
+    def charge(self, value):
+        self._set_pair(value, self.mult)
+
+    @property
+    def mult(self):
+        return self.pairs[0][1]
+
+    @mult.setter
+    def mult(self, value):
+        self._set_pair(self.charge, value)
+
+    def _set_pair(self, charge, mult):
+        pairs = [(charge, mult)] + self.pairs[1:]
+        self.lines[0] = " ".join(f"{c} {m}" for c, m in pairs)
+
+    @property
+    def atom_lines(self):
+        return [L for L in self.lines[1:] if L.strip() and not L.lstrip().startswith("!")]
+
+    @property
+    def symbols(self):
+        return [L.split()[0] for L in self.atom_lines]
+
+    @property
+    def cartesian(self):
+        """[(symbol, x, y, z)] when every atom is given in Cartesians, else None (Z-matrix)."""
+        atoms = []
+        for L in self.atom_lines:
+            m = _CART_RE.match(L)
+            if not m:
+                return None
+            atoms.append((m.group(1), float(m.group(2)), float(m.group(3)), float(m.group(4))))
+        return atoms
+
+    def set_cartesian(self, atoms):
+        """Replace the atoms with [(symbol, x, y, z)]."""
+        self.lines = self.lines[:1] + [f"{s:<2s}  {x: .6f}  {y: .6f}  {z: .6f}" for s, x, y, z in atoms]
+
+
+class Variables(Section):
+    """Z-matrix variables ('R1=0.96', 'A1 104.5', 'A1 104.5 S 10 5.0'; Variables:/Constants: headers)."""
+
+    def __init__(self, lines):
+        super().__init__("variables", lines)
+
+    def values(self):
+        out = {}
+        for L in self.lines:
+            m = _VAR_RE.match(L)
+            if m:
+                out[m.group(2)] = float(m.group(4).replace("D", "e").replace("d", "e"))
+        return out
+
+    def set(self, name, value):
+        for i, L in enumerate(self.lines):
+            m = _VAR_RE.match(L)
+            if m and m.group(2) == name:
+                self.lines[i] = f"{m.group(1)}{name}{m.group(3)}{value}{m.group(5)}"
+                return
+        self.lines.append(f"{name}={value}")
+
+
+class InputStep:
+    """One --Link1-- step: its sections in file order."""
+
+    def __init__(self, sections=None):
+        self.sections = sections or []
+
+    def first(self, kind):
+        return next((s for s in self.sections if s.kind == kind), None)
+
+    def all(self, kind):
+        return [s for s in self.sections if s.kind == kind]
+
+    @property
+    def link0(self):
+        s = self.first("link0")
+        if s is None:
+            s = Link0()
+            self.sections.insert(0, s)
+        return s
+
+    @property
+    def route(self):
+        return self.first("route")
+
+    @property
+    def title(self):
+        s = self.first("title")
+        return "\n".join(s.lines) if s else None
+
+    @property
+    def molecule(self):
+        return self.first("molecule")
+
+    @property
+    def variables(self):
+        return self.first("variables")
+
+    @property
+    def modredundant(self):
+        return self.first("modredundant")
+
+    @property
+    def basis(self):
+        return self.first("basis")
+
+    @property
+    def empty(self):
+        return not any(L.strip() for s in self.sections for L in s.lines)
+
+    def add_section(self, section, after=("variables", "molecule")):
+        """Insert `section` (blank-separated) after the last section of the first kind in `after` present."""
+        idx = None
+        for kind in after:
+            found = [i for i, s in enumerate(self.sections) if s.kind == kind]
+            if found:
+                idx = found[-1] + 1
+                break
+        if idx is None:
+            idx = len(self.sections)
+        blank = Section("blank", [""])
+        if idx < len(self.sections) and self.sections[idx].kind == "blank":
+            self.sections[idx + 1:idx + 1] = [section, Section("blank", [""])]
+        else:
+            self.sections[idx:idx] = [blank, section, Section("blank", [""])]
+        return section
+
+    def render(self):
+        return [L for s in self.sections for L in s.render()]
+
+
+class GaussianInput:
+    """A whole input: steps joined by their original --Link1-- lines."""
+
+    def __init__(self, steps, separators, newline="\n", final_newline=True, path=None):
+        self.steps = steps
+        self.separators = separators    # raw '--Link1--' lines between steps
+        self.newline = newline
+        self.final_newline = final_newline
+        self.path = path
+
+    @property
+    def jobs(self):
+        """The non-empty steps."""
+        return [s for s in self.steps if not s.empty]
+
+    def dumps(self):
+        lines = list(self.steps[0].render())
+        for sep, step in zip(self.separators, self.steps[1:]):
+            lines.append(sep)
+            lines.extend(step.render())
+        text = self.newline.join(lines)
+        return text + self.newline if self.final_newline and lines else text
+
+    def write(self, path=None, backup=False):
+        """Write atomically (to `path` or where it was read from); `backup` keeps the old file as .bak."""
+        path = path or self.path
+        if backup and os.path.exists(path):
+            with open(path, "rb") as fi, open(path + ".bak", "wb") as fo:
+                fo.write(fi.read())
+        tmp = path + ".tmp"
+        with open(tmp, "w", newline="") as f:
+            f.write(self.dumps())
+        os.replace(tmp, path)
+        return path
+
+
+# ── parsing ─────────────────────────────────────────────────────────────────
+
+def parse_input(text, path=None):
+    """GaussianInput from the text of a .com/.gjf file (lossless: .dumps() gives `text` back)."""
+    newline = "\r\n" if "\r\n" in text else "\n"
+    final_newline = text.endswith(("\n", "\r"))
+    lines = text.split(newline)
+    if final_newline:
+        lines = lines[:-1]
+    steps, separators, chunk = [], [], []
+    for L in lines:
+        if L.strip().lower() == "--link1--":
+            steps.append(_parse_step(chunk))
+            separators.append(L)
+            chunk = []
+        else:
+            chunk.append(L)
+    steps.append(_parse_step(chunk))
+    return GaussianInput(steps, separators, newline, final_newline, path)
+
+
+def read_input(path):
+    with open(path, "r", errors="ignore", newline="") as f:
+        return parse_input(f.read(), path)
+
+
+def _runs(lines):
+    """Split lines into alternating (blank?, lines) runs; '!' comment lines stay with their block."""
+    runs = []
+    for L in lines:
+        blank = not L.strip()
+        if runs and runs[-1][0] == blank:
+            runs[-1][1].append(L)
+        else:
+            runs.append((blank, [L]))
+    return runs
+
+
+def _is_atom_line(line):
+    return bool(_CART_RE.match(line)) and re.match(r"^\s*[A-Za-z]", line) is not None
+
+
+def _parse_step(lines):
+    step = InputStep()
+    i, n = 0, len(lines)
+    while i < n and not lines[i].lstrip().startswith("#"):
+        i += 1
+    if i == n:
+        # no route: keep everything as it is
+        step.sections = [Section("blank" if not L.strip() else "other", [L]) for L in lines]
+        return step
+    if i:
+        step.sections.append(Link0(lines[:i]))
+    j = i
+    while j < n and lines[j].strip():
+        j += 1
+    route = Route(lines[i:j])
+    step.sections.append(route)
+    geom = route.get("geom")
+    allcheck = bool(geom and geom.option("allcheck"))
+    gen_ecp = route.has("genecp") or route.has("pseudo", "read") or (route.basis or "").lower() == "genecp"
+
+    seen = set()
+    for blank, block in _runs(lines[j:]):
+        if blank:
+            step.sections.append(Section("blank", block))
+            continue
+        content = [L for L in block if not L.lstrip().startswith("!")]
+        if not content:
+            step.sections.append(Section("comment", block))
+            continue
+        if not allcheck and "title" not in seen and "molecule" not in seen and not _CM_RE.match(content[0]):
+            kind = "title"
+        elif not allcheck and "molecule" not in seen and _CM_RE.match(content[0]):
+            kind = "molecule"
+        else:
+            kind = _classify(content, seen, gen_ecp)
+        seen.add(kind)
+        if kind == "molecule":
+            k = next((k for k, L in enumerate(block)
+                      if k and L.strip().lower().startswith(("variables", "constants"))), None)
+            if k is None:
+                step.sections.append(Molecule(block))
+            else:
+                # Z-matrix variables may follow the atoms without a blank line
+                step.sections += [Molecule(block[:k]), Variables(block[k:])]
+                seen.add("variables")
+        elif kind == "variables":
+            step.sections.append(Variables(block))
+        else:
+            step.sections.append(Section(kind, block))
+    return step
+
+
+def _classify(lines, seen, gen_ecp):
+    if any("****" in L for L in lines):
+        return "basis"
+    if all(L.strip().startswith("@") for L in lines):
+        return "include"
+    first = lines[0].strip().lower()
+    if first.startswith(("variables", "constants")) or \
+            ("molecule" in seen and "variables" not in seen and "modredundant" not in seen
+             and all(_VAR_RE.match(L) or L.strip().lower().startswith(("variables", "constants"))
+                     for L in lines)
+             and not all(_MODRED_RE.match(L) for L in lines)):
+        return "variables"
+    if all(_MODRED_RE.match(L) for L in lines) and not any(_is_atom_line(L) for L in lines):
+        return "modredundant"
+    if gen_ecp and "basis" in seen and "ecp" not in seen:
+        return "ecp"
+    return "other"
+
+
+# ── bulk rewrite ────────────────────────────────────────────────────────────
+
+def find_inputs(targets=(".",), recursive=False):
+    for t in targets:
+        if os.path.isfile(t):
+            yield t
+            continue
+        walker = os.walk(t) if recursive else [(t, None, os.listdir(t))]
+        for root, _, files in walker:
+            for f in sorted(files):
+                if f.lower().endswith((".com", ".gjf")):
+                    yield os.path.join(root, f)
+
+
+def rewrite_input(path, edit, dry_run=False, backup=True):
+    """
+    Apply `edit(doc)` to one input and write it back if the text changed.
+    Returns (status, unified diff); status is changed / would change /
+    unchanged / error: ….
+    """
+    try:
+        doc = read_input(path)
+        old = doc.dumps()
+        edit(doc)
+        new = doc.dumps()
+    except (OSError, ValueError, IndexError) as e:
+        return f"error: {e}", ""
+    if new == old:
+        return "unchanged", ""
+    diff = "".join(difflib.unified_diff(old.splitlines(True), new.splitlines(True), path, path + " (new)"))
+    if dry_run:
+        return "would change", diff
+    try:
+        doc.write(backup=backup)
+    except OSError as e:
+        return f"error: {e}", diff
+    return "changed", diff
+
+
+def rewrite_inputs(paths, edit, jobs=None, dry_run=False, backup=True):
+    """rewrite_input() for many inputs on a thread pool; returns {path: (status, diff)}."""
+    paths = list(paths)
+    with ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 4) * 4)) as ex:
+        results = list(ex.map(lambda p: rewrite_input(p, edit, dry_run, backup), paths))
+    return dict(zip(paths, results))
+
+
+def route_edit(add=(), remove=(), link0=None):
+    """Edit function for rewrite_inputs: remove/add route keywords and set Link 0 values in every step."""
+    def edit(doc):
+        for step in doc.jobs:
+            if step.route is None:
+                continue
+            for kw in remove:
+                step.route.remove(kw)
+            for kw in add:
+                step.route.add(kw)
+            for key, value in (link0 or {}).items():
+                step.link0.set(key, value)
+    return edit
+
+
+def rewrite_cli(argv=None):
+    ap = argparse.ArgumentParser(prog="gausskit rewrite",
+                                 description="Edit the route / Link 0 of many Gaussian inputs at once.")
+    ap.add_argument("targets", nargs="*", default=["."], help="files or directories [default: .]")
+    ap.add_argument("-r", "--recursive", action="store_true")
+    ap.add_argument("--add", action="append", default=[], help="route keyword to add/merge, e.g. 'opt=calcfc'")
+    ap.add_argument("--remove", action="append", default=[], help="route keyword or option to remove")
+    ap.add_argument("--link0", action="append", default=[], metavar="KEY=VALUE", help="set a Link 0 line")
+    ap.add_argument("--dry-run", action="store_true", help="only print the diffs")
+    ap.add_argument("--no-backup", action="store_true", help="do not keep .bak copies")
+    ap.add_argument("--jobs", type=int, default=None, help="parallel workers")
+    args = ap.parse_args(argv)
+
+    link0 = dict(kv.lstrip("%").split("=", 1) for kv in args.link0 if "=" in kv)
+    if not (args.add or args.remove or link0):
+        ap.error("nothing to do: give --add, --remove or --link0")
+    results = rewrite_inputs(find_inputs(args.targets, args.recursive),
+                             route_edit(args.add, args.remove, link0),
+                             args.jobs, args.dry_run, not args.no_backup)
+    for path, (status, diff) in results.items():
+        if args.dry_run and diff:
+            print(diff, end="")
+        elif status.startswith("error"):
+            print(f"❌ {path}: {status}")
+    changed = sum(1 for s, _ in results.values() if s in ("changed", "would change"))
+    errors = sum(1 for s, _ in results.values() if s.startswith("error"))
+    verb = "would change" if args.dry_run else "rewritten"
+    print(f"✏️ {changed}/{len(results)} input(s) {verb}" + (f"; {errors} error(s)" if errors else "") + ".")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(rewrite_cli())
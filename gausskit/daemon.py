@@ -0,0 +1,777 @@
+# gausskit/daemon.py
+"""
+One long-running scheduler per user, driven over a unix socket.
+
+`gausskit daemon start` (or the first `gausskit submit`) starts a daemon
+that owns the job journal, the execution backends and the only polling
+loop.  Clients talk to it over `scheduler-<user>.sock` in the gausskit
+cache directory (see gausskit.squeue_cache.cache_dir):
+
+    gausskit submit job.com …            one workflow of independent/%OldChk-linked jobs
+    gausskit submit --batch              every .com without .log in cwd
+    gausskit submit --chain GS ES FC     GS and ES, then FC once both succeeded
+    gausskit status [WF] [--all]         workflows and their jobs
+    gausskit cancel WF|job|jobid …       cancel queued and running jobs
+    gausskit attach [WF]                 follow the daemon's output (until WF finishes)
+    gausskit daemon start|stop|run
+
+New workflows join the running daemon immediately: it wakes its loop and
+submits whatever has a free slot, without a new process or a second poller.
+
+Jobs are grouped into sessions (working directory + scheduler options);
+each session is a GaussianJobScheduler, so quota/fallback, partition
+policies, walltime restarts, fix-and-resubmit and metrics work as in
+Mode 4.  Sessions with the same submission command share one backend.
+Every state change is appended to `journal-<user>.jsonl`; a restarted
+daemon replays it and keeps watching the jobs it left behind.
+"""
+
+import argparse
+import contextlib
+import fcntl
+import getpass
+import json
+import os
+import queue
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+
+from .backends import LocalBackend, make_backend
+from .metrics import METRICS_FILE, metrics_path
+from .partition import parse_costs, env_costs
+from .ordering import ORDER_POLICIES, order_backlog
+from .squeue_cache import cache_dir
+
+POLL_INTERVAL = 10
+LIVE_STATES = ("waiting", "submitted")
+KEEP_FINISHED = 7 * 86400       # finished workflows kept in the journal/status
+
+# client option → GaussianJobScheduler keyword, default
+OPTIONS = {
+    "backend": ("submit_cmd", "Hgbatch"),
+    "nproc": ("nproc", 56),
+    "time": ("time_limit", "23:50:00"),
+    "partition": ("partition", "medium"),
+    "gdv": ("gdv", "gdvj30+"),
+    "primary": ("primary_part", None),
+    "max_primary": ("max_primary", 2),
+    "fallback": ("fallback_part", None),
+    "wait_slot": ("wait_for_slot", True),
+    "policy": ("partition_policy", None),
+    "candidates": ("candidate_parts", None),
+    "costs": ("partition_costs", None),
+    "predict": ("predict_resources", False),
+    "order": ("order_policy", "fifo"),
+    "local_cores": ("local_cores", None),
+    "restart": ("auto_restart", True),
+    "max_restarts": ("max_restarts", 3),
+    "fix": ("fix_failures", False),
+    "max_retries": ("max_retries", 3),
+    "lint": ("lint", True),
+    "metrics": ("metrics_file", None),
+}
+
+
+def _user():
+    return getpass.getuser()
+
+
+def socket_path():
+    return cache_dir() / f"scheduler-{_user()}.sock"
+
+
+def journal_path():
+    return cache_dir() / f"journal-{_user()}.jsonl"
+
+
+def daemon_log_path():
+    return cache_dir() / f"scheduler-{_user()}.log"
+
+
+@contextlib.contextmanager
+def _in_dir(path):
+    old = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(old)
+
+
+class _Broadcast:
+    """stdout replacement: write to the daemon log and to every attached client."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.listeners = set()
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        self.stream.write(text)
+        self.stream.flush()
+        with self._lock:
+            for q in self.listeners:
+                q.put(text)
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def fileno(self):
+        return self.stream.fileno()
+
+    def subscribe(self):
+        q = queue.Queue()
+        with self._lock:
+            self.listeners.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self.listeners.discard(q)
+
+
+class _Session:
+    """Jobs from one directory submitted with the same options."""
+
+    def __init__(self, cwd, options, sched, wait_slot=True):
+        self.cwd = cwd
+        self.options = options
+        self.sched = sched
+        self.wait_slot = wait_slot      # no free slot: keep the job waiting (else it fails)
+
+
+class SchedulerDaemon:
+    """Job table, journal, sessions and the single polling loop."""
+
+    def __init__(self, poll_interval=POLL_INTERVAL, journal=None):
+        self.poll_interval = poll_interval
+        self.journal = journal or journal_path()
+        self.lock = threading.RLock()
+        self.wake = threading.Event()
+        self.stopping = False
+        self.sessions = {}      # (cwd, options json) → _Session
+        self.backends = {}      # (submit_cmd, gdv, local_cores) → shared backend
+        self.workflows = {}     # wf id → {"id", "cwd", "mode", "options", "ts", "jobs": [base …]}
+        self.jobs = {}          # (wf id, base) → {"wf", "base", "parents", "state", "watch", "jobid"}
+        self.next_id = 1
+        self.out = sys.stdout
+
+    # -- journal -----------------------------------------------------------
+
+    def _append(self, rec):
+        rec = dict(rec, ts=round(time.time(), 3))
+        with open(self.journal, "a") as f:
+            f.write(json.dumps(rec) + "\n")
+
+    def _set(self, job, state, **fields):
+        job.update(fields, state=state)
+        self._append(dict(job, ev="job"))
+
+    def replay(self):
+        """Rebuild workflows and jobs from the journal, then compact it."""
+        try:
+            with open(self.journal) as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        for line in lines:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            ev = rec.pop("ev", None)
+            if ev == "workflow":
+                rec.setdefault("jobs", [])
+                self.workflows[rec["id"]] = rec
+                self.next_id = max(self.next_id, int(rec["id"].lstrip("wf")) + 1)
+            elif ev == "job" and rec.get("wf") in self.workflows:
+                rec.pop("ts", None)
+                key = (rec["wf"], rec["base"])
+                if key not in self.jobs:
+                    self.workflows[rec["wf"]]["jobs"].append(rec["base"])
+                self.jobs[key] = rec
+        cutoff = time.time() - KEEP_FINISHED
+        for wf in list(self.workflows.values()):
+            if not self._live(wf["id"]) and wf.get("ts", 0) < cutoff:
+                del self.workflows[wf["id"]]
+                for b in wf["jobs"]:
+                    self.jobs.pop((wf["id"], b), None)
+        # compact: one record per workflow and job
+        tmp = f"{self.journal}.tmp"
+        with open(tmp, "w") as f:
+            for wf in self.workflows.values():
+                f.write(json.dumps(dict({k: v for k, v in wf.items() if k != "jobs"}, ev="workflow")) + "\n")
+                for b in wf["jobs"]:
+                    f.write(json.dumps(dict(self.jobs[(wf["id"], b)], ev="job")) + "\n")
+        os.replace(tmp, self.journal)
+        # hand the jobs that were running back to their sessions
+        for job in self.jobs.values():
+            if job["state"] != "submitted":
+                continue
+            if not os.path.isdir(self.workflows[job["wf"]]["cwd"]):
+                self._set(job, "failed")
+                continue
+            sched = self._session(self.workflows[job["wf"]]).sched
+            watch = job.get("watch") or job["base"]
+            if watch != job["base"]:
+                sched.restarted[job["base"]] = watch
+            if job.get("jobid"):
+                sched.job_ids[watch] = job["jobid"]
+        live = sum(1 for wf in self.workflows if self._live(wf))
+        if live:
+            print(f"📒 Resumed {live} workflow(s) from {self.journal}")
+
+    # -- sessions ----------------------------------------------------------
+
+    def _session(self, wf):
+        opts = wf["options"]
+        key = (wf["cwd"], json.dumps(opts, sort_keys=True))
+        if key not in self.sessions:
+            from .scheduler import GaussianJobScheduler
+            kw = {OPTIONS[k][0]: v for k, v in opts.items() if k in OPTIONS}
+            bkey = (kw.get("submit_cmd", "Hgbatch"), kw.get("gdv", "gdvj30+"), kw.get("local_cores"))
+            if bkey not in self.backends:
+                self.backends[bkey] = make_backend(bkey[0], gdv=bkey[1], max_cores=bkey[2])
+            kw["quota_enabled"] = bool(kw.get("primary_part"))
+            # metrics only when the client asked for them, never from the daemon's environment
+            kw["metrics_file"] = kw.get("metrics_file") or ""
+            kw["partition_costs"] = kw.get("partition_costs") or {}
+            kw["primary_part"] = kw.get("primary_part") or "medium"
+            # the poll loop never blocks on a slot; waiting means retrying on the next poll
+            wait_slot = kw.pop("wait_for_slot", True)
+            with _in_dir(wf["cwd"]):
+                sched = GaussianJobScheduler(
+                    None, None, None,
+                    poll_interval=self.poll_interval,
+                    wait_for_slot=False,
+                    backend=self.backends[bkey],
+                    **kw,
+                )
+            self.sessions[key] = _Session(wf["cwd"], opts, sched, wait_slot)
+        return self.sessions[key]
+
+    def _live(self, wf_id):
+        wf = self.workflows[wf_id]
+        return any(self.jobs[(wf_id, b)]["state"] in LIVE_STATES for b in wf["jobs"])
+
+    def _find(self, cwd, base):
+        """The most recent job for `base` in `cwd`, across workflows."""
+        found = None
+        for wf in self.workflows.values():
+            if wf["cwd"] == cwd and base in wf["jobs"]:
+                found = self.jobs[(wf["id"], base)]
+        return found
+
+    # -- requests ----------------------------------------------------------
+
+    def add_workflow(self, cwd, mode, bases, options):
+        """Register a workflow and wake the loop.  Returns the reply dict."""
+        if not os.path.isdir(cwd):
+            return {"ok": False, "error": f"no such directory: {cwd}"}
+        with self.lock, _in_dir(cwd):
+            if mode == "batch" and not bases:
+                bases = sorted(f[:-4] for f in os.listdir() if f.endswith(".com")
+                               and not os.path.exists(f"{f[:-4]}.log"))
+            missing = [b for b in bases if not os.path.exists(f"{b}.com")]
+            if missing:
+                return {"ok": False, "error": "missing input: " + ", ".join(f"{b}.com" for b in missing)}
+            busy = [b for b in bases if (j := self._find(cwd, b)) and j["state"] in LIVE_STATES]
+            bases = [b for b in bases if b not in busy]
+            if not bases:
+                return {"ok": False, "error": "nothing to submit", "busy": busy}
+
+            order = options.get("order", "fifo")
+            if order not in ORDER_POLICIES:
+                return {"ok": False, "error": f"unknown order policy {order!r}"}
+            if options.get("policy") == "cheapest" and not options.get("costs"):
+                return {"ok": False, "error": "policy 'cheapest' needs --costs or $GAUSSKIT_PARTITION_COSTS"}
+            if mode == "chain":
+                gs, es, fc = bases
+                ordered, deps = [gs, es, fc], {fc: {gs, es}}
+            else:
+                ordered, _, deps = order_backlog(bases, order)
+
+            wf_id = f"wf{self.next_id}"
+            self.next_id += 1
+            wf = {"id": wf_id, "cwd": cwd, "mode": mode, "options": options,
+                  "ts": time.time(), "jobs": []}
+            self.workflows[wf_id] = wf
+            self._append({k: v for k, v in wf.items() if k != "jobs"} | {"ev": "workflow"})
+            for b in ordered:
+                job = {"wf": wf_id, "base": b, "parents": sorted(deps.get(b, ())),
+                       "state": "waiting", "watch": b, "jobid": None}
+                wf["jobs"].append(b)
+                self.jobs[(wf_id, b)] = job
+                self._append(dict(job, ev="job"))
+            self._session(wf)
+            print(f"📥 {wf_id}: {mode} of {len(ordered)} job(s) in {cwd}")
+        self.wake.set()
+        return {"ok": True, "workflow": wf_id, "jobs": ordered, "busy": busy}
+
+    def cancel(self, targets, cwd=None):
+        """Cancel workflows (wfN), jobs (base name in `cwd`) or backend job IDs."""
+        done = []
+        with self.lock:
+            for t in targets:
+                hits = []
+                if t in self.workflows:
+                    hits = [self.jobs[(t, b)] for b in self.workflows[t]["jobs"]]
+                else:
+                    for (wf_id, b), job in self.jobs.items():
+                        if job.get("jobid") == t or (self.workflows[wf_id]["cwd"] == cwd and t in (b, job.get("watch"))):
+                            hits.append(job)
+                for job in hits:
+                    if job["state"] not in LIVE_STATES:
+                        continue
+                    if job["state"] == "submitted" and job.get("jobid"):
+                        sess = self._session(self.workflows[job["wf"]])
+                        with _in_dir(sess.cwd):
+                            sess.sched.backend.cancel(job["jobid"])
+                    self._set(job, "cancelled")
+                    done.append(f"{job['wf']}:{job['base']}")
+        if done:
+            print(f"🛑 Cancelled {', '.join(done)}")
+        self.wake.set()
+        return {"ok": bool(done), "cancelled": done}
+
+    def status(self, wf_id=None, show_all=False):
+        with self.lock:
+            out = []
+            for wf in self.workflows.values():
+                if wf_id and wf["id"] != wf_id:
+                    continue
+                if not (wf_id or show_all or self._live(wf["id"])):
+                    continue
+                jobs = [dict(self.jobs[(wf["id"], b)]) for b in wf["jobs"]]
+                out.append({k: v for k, v in wf.items() if k != "jobs"} | {"jobs": jobs})
+            return {"ok": True, "workflows": out, "poll_interval": self.poll_interval}
+
+    # -- polling loop ------------------------------------------------------
+
+    def _step_session(self, sess, jobs):
+        s = sess.sched
+        with s.metrics.poll(len(jobs)):
+            # 1) jobs already handed to the backend: walltime restarts first, and jobs
+            #    the backend ended without a termination line (CANCELLED, FAILED,
+            #    OUT_OF_MEMORY, …) land in s.killed, which _job_outcome reports as failed
+            pending = {s.resolve(j["base"]): j for j in jobs if j["state"] == "submitted"}
+            for old, new in s._restart_timeouts(list(pending)).items():
+                self._set(pending[old], "submitted", watch=new, jobid=s.job_ids.get(new))
+            for job in [j for j in jobs if j["state"] == "submitted"]:
+                watch = s.resolve(job["base"])
+                if os.path.exists(f"{watch}.log"):
+                    s.metrics.started(watch)
+                out = "failed" if watch in s.given_up else s._job_outcome(watch)
+                if out == "failed" and s.fix_failures and s._fix_and_resubmit(watch):
+                    self._set(job, "submitted", jobid=s.job_ids.get(watch))
+                    continue
+                if out:
+                    s.metrics.finished(watch, out)
+                    self._set(job, out, watch=watch)
+                    print(f"{'✅' if out == 'ok' else '❌'} {job['wf']}: {watch} {out}")
+
+            # 2) waiting jobs, in workflow order, into free slots
+            waiting = [j for j in jobs if j["state"] == "waiting"]
+            slots = s._free_slots(len(waiting)) if waiting else 0
+            for job in waiting:
+                parents = [self._find(sess.cwd, p) or {"state": "ok"} for p in job["parents"]]
+                if any(p["state"] in ("failed", "cancelled", "skipped") for p in parents):
+                    print(f"⏭️ {job['wf']}: skipping {job['base']}: a parent job did not succeed.")
+                    self._set(job, "skipped")
+                    continue
+                if slots <= 0 or not all(p["state"] == "ok" for p in parents):
+                    continue
+                jid = s.submit_job(job["base"])
+                if not jid:
+                    if s.refusal == "full" and sess.wait_slot:
+                        slots = 0           # retried on the next poll
+                        continue
+                    self._set(job, "failed")
+                    continue
+                slots -= 1
+                self._set(job, "submitted", jobid=jid)
+                if parents:
+                    s.metrics.stage(job["base"], [p["watch"] for p in parents if "watch" in p])
+
+    def step(self):
+        with self.lock:
+            by_session = {}
+            for job in self.jobs.values():
+                if job["state"] in LIVE_STATES:
+                    sess = self._session(self.workflows[job["wf"]])
+                    by_session.setdefault(id(sess), (sess, []))[1].append(job)
+            live_before = {wf for wf in self.workflows if self._live(wf)}
+            for sess, jobs in by_session.values():
+                try:
+                    with _in_dir(sess.cwd):
+                        self._step_session(sess, jobs)
+                except Exception as e:      # one broken directory must not stop the others
+                    print(f"⚠️ Polling {sess.cwd} failed: {e}")
+            for wf in sorted(live_before):
+                if not self._live(wf):
+                    states = [self.jobs[(wf, b)]["state"] for b in self.workflows[wf]["jobs"]]
+                    summary = ", ".join(f"{states.count(s)} {s}" for s in sorted(set(states)))
+                    print(f"🏁 {wf} finished: {summary}")
+                    self.workflows[wf]["done"] = time.time()
+
+    def loop(self):
+        while not self.stopping:
+            self.step()
+            self.wake.wait(self.poll_interval)
+            self.wake.clear()
+        with self.lock:
+            # local jobs are children of the daemon: stop them and requeue for the next start
+            for job in self.jobs.values():
+                if job["state"] != "submitted":
+                    continue
+                sess = self._session(self.workflows[job["wf"]])
+                if isinstance(sess.sched.backend, LocalBackend):
+                    sess.sched.backend.cancel(job["jobid"])
+                    self._set(job, "waiting", watch=job["base"], jobid=None)
+                    print(f"↩️ {job['wf']}: {job['base']} stopped, requeued")
+            for sess in self.sessions.values():
+                sess.sched.metrics.write_prom()
+
+    # -- socket server -----------------------------------------------------
+
+    def handle(self, req, send):
+        op = req.get("op")
+        if op == "ping":
+            return send({"ok": True, "pid": os.getpid()})
+        if op == "submit":
+            return send(self.add_workflow(req["cwd"], req.get("mode", "batch"),
+                                          req.get("bases") or [], req.get("options") or {}))
+        if op == "status":
+            return send(self.status(req.get("workflow"), req.get("all", False)))
+        if op == "cancel":
+            return send(self.cancel(req.get("targets") or [], req.get("cwd")))
+        if op == "attach":
+            return self._attach(req.get("workflow"), send)
+        if op == "stop":
+            self.stopping = True
+            self.wake.set()
+            send({"ok": True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+        send({"ok": False, "error": f"unknown op {op!r}"})
+
+    def _attach(self, wf_id, send):
+        if wf_id and wf_id not in self.workflows:
+            return send({"ok": False, "error": f"unknown workflow {wf_id}"})
+        q = self.out.subscribe() if isinstance(self.out, _Broadcast) else queue.Queue()
+        try:
+            send({"ok": True})
+            while not self.stopping:
+                try:
+                    send({"text": q.get(timeout=1.0)})
+                except queue.Empty:
+                    send({"heartbeat": True})
+                if wf_id:
+                    with self.lock:
+                        if not self._live(wf_id):
+                            break
+            while not q.empty():            # the lines of the final step
+                send({"text": q.get_nowait()})
+            send({"done": True})
+        except OSError:
+            pass                            # client went away
+        finally:
+            if isinstance(self.out, _Broadcast):
+                self.out.unsubscribe(q)
+
+    def serve(self, path=None):
+        """Run the socket server and the polling loop until `stop`."""
+        path = str(path or socket_path())
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline()
+                if not line:
+                    return
+
+                def send(obj):
+                    self.wfile.write((json.dumps(obj) + "\n").encode())
+                    self.wfile.flush()
+                try:
+                    req = json.loads(line)
+                except ValueError:
+                    return send({"ok": False, "error": "bad request"})
+                daemon.handle(req, send)
+
+        if os.path.exists(path):
+            os.unlink(path)
+        old_mask = os.umask(0o077)
+        try:
+            self.server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        finally:
+            os.umask(old_mask)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"🛰️ gausskit scheduler daemon (pid {os.getpid()}) listening on {path}")
+        try:
+            self.loop()
+        finally:
+            self.server.server_close()
+            with contextlib.suppress(OSError):
+                os.unlink(path)
+            print("👋 Scheduler daemon stopped.")
+
+
+# ── client ────────────────────────────────────────────────────────────────────
+
+class DaemonUnavailable(RuntimeError):
+    pass
+
+
+def request(obj, path=None, timeout=30):
+    """Send one request; yields each JSON reply line."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path or socket_path()))
+    except OSError as e:
+        sock.close()
+        raise DaemonUnavailable(str(e)) from None
+    with sock, sock.makefile("rwb") as f:
+        f.write((json.dumps(obj) + "\n").encode())
+        f.flush()
+        for line in f:
+            yield json.loads(line)
+
+
+def call(obj, path=None):
+    """Send one request and return its (single) reply."""
+    return next(request(obj, path), {"ok": False, "error": "no reply"})
+
+
+def daemon_running(path=None):
+    try:
+        return call({"op": "ping"}, path).get("ok", False)
+    except DaemonUnavailable:
+        return False
+
+
+def start_daemon(poll_interval=POLL_INTERVAL, wait=10.0):
+    """Start the daemon in the background unless one is running.  Returns True when it answers."""
+    if daemon_running():
+        return True
+    cache_dir().mkdir(parents=True, exist_ok=True)
+    with open(daemon_log_path(), "a") as log:
+        subprocess.Popen(
+            [sys.executable, "-m", "gausskit.daemon", "daemon", "run", "--poll", str(poll_interval)],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+            start_new_session=True, cwd=os.path.expanduser("~"),
+        )
+    t0 = time.time()
+    while time.time() - t0 < wait:
+        if daemon_running():
+            return True
+        time.sleep(0.1)
+    print(f"❌ Scheduler daemon did not come up; see {daemon_log_path()}")
+    return False
+
+
+def run_daemon(poll_interval=POLL_INTERVAL):
+    """Foreground daemon; refuses to start twice for the same user."""
+    d = cache_dir()
+    d.mkdir(parents=True, exist_ok=True)
+    lock = open(d / f"scheduler-{_user()}.pid", "a+")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        print("ℹ️ A scheduler daemon is already running.")
+        return 1
+    lock.truncate(0)
+    lock.write(str(os.getpid()))
+    lock.flush()
+    daemon = SchedulerDaemon(poll_interval=poll_interval)
+    out = _Broadcast(sys.stdout)
+    daemon.out = sys.stdout = out
+    daemon.replay()
+    daemon.serve()
+    return 0
+
+
+def _print_status(reply):
+    wfs = reply.get("workflows", [])
+    if not wfs:
+        print("ℹ️ No workflows.")
+        return
+    for wf in wfs:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(wf.get("ts", 0)))
+        print(f"📦 {wf['id']}  {wf['mode']:<6} {when}  {wf['cwd']}")
+        for j in wf["jobs"]:
+            watch = f" → {j['watch']}" if j.get("watch") and j["watch"] != j["base"] else ""
+            after = f"  after {', '.join(j['parents'])}" if j.get("parents") else ""
+            print(f"     {j['base'] + watch:<32} {j['state']:<10} {j.get('jobid') or '-':>10}{after}")
+
+
+def _attach(wf_id=None):
+    try:
+        for msg in request({"op": "attach", "workflow": wf_id}, timeout=None):
+            if msg.get("error"):
+                print(f"❌ {msg['error']}")
+                return 1
+            if "text" in msg:
+                sys.stdout.write(msg["text"])
+                sys.stdout.flush()
+            if msg.get("done"):
+                break
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _submit_parser():
+    ap = argparse.ArgumentParser(prog="gausskit submit",
+                                 description="Hand jobs to the running scheduler daemon (started if needed).")
+    ap.add_argument("inputs", nargs="*", help=".com files (name or name.com)")
+    ap.add_argument("--batch", action="store_true", help="every .com without a .log in this directory")
+    ap.add_argument("--chain", nargs=3, metavar=("GS", "ES", "FC"), help="GS and ES, then FC")
+    ap.add_argument("--backend", default="Hgbatch", help="Hgbatch/gsub/sbatch/local or a local command")
+    ap.add_argument("--nproc", type=int, default=56)
+    ap.add_argument("--time", default="23:50:00", help="walltime HH:MM:SS")
+    ap.add_argument("--partition", default="medium")
+    ap.add_argument("--gdv", default="gdvj30+")
+    ap.add_argument("--primary", help="enable quota on this partition")
+    ap.add_argument("--max-primary", type=int, default=2)
+    ap.add_argument("--fallback")
+    ap.add_argument("--no-wait-slot", action="store_true",
+                    help="fail a job when every partition is full instead of retrying it")
+    ap.add_argument("--policy", help="partition policy (quota-first/fastest-start/cheapest)")
+    ap.add_argument("--candidates", help="comma-separated partitions for --policy")
+    ap.add_argument("--costs", help="partition costs for --policy cheapest, e.g. short=1,medium=2 "
+                                    "(default: $GAUSSKIT_PARTITION_COSTS)")
+    ap.add_argument("--predict", action="store_true", help="predict cores/walltime from finished logs")
+    ap.add_argument("--order", default="fifo", choices=list(ORDER_POLICIES))
+    ap.add_argument("--local-cores", type=int)
+    ap.add_argument("--no-restart", action="store_true", help="do not restart walltime-exhausted jobs")
+    ap.add_argument("--max-restarts", type=int, default=3)
+    ap.add_argument("--fix", action="store_true", help="auto-fix failed jobs and resubmit")
+    ap.add_argument("--max-retries", type=int, default=3)
+    ap.add_argument("--no-lint", action="store_true", help="submit inputs even if `gausskit lint` fails them")
+    ap.add_argument("--metrics", nargs="?", const=METRICS_FILE, metavar="PATH",
+                    help=f"record scheduler metrics (default file: {METRICS_FILE}; "
+                         "also $GAUSSKIT_METRICS)")
+    ap.add_argument("--attach", action="store_true", help="follow the workflow until it finishes")
+    return ap
+
+
+def submit_options(args):
+    """Options dict for the daemon from parsed `gausskit submit` args (defaults left out)."""
+    opts = {
+        "backend": args.backend, "nproc": args.nproc, "time": args.time,
+        "partition": args.partition, "gdv": args.gdv, "primary": args.primary,
+        "max_primary": args.max_primary, "fallback": args.fallback,
+        "wait_slot": not args.no_wait_slot, "policy": args.policy,
+        "candidates": [p.strip() for p in args.candidates.split(",")] if args.candidates else None,
+        "costs": (parse_costs(args.costs) if args.costs else env_costs()) or None,
+        "predict": args.predict, "order": args.order, "local_cores": args.local_cores,
+        "restart": not args.no_restart, "max_restarts": args.max_restarts,
+        "fix": args.fix, "max_retries": args.max_retries, "lint": not args.no_lint,
+        "metrics": os.path.abspath(args.metrics) if args.metrics else metrics_path(),
+    }
+    return {k: v for k, v in opts.items() if v != OPTIONS[k][1]}
+
+
+def submit(mode, bases, options, cwd=None, attach=False):
+    """Send a workflow to the daemon (starting it if needed).  Returns the reply."""
+    if not start_daemon():
+        return {"ok": False, "error": "daemon unavailable"}
+    reply = call({"op": "submit", "cwd": os.path.abspath(cwd or os.getcwd()),
+                  "mode": mode, "bases": bases, "options": options})
+    if reply.get("busy"):
+        print(f"ℹ️ Already scheduled, left out: {', '.join(reply['busy'])}")
+    if not reply.get("ok"):
+        print(f"❌ {reply.get('error')}")
+        return reply
+    print(f"✅ {reply['workflow']}: {len(reply['jobs'])} job(s) handed to the scheduler daemon "
+          f"(gausskit status {reply['workflow']})")
+    if attach:
+        _attach(reply["workflow"])
+    return reply
+
+
+def client_main(cmd, argv=None):
+    """`gausskit submit|status|cancel|attach|daemon …`"""
+    argv = list(sys.argv[2:] if argv is None else argv)
+    if cmd == "submit":
+        args = _submit_parser().parse_args(argv)
+        if args.chain:
+            mode, bases = "chain", [b.removesuffix(".com") for b in args.chain]
+        elif args.inputs:
+            mode = "single" if len(args.inputs) == 1 else "batch"
+            bases = [b.removesuffix(".com") for b in args.inputs]
+        elif args.batch:
+            mode, bases = "batch", []
+        else:
+            _submit_parser().error("give .com files, --batch or --chain GS ES FC")
+        try:
+            options = submit_options(args)
+        except ValueError as e:
+            _submit_parser().error(str(e))
+        return 0 if submit(mode, bases, options, attach=args.attach).get("ok") else 1
+
+    if cmd == "daemon":
+        ap = argparse.ArgumentParser(prog="gausskit daemon")
+        ap.add_argument("action", choices=["start", "stop", "run", "status"], nargs="?", default="status")
+        ap.add_argument("--poll", type=float, default=POLL_INTERVAL, help="seconds between polls")
+        args = ap.parse_args(argv)
+        if args.action == "run":
+            return run_daemon(args.poll)
+        if args.action == "start":
+            if start_daemon(args.poll):
+                print(f"🛰️ Scheduler daemon running (log: {daemon_log_path()})")
+                return 0
+            return 1
+        if not daemon_running():
+            print("ℹ️ No scheduler daemon running.")
+            return 0 if args.action == "stop" else 1
+        if args.action == "stop":
+            call({"op": "stop"})
+            print("👋 Scheduler daemon stopping; queued jobs stay in the journal.")
+            return 0
+        pid = call({"op": "ping"}).get("pid")
+        print(f"🛰️ Scheduler daemon running (pid {pid}, socket {socket_path()})")
+        return 0
+
+    if not daemon_running():
+        print("ℹ️ No scheduler daemon running (start one with `gausskit daemon start` or `gausskit submit`).")
+        return 1
+    if cmd == "status":
+        ap = argparse.ArgumentParser(prog="gausskit status")
+        ap.add_argument("workflow", nargs="?")
+        ap.add_argument("--all", action="store_true", help="include finished workflows")
+        args = ap.parse_args(argv)
+        _print_status(call({"op": "status", "workflow": args.workflow, "all": args.all}))
+        return 0
+    if cmd == "cancel":
+        ap = argparse.ArgumentParser(prog="gausskit cancel")
+        ap.add_argument("targets", nargs="+", help="workflow (wfN), job name, or backend job ID")
+        args = ap.parse_args(argv)
+        reply = call({"op": "cancel", "targets": [t.removesuffix(".com") for t in args.targets],
+                      "cwd": os.getcwd()})
+        if not reply.get("ok"):
+            print("ℹ️ Nothing to cancel.")
+            return 1
+        print(f"🛑 Cancelled {', '.join(reply['cancelled'])}")
+        return 0
+    if cmd == "attach":
+        ap = argparse.ArgumentParser(prog="gausskit attach")
+        ap.add_argument("workflow", nargs="?", help="stop when this workflow finishes")
+        args = ap.parse_args(argv)
+        return _attach(args.workflow)
+    print(f"❌ Unknown command {cmd!r}")
+    return 1
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(client_main(sys.argv[1], sys.argv[2:]))
+    sys.exit(client_main("daemon", ["status"]))
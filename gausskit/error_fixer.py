@@ -1,12 +1,14 @@
 import yaml
 import datetime
+import hashlib
 import re
 import sys
 from pathlib import Path
 import subprocess
 import os
 from gausskit.utils import MultiPathCompleter
-from .utils import prompt_and_submit
+from .utils import prompt_and_submit, fmt_bytes
+from .comfile import parse_input
 from prompt_toolkit import prompt
 
 
@@ -44,15 +46,168 @@ def batch_fix_and_report():
 
 
 
-def load_error_db():
-    yaml_path = Path(__file__).parent / "gaussian_errors.yaml"
+ERROR_DB_PATH = Path(__file__).parent / "gaussian_errors.yaml"
+
+_db_cache = {}      # yaml path → (sha1 of its bytes, parsed db, ErrorMatcher or None)
+
+
+def load_error_db(yaml_path=ERROR_DB_PATH):
+    """
+    Parsed gaussian_errors.yaml.  Parsed once per process and reused until
+    the file's content (sha1) changes, so batch loops can call it freely.
+    """
+    yaml_path = Path(yaml_path)
     if not yaml_path.exists():
         raise FileNotFoundError(f"YAML error DB not found at: {yaml_path}")
-    with open(yaml_path, "r") as f:
-        return yaml.safe_load(f)
+    raw = yaml_path.read_bytes()
+    digest = hashlib.sha1(raw).hexdigest()
+    cached = _db_cache.get(yaml_path)
+    if cached and cached[0] == digest:
+        return cached[1]
+    db = yaml.safe_load(raw.decode())
+    _db_cache[yaml_path] = (digest, db, None)
+    return db
 
 
-def extract_log_content(log_path, tail_bytes=10000):
+_LITERAL = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+
+def _required_literal(pattern):
+    """
+    Longest lowercased substring every match of `pattern` must contain ('' if
+    none is certain).  Alternation, {m,n} counts, (?…) groups/flags and
+    escapes inside [...] are not modelled: such patterns get no prefilter.
+    """
+    if "|" in pattern or "{" in pattern or "(?" in pattern or re.search(r"\)[?*]", pattern):
+        return ""
+    runs, cur, i = [], "", 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\" and i + 1 < len(pattern):
+            nxt = pattern[i + 1]
+            if nxt.isalnum():       # \s, \d, \b … are not literal characters
+                runs.append(cur)
+                cur = ""
+            else:
+                cur += nxt
+            i += 2
+            continue
+        if c in "*?":               # the previous character is optional
+            runs.append(cur[:-1])
+            cur = ""
+        elif c == "[":
+            runs.append(cur)
+            cur = ""
+            end = pattern.find("]", i + 2)
+            if end < 0 or "\\" in pattern[i:end]:
+                return ""
+            i = end
+        elif c in ".^$+()":
+            runs.append(cur)
+            cur = ""
+        else:
+            cur += c
+        i += 1
+    runs.append(cur)
+    return max(runs, key=len).lower()
+
+
+class ErrorMatcher:
+    """
+    All `error_patterns` of an error DB compiled for a single pass over a log:
+    literal patterns become case-folded substring tests; the regex ones are
+    prefiltered by a literal they must contain and the survivors searched
+    with one alternation holding a named group per distinct pattern.  A
+    pattern shared by several entries is tested once.  Gives the same result
+    as searching every pattern separately with re.IGNORECASE.
+    """
+
+    def __init__(self, db):
+        self.entries = []           # (link, name, props) in DB order
+        self.literals = {}          # lowercased literal → entry indices
+        self.regexes = {}           # group name → (pattern, compiled, required literal, entry indices)
+        self._combined = {}         # groups → combined alternation (None: cannot combine)
+        by_pattern = {}
+        for link, errors in (db or {}).items():
+            for name, props in (errors or {}).items():
+                idx = len(self.entries)
+                self.entries.append((link, name, props))
+                for pat in (props or {}).get("error_patterns") or []:
+                    by_pattern.setdefault(pat, []).append(idx)
+        for pat, idxs in by_pattern.items():
+            if not _LITERAL.search(pat):
+                self.literals.setdefault(pat.lower(), []).extend(idxs)
+            else:
+                group = f"p{len(self.regexes)}"
+                self.regexes[group] = (pat, re.compile(pat, re.IGNORECASE), _required_literal(pat), idxs)
+
+    def _alternation(self, groups):
+        if groups not in self._combined:
+            try:
+                self._combined[groups] = re.compile(
+                    "|".join(f"(?P<{g}>{self.regexes[g][0]})" for g in groups), re.IGNORECASE)
+            except re.error:
+                self._combined[groups] = None
+        return self._combined[groups]
+
+    def matched_entries(self, text):
+        """Indices (into self.entries) of every entry with a pattern found in `text`."""
+        found = set()
+        low = text.lower()
+        for lit, idxs in self.literals.items():
+            if lit in low:
+                found.update(idxs)
+        groups = tuple(g for g, (_, _, need, _) in self.regexes.items() if need in low)
+        if not groups:
+            return found
+        combined = self._alternation(groups)
+        if combined is None:
+            for g in groups:
+                if self.regexes[g][1].search(text):
+                    found.update(self.regexes[g][3])
+            return found
+        pending = set(groups)
+        for m in combined.finditer(text):
+            if m.lastgroup in pending:
+                pending.discard(m.lastgroup)
+                found.update(self.regexes[m.lastgroup][3])
+            # alternatives that also match at or inside this span are shadowed
+            # by the winning one: try them anchored there
+            for g in list(pending):
+                rx = self.regexes[g][1]
+                if any(rx.match(text, i) for i in range(m.start(), max(m.end(), m.start() + 1))):
+                    pending.discard(g)
+                    found.update(self.regexes[g][3])
+            if not pending:
+                break
+        return found
+
+    def match(self, text):
+        """[(link, error name, fix, notes)] in DB order, as match_errors returns."""
+        return [(link, name, props["fix"], props["notes"])
+                for link, name, props in (self.entries[i] for i in sorted(self.matched_entries(text)))]
+
+
+def error_matcher(db=None):
+    """Compiled ErrorMatcher for `db` (default: gaussian_errors.yaml), cached with the parsed DB."""
+    if db is None:
+        db = load_error_db()
+    for path, (digest, cached_db, matcher) in _db_cache.items():
+        if cached_db is db:
+            if matcher is None:
+                matcher = ErrorMatcher(db)
+                _db_cache[path] = (digest, db, matcher)
+            return matcher
+    return ErrorMatcher(db)
+
+
+def extract_log_content(log_path, tail_bytes=None):
+    """
+    The part of a log to match errors in: the adaptive window of
+    extract_log_window(), or the last `tail_bytes` bytes if given.
+    """
+    if tail_bytes is None:
+        return extract_log_window(log_path)[0]
     with open(log_path, "rb") as f:
         try:
             f.seek(-tail_bytes, os.SEEK_END)
@@ -61,77 +216,124 @@ def extract_log_content(log_path, tail_bytes=10000):
         tail = f.read().decode(errors="ignore")
     return tail
 
+
+def extract_log_window(log_path, min_bytes=2048, anchor_bytes=16384, max_bytes=262144, matcher=None):
+    """
+    Read a log backwards in doubling chunks (`min_bytes`, 2×, 4×, …) until
+    the last 'Error termination' / 'Normal termination' line is in the
+    window.  After a normal termination that is enough; after an error the
+    window keeps growing until some error_patterns entry matches, or
+    `max_bytes`.  Without any termination line the search stops at
+    `anchor_bytes` (a running or killed job).
+    Returns (text, window) with window = {'start', 'bytes', 'anchor', 'reason'}.
+    """
+    matcher = matcher or error_matcher()
+    with open(log_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        pos, buf, step = size, b"", min_bytes
+        anchor, reason = None, "start of file"
+        while pos > 0:
+            limit = max_bytes if anchor else anchor_bytes
+            start = max(pos - min(step, max(limit - len(buf), min_bytes)), 0)
+            f.seek(start)
+            buf = f.read(pos - start) + buf
+            pos = start
+            step *= 2
+            if anchor is None:
+                err, ok = buf.rfind(b"Error termination"), buf.rfind(b"Normal termination")
+                if err < 0 and ok < 0:
+                    if len(buf) >= anchor_bytes:
+                        reason = "no termination line"
+                        break
+                    continue
+                anchor = "Error termination" if err > ok else "Normal termination"
+                if anchor == "Normal termination":
+                    reason = "normal termination"
+                    break
+            if matcher.matched_entries(buf.decode(errors="ignore")):
+                reason = "error matched"
+                break
+            if len(buf) >= max_bytes:
+                reason = "size limit"
+                break
+    return buf.decode(errors="ignore"), {"start": pos, "bytes": size - pos, "anchor": anchor, "reason": reason}
+
 #def extract_log_content(log_path):
 #    with open(log_path, "r", errors="ignore") as f:
 #        return f.read()
 
-def match_errors(log_text, error_db):
-    matched_errors = []
-    for link, errors in error_db.items():
-        for name, props in errors.items():
-            for pattern in props["error_patterns"]:
-                if re.search(pattern, log_text, re.IGNORECASE):
-                    matched_errors.append((link, name, props["fix"], props["notes"]))
-                    break
-    return matched_errors
+def match_errors(log_text, error_db=None):
+    """[(link, error name, fix, notes)] for every DB entry with a pattern in `log_text`."""
+    return error_matcher(error_db).match(log_text)
 
 
-def apply_fixes(input_file: str, fix_dict: dict) -> str:
+def fix_ladder(props):
     """
-    Apply SCF / route fixes to every Gaussian route line (#P).
-    Returns the path to the backup file.
+    Fixes to try for one error entry, mildest first: its `fix`, then each
+    step of its optional `escalation` list.  Steps that change nothing in
+    the route are left out.
     """
-    path = Path(input_file)
-    orig_lines = path.read_text().splitlines()
-    new_lines = []
+    steps = [props.get("fix") or {}] + list(props.get("escalation") or [])
+    return [s for s in steps if s.get("keywords_to_add") or s.get("keywords_to_remove")]
 
+
+def fix_route_lines(lines, fix_dict, log=print):
+    """
+    `lines` with the fix's keywords removed from / merged into the route of
+    every --Link1-- step (any #/#P/#N/#T route, over any number of lines).
+    Returns (new lines, whether a route was found); `log` receives the
+    per-keyword messages.
+    """
     kws_remove = fix_dict.get("keywords_to_remove", [])
     kws_add    = fix_dict.get("keywords_to_add", [])
+    doc = parse_input("\n".join(lines) + "\n")
+    found_route = False
+    for n, step in enumerate(doc.jobs, start=1):
+        route = step.route
+        if route is None:
+            continue
+        found_route = True
+        log(f"\n🎯 Route of step {n}: {route}")
+
+        # 1) Remove unwanted keywords / options
+        for kw in kws_remove:
+            if route.remove(kw):
+                log(f"   ❌ Removed '{kw}'")
+            else:
+                log(f"   ⚠️ Remove-keyword not found: '{kw}'")
+
+        # 2) Merge additions into the keyword tree
+        for kw in kws_add:
+            if route.add(kw):
+                log(f"   ➕ Added '{kw}'")
+            else:
+                log(f"   ℹ️ Skip add (already present): '{kw}'")
+
+    return doc.dumps()[:-1].split("\n"), found_route
 
-    # match any line that starts with '#' then 'p' (case-insensitive), e.g. "#P", "#p"
-    route_re = re.compile(r'^\s*#\s*p', re.IGNORECASE)
 
-    found_route = False
+def apply_fixes(input_file: str, fix_dict: dict) -> str:
+    """
+    Apply SCF / route fixes to the route of every step.
+    Returns the path to the backup file.
+    """
+    path = Path(input_file)
+    orig_lines = path.read_text().splitlines()
 
     print(f"🔍 Starting fixes in {input_file!r}")
-    for idx, ln in enumerate(orig_lines, start=1):
-        if route_re.match(ln):
-            found_route = True
-            print(f"\n🎯 Route line {idx}: {ln}")
-
-            # 1) Remove unwanted keywords (in-line, not whole line)
-            for kw in kws_remove:
-                if re.search(re.escape(kw), ln, re.IGNORECASE):
-                    ln = re.sub(re.escape(kw), '', ln, flags=re.IGNORECASE)
-                    print(f"   ❌ Removed '{kw}'")
-                else:
-                    print(f"   ⚠️ Remove-keyword not found: '{kw}'")
-
-            # collapse multiple spaces into one, split to tokens
-            tokens = ln.split()
-            # 2) Inject additions if missing
-            for kw in kws_add:
-                if not any(tok.lower() == kw.lower() for tok in tokens):
-                    tokens.append(kw)
-                    print(f"   ➕ Added '{kw}'")
-                else:
-                    print(f"   ℹ️ Skip add (already present): '{kw}'")
-
-            # rebuild line
-            ln = " ".join(tokens)
-
-        new_lines.append(ln)
+    new_lines, found_route = fix_route_lines(orig_lines, fix_dict)
 
     if not found_route:
-        print("⚠️ No route lines (#P) found – nothing injected.")
+        print("⚠️ No route section found – nothing injected.")
         return ""
 
-    # 3) Backup and write
+    # 3) Backup and write (keep the final newline: Gaussian needs the closing blank line)
     bak = input_file + ".bak"
-    Path(bak).write_text("\n".join(orig_lines))
+    Path(bak).write_text("\n".join(orig_lines) + "\n")
     print(f"\n🛡️ Backup saved to {bak}")
 
-    path.write_text("\n".join(new_lines))
+    path.write_text("\n".join(new_lines) + "\n")
     print(f"✅ Wrote fixed file: {input_file}")
 
     return bak
@@ -140,7 +342,8 @@ def apply_fixes(input_file: str, fix_dict: dict) -> str:
 
 def fix_and_report(logfile, comfile, resubmit=False):
     db = load_error_db()
-    log_text = extract_log_content(logfile)
+    log_text, window = extract_log_window(logfile)
+    print(f"🔎 Searched the last {fmt_bytes(window['bytes'])} of {logfile} ({window['reason']}).")
     matches = match_errors(log_text, db)
 
     if not matches:
@@ -151,7 +354,23 @@ def fix_and_report(logfile, comfile, resubmit=False):
     for link, err, fix, notes in matches:
         print(f"🔗 [{link}] {err}\n🧠 {notes.strip()}\n")
 
-    first_fix = matches[0][2]
+    link, err, first_fix, _ = matches[0]
+
+    # Prefer the fix (or escalation step) with the best track record here
+    from .fixdb import default_history, describe_fix
+    hist = default_history()
+    ladder = fix_ladder(db[link][err])
+    if hist and ladder:
+        hist.resolve_pending()
+        best = hist.best_fix(link, err, ladder)
+        if best is None:
+            print(f"⛔ Every known fix for [{link}] {err} has failed "
+                  f"{hist.give_up_after}+ times without success — not applying one.")
+            first_fix = {}
+        else:
+            if best is not ladder[0]:
+                print(f"📊 Fix history favours: {describe_fix(best)}")
+            first_fix = best
     
     # Skip fix if no meaningful changes required
     if (
@@ -163,6 +382,8 @@ def fix_and_report(logfile, comfile, resubmit=False):
     else:
         backup = apply_fixes(comfile, first_fix)
         print(f"\n✅ Applied fix. Backup saved to {backup}")
+        if hist and backup:
+            hist.record_applied(link, err, first_fix, os.path.splitext(comfile)[0])
     
 #    first_fix = matches[0][2]
 #    backup = apply_fixes(comfile, first_fix)
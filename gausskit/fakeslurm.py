@@ -0,0 +1,765 @@
+# gausskit/fakeslurm.py
+"""
+Local stand-in for SLURM and Gaussian, for testing and benchmarking the
+scheduler without a cluster.
+
+Emulated commands: squeue, sinfo, sbatch, scancel, sacct, Hgbatch, gsub.
+`install_shims(bin_dir)` writes small executables with those names that
+call `python -m gausskit.fakeslurm <cmd> …`; put `bin_dir` first on PATH
+and every `subprocess.run(["squeue", …])` in GaussKit talks to the fake.
+
+State lives in a JSON file under `$GAUSSKIT_FAKESLURM_DIR` (default
+`./.fakeslurm`), guarded by an flock.  The queue advances lazily on every
+command: pending jobs start after their partition's start delay when a
+node is free, running jobs finish after their (simulated) runtime and a
+fake Gaussian writes a realistic log ending in Normal termination, an
+error from `gaussian_errors.yaml`, or a truncated tail on TIMEOUT (the
+slurmstepd notice goes to `<input>.com.qlog`, as on the cluster).  A
+detached `tick` process keeps the clock moving while jobs are active.
+
+Configuration (`config.json` in the state dir, see DEFAULT_CONFIG):
+  partitions     : {name: {"nodes", "time_limit", "start_delay", "cpus"}}
+  max_user_jobs  : {partition: N}  → sbatch rejected with a QOS error above N
+  runtime        : [min, max] simulated seconds per job
+  error_rate     : fraction of jobs that end in Error termination
+  time_scale     : simulated seconds per real second
+
+Fake Gaussian for the local backend (`gausskit.backends.LocalBackend`):
+    python -m gausskit.fakeslurm g16 [--runtime MIN MAX] < name.com > name.log
+
+Benchmark harness:
+    python -m gausskit.fakeslurm bench --jobs 10 100 1000
+"""
+
+import argparse
+import contextlib
+import fcntl
+import getpass
+import json
+import os
+import random
+import re
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+COMMANDS = ("squeue", "sinfo", "sbatch", "scancel", "sacct", "Hgbatch", "gsub")
+
+DEFAULT_CONFIG = {
+    "partitions": {
+        "medium": {"nodes": 8, "time_limit": "1-00:00:00", "start_delay": 2},
+        "short": {"nodes": 4, "time_limit": "06:00:00", "start_delay": 1},
+        "test": {"nodes": 2, "time_limit": "01:00:00", "start_delay": 0},
+    },
+    "default_partition": "medium",
+    "max_user_jobs": {},
+    "runtime": [5, 30],
+    "error_rate": 0.0,
+    "time_scale": 1.0,
+    "seed": None,
+}
+
+_ERROR_TAILS = [
+    (" Convergence failure -- run terminated.\n", "l502.exe"),
+    (" Linear angle in Bend.\n FormBX had a problem.\n", "l103.exe"),
+    (" Problem with the distance matrix.\n Small interatomic distances encountered.\n", "l202.exe"),
+]
+
+
+def state_dir():
+    return Path(os.environ.get("GAUSSKIT_FAKESLURM_DIR", ".fakeslurm")).resolve()
+
+
+def _to_seconds(text):
+    from .partition import parse_slurm_time
+    return parse_slurm_time(text)
+
+
+def _fmt_elapsed(sec):
+    sec = max(int(sec), 0)
+    d, rem = divmod(sec, 86400)
+    h, rem = divmod(rem, 3600)
+    m, s = divmod(rem, 60)
+    return f"{d}-{h:02d}:{m:02d}:{s:02d}" if d else f"{h:02d}:{m:02d}:{s:02d}"
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%dT%H:%M:%S") if ts else "Unknown"
+
+
+# ── state handling ────────────────────────────────────────────────────────────
+
+class FakeCluster:
+    """The simulated queue.  Use as a context manager to hold the state lock."""
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else state_dir()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.state_path = self.root / "state.json"
+        self.config_path = self.root / "config.json"
+        self._lock = None
+        self.state = None
+        self.config = None
+
+    def __enter__(self):
+        self._lock = open(self.root / "state.lock", "w")
+        fcntl.flock(self._lock, fcntl.LOCK_EX)
+        self.config = dict(DEFAULT_CONFIG)
+        if self.config_path.exists():
+            self.config.update(json.loads(self.config_path.read_text()))
+        if self.state_path.exists():
+            self.state = json.loads(self.state_path.read_text())
+        else:
+            self.state = {"next_id": 1000, "epoch": time.time(), "jobs": {}}
+        self.advance()
+        return self
+
+    def __exit__(self, *exc):
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.state))
+        os.replace(tmp, self.state_path)
+        fcntl.flock(self._lock, fcntl.LOCK_UN)
+        self._lock.close()
+
+    # simulated clock
+    def now(self):
+        epoch = self.state["epoch"]
+        return epoch + (time.time() - epoch) * float(self.config.get("time_scale", 1.0))
+
+    def partition(self, name):
+        return self.config["partitions"].get(name)
+
+    # ---- queue dynamics ----
+    def advance(self):
+        now = self.now()
+        jobs = sorted(self.state["jobs"].values(), key=lambda j: j["id"])
+        # finish running jobs
+        for job in jobs:
+            if job["state"] == "RUNNING":
+                limit = job["time_limit"]
+                if limit and now - job["start"] >= limit and job["runtime"] > limit:
+                    self._finish(job, job["start"] + limit, "TIMEOUT")
+                elif now - job["start"] >= job["runtime"]:
+                    outcome = "FAILED" if job["fail"] else "COMPLETED"
+                    self._finish(job, job["start"] + job["runtime"], outcome)
+        # start pending jobs in FIFO order where nodes are free
+        running = {}
+        for job in jobs:
+            if job["state"] == "RUNNING":
+                running[job["partition"]] = running.get(job["partition"], 0) + 1
+        for job in jobs:
+            if job["state"] != "PENDING":
+                continue
+            part = self.partition(job["partition"]) or {}
+            delay = float(part.get("start_delay", 0))
+            if now - job["submit"] < delay:
+                continue
+            if running.get(job["partition"], 0) >= int(part.get("nodes", 1)):
+                continue
+            job["state"] = "RUNNING"
+            job["start"] = now
+            running[job["partition"]] = running.get(job["partition"], 0) + 1
+            write_fake_log(job, finished=False)
+
+    def _finish(self, job, end, outcome):
+        job["state"] = outcome
+        job["end"] = end
+        write_fake_log(job, finished=True)
+
+    def submit(self, name, partition, time_limit, workdir, com, log, nproc=1, user=None):
+        part = self.partition(partition)
+        if part is None:
+            return None, f"sbatch: error: invalid partition specified: {partition}"
+        cap = self.config.get("max_user_jobs", {}).get(partition)
+        user = user or getpass.getuser()
+        active = [j for j in self.state["jobs"].values()
+                  if j["partition"] == partition and j["user"] == user
+                  and j["state"] in ("PENDING", "RUNNING")]
+        if cap is not None and len(active) >= int(cap):
+            return None, ("sbatch: error: QOSMaxSubmitJobPerUserLimit\n"
+                          "sbatch: error: Batch job submission failed: "
+                          "Job violates accounting/QOS policy (job submit limit, user's size and/or time limits)")
+        req = _to_seconds(time_limit) if time_limit else None
+        plimit = _to_seconds(part.get("time_limit"))
+        if req and plimit and req > plimit:
+            return None, "sbatch: error: Batch job submission failed: Requested time limit is invalid (missing or exceeds some limit)"
+
+        rng = random.Random(self.config.get("seed"))
+        if self.config.get("seed") is not None:
+            rng.seed(f"{self.config['seed']}-{self.state['next_id']}")
+        lo, hi = self.config.get("runtime", [5, 30])
+        jid = self.state["next_id"]
+        self.state["next_id"] += 1
+        self.state["jobs"][str(jid)] = {
+            "id": jid, "name": name, "user": user, "partition": partition,
+            "state": "PENDING", "submit": self.now(), "start": None, "end": None,
+            "time_limit": req or plimit, "runtime": rng.uniform(lo, hi),
+            "fail": rng.random() < float(self.config.get("error_rate", 0.0)),
+            "workdir": str(workdir), "com": com, "log": log, "nproc": int(nproc),
+        }
+        self.ensure_ticker()
+        return jid, ""
+
+    def active(self):
+        return any(j["state"] in ("PENDING", "RUNNING") for j in self.state["jobs"].values())
+
+    def ensure_ticker(self):
+        """
+        Make sure a background `tick` process is advancing the queue, so jobs
+        start and finish even when nobody calls squeue (e.g. log polling).
+        """
+        pidfile = self.root / "ticker.pid"
+        try:
+            os.kill(int(pidfile.read_text()), 0)
+            return
+        except (OSError, ValueError):
+            pass
+        env = dict(os.environ, GAUSSKIT_FAKESLURM_DIR=str(self.root))
+        pkg_root = str(Path(__file__).resolve().parent.parent)
+        env["PYTHONPATH"] = pkg_root + (os.pathsep + env["PYTHONPATH"] if env.get("PYTHONPATH") else "")
+        proc = subprocess.Popen([sys.executable, "-m", "gausskit.fakeslurm", "tick"],
+                                env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL, start_new_session=True)
+        pidfile.write_text(str(proc.pid))
+
+    def cancel(self, jid):
+        job = self.state["jobs"].get(str(jid))
+        if job and job["state"] in ("PENDING", "RUNNING"):
+            job["state"] = "CANCELLED"
+            job["end"] = self.now()
+            return True
+        return False
+
+
+# ── fake Gaussian ─────────────────────────────────────────────────────────────
+
+def _read_route(com_path):
+    try:
+        lines = Path(com_path).read_text(errors="ignore").splitlines()
+    except OSError:
+        return "#p b3lyp/6-31g(d) sp", [], 3
+    link0 = [L.strip() for L in lines if L.strip().startswith('%')]
+    route = next((L.strip() for L in lines if L.strip().startswith('#')), "#p sp")
+    natoms = 0
+    for i, L in enumerate(lines):
+        if re.match(r'^\s*[-+]?\d+\s+\d+\s*$', L):
+            for A in lines[i + 1:]:
+                if not A.strip():
+                    break
+                natoms += 1
+            break
+    return route, link0, natoms or 3
+
+
+def write_fake_log(job, finished):
+    """Write (or complete) the Gaussian-like log for `job`."""
+    log = Path(job["workdir"]) / job["log"]
+    com = Path(job["workdir"]) / job["com"]
+    if not finished:
+        route, link0, natoms = _read_route(com)
+        nbasis = natoms * 15
+        dash = " " + "-" * max(len(route), 20)
+        body = [" Entering Gaussian System, Link 0=g16", f" Input={job['com']}", f" Output={job['log']}"]
+        body += [f" {L}" for L in link0]
+        body += [f" Will use up to {job['nproc']:4d} processors via shared memory.",
+                 dash, f" {route}", dash,
+                 f" NAtoms= {natoms:6d} NQM= {natoms:8d} NQMF=       0 NMMI=      0 NMMIF=      0",
+                 f"   {nbasis:4d} basis functions,  {nbasis * 3:5d} primitive gaussians,  {nbasis:5d} cartesian basis functions",
+                 ""]
+        log.write_text("\n".join(body) + "\n")
+        return
+
+    runtime = (job["end"] or job["start"]) - job["start"]
+    tail = []
+    if job["state"] == "TIMEOUT":
+        # killed mid-run: no termination line at all
+        tail.append(" Step number  12 out of a maximum of 100")
+        qlog = Path(job["workdir"]) / f"{job['com']}.qlog"
+        with open(qlog, "a") as f:
+            f.write(f"slurmstepd: error: *** JOB {job['id']} ON fake-node CANCELLED AT "
+                    f"{_iso(job['end'])} DUE TO TIME LIMIT ***\n")
+    else:
+        tail.append(" SCF Done:  E(RB3LYP) =  -76.4089533421     A.U. after   10 cycles")
+        cpu = runtime * job["nproc"] * 0.9
+
+        def _t(sec):
+            d, rem = divmod(sec, 86400)
+            h, rem = divmod(rem, 3600)
+            m, s = divmod(rem, 60)
+            return f"{int(d)} days {int(h):2d} hours {int(m):2d} minutes {s:4.1f} seconds."
+        stamp = datetime.fromtimestamp(job["end"]).strftime("%a %b %d %H:%M:%S %Y")
+        if job["state"] == "FAILED":
+            msg, link = _ERROR_TAILS[job["id"] % len(_ERROR_TAILS)]
+            tail.append(msg.rstrip("\n"))
+            tail.append(f" Error termination via Lnk1e in /fake/g16/{link} at {stamp}.")
+        tail.append(f" Job cpu time:       {_t(cpu)}")
+        tail.append(f" Elapsed time:       {_t(runtime)}")
+        if job["state"] == "COMPLETED":
+            tail.append(f" Normal termination of Gaussian 16 at {stamp}.")
+    if log.exists():
+        with open(log, "a") as f:
+            f.write("\n".join(tail) + "\n")
+
+
+def fake_gaussian(argv=None):
+    """
+    Stand-in for `g16 < name.com > name.log` on a workstation: read the
+    input on stdin, stream a Gaussian-like log to stdout, sleep a random
+    runtime, then end in Normal or Error termination (exit status 0 / 1).
+    """
+    ap = argparse.ArgumentParser(prog="python -m gausskit.fakeslurm g16")
+    ap.add_argument("--runtime", type=float, nargs=2, default=[1.0, 3.0], metavar=("MIN", "MAX"))
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    a = ap.parse_args(argv)
+    text = sys.stdin.read()
+    with tempfile.TemporaryDirectory(prefix="gausskit-fakeg16-") as tmp:
+        (Path(tmp) / "input.com").write_text(text)
+        job = {"id": os.getpid(), "workdir": tmp, "com": "input.com", "log": "input.log",
+               "nproc": int(os.environ.get("GAUSS_PDEF", "1")), "state": "RUNNING",
+               "start": time.time(), "end": None}
+        log = Path(tmp) / "input.log"
+        write_fake_log(job, finished=False)
+        sys.stdout.write(log.read_text())
+        sys.stdout.flush()
+        size = log.stat().st_size
+        time.sleep(random.uniform(*a.runtime))
+        failed = random.random() < a.error_rate
+        job["state"], job["end"] = ("FAILED" if failed else "COMPLETED"), time.time()
+        write_fake_log(job, finished=True)
+        with open(log) as f:
+            f.seek(size)
+            sys.stdout.write(f.read())
+    return 1 if failed else 0
+
+
+# ── command emulation ─────────────────────────────────────────────────────────
+
+_SQUEUE_CODES = {
+    "i": lambda j: str(j["id"]), "P": lambda j: j["partition"], "j": lambda j: j["name"],
+    "u": lambda j: j["user"], "t": lambda j: {"PENDING": "PD", "RUNNING": "R"}[j["state"]],
+    "T": lambda j: j["state"], "S": lambda j: _iso(j["start"]) if j["start"] else "N/A",
+    "M": lambda j: _fmt_elapsed(j["_now"] - j["start"]) if j["start"] else "0:00",
+    "D": lambda j: "1", "C": lambda j: str(j["nproc"]),
+}
+
+
+def _render(fmt, codes, obj):
+    return re.sub(r'%\.?\d*([A-Za-z])',
+                  lambda m: codes[m.group(1)](obj) if m.group(1) in codes else m.group(0), fmt)
+
+
+def cmd_squeue(argv, cl):
+    ap = argparse.ArgumentParser(prog="squeue", add_help=False)
+    ap.add_argument("-u", "--user")
+    ap.add_argument("-p", "--partition")
+    ap.add_argument("-t", "--states")
+    ap.add_argument("-j", "--jobs")
+    ap.add_argument("-h", "--noheader", action="store_true")
+    ap.add_argument("-o", "--format")
+    ap.add_argument("--start", action="store_true")
+    a, _ = ap.parse_known_args(argv)
+    states = {"PD": "PENDING", "R": "RUNNING", "PENDING": "PENDING", "RUNNING": "RUNNING"}
+    want = {states.get(s.upper(), s.upper()) for s in a.states.split(",")} if a.states else {"PENDING", "RUNNING"}
+    ids = set(a.jobs.split(",")) if a.jobs else None
+    parts = set(a.partition.split(",")) if a.partition else None
+    fmt = a.format or ("%i %P %j %u %t %S" if a.start else "%i %P %j %u %t %M %D")
+    out = []
+    if not a.noheader:
+        out.append("JOBID PARTITION NAME USER ST TIME NODES")
+    for j in sorted(cl.state["jobs"].values(), key=lambda j: j["id"]):
+        if j["state"] not in want:
+            continue
+        if a.user and j["user"] != a.user:
+            continue
+        if parts and j["partition"] not in parts:
+            continue
+        if ids and str(j["id"]) not in ids:
+            continue
+        j = dict(j, _now=cl.now())
+        if a.start and j["state"] == "PENDING":
+            j["start"] = j["submit"] + float((cl.partition(j["partition"]) or {}).get("start_delay", 0))
+        out.append(_render(fmt, _SQUEUE_CODES, j))
+    print("\n".join(out))
+    return 0
+
+
+def cmd_sinfo(argv, cl):
+    ap = argparse.ArgumentParser(prog="sinfo", add_help=False)
+    ap.add_argument("-h", "--noheader", action="store_true")
+    ap.add_argument("-o", "--format")
+    ap.add_argument("-p", "--partition")
+    a, _ = ap.parse_known_args(argv)
+    fmt = a.format or "%P %a %l %D %t"
+    busy = {}
+    for j in cl.state["jobs"].values():
+        if j["state"] == "RUNNING":
+            busy[j["partition"]] = busy.get(j["partition"], 0) + 1
+    out = [] if a.noheader else ["PARTITION AVAIL TIMELIMIT NODES STATE"]
+    default = cl.config.get("default_partition")
+    for name, p in cl.config["partitions"].items():
+        if a.partition and name != a.partition:
+            continue
+        used = min(busy.get(name, 0), int(p["nodes"]))
+        cpus = int(p.get("cpus", 56))
+        for st, n in (("alloc", used), ("idle", int(p["nodes"]) - used)):
+            if n <= 0:
+                continue
+            codes = {"P": lambda _, n=name: n + ("*" if n == default else ""),
+                     "R": lambda _, n=name: n, "a": lambda _: "up",
+                     "l": lambda _, p=p: p.get("time_limit", "infinite"),
+                     "D": lambda _, n=n: str(n), "t": lambda _, s=st: s,
+                     "T": lambda _, s=st: s,
+                     "C": lambda _, s=st, n=n: (f"{n * cpus}/0/0/{n * cpus}" if s == "alloc"
+                                                else f"0/{n * cpus}/0/{n * cpus}")}
+            out.append(_render(fmt, codes, None))
+    print("\n".join(out))
+    return 0
+
+
+def _parse_sbatch_script(text):
+    opts = {}
+    for L in text.splitlines():
+        m = re.match(r'^#SBATCH\s+(--?[\w-]+)(?:[= ]\s*(\S+))?', L)
+        if m:
+            opts[m.group(1)] = m.group(2)
+    m = re.search(r'<\s*(\S+\.(?:com|gjf))\s*>&?\s*(\S+)', text)
+    com, log = (m.group(1), m.group(2)) if m else (None, None)
+    return opts, com, log
+
+
+def cmd_sbatch(argv, cl):
+    parsable = "--parsable" in argv
+    args = [a for a in argv if a != "--parsable"]
+    script = None
+    cli = {}
+    i = 0
+    while i < len(args):
+        a = args[i]
+        if a.startswith("-"):
+            if "=" in a:
+                k, v = a.split("=", 1)
+                cli[k] = v
+            elif i + 1 < len(args):
+                cli[a] = args[i + 1]
+                i += 1
+        else:
+            script = a
+        i += 1
+    text = Path(script).read_text() if script else sys.stdin.read()
+    opts, com, log = _parse_sbatch_script(text)
+    opts.update(cli)
+    part = opts.get("-p") or opts.get("--partition") or cl.config["default_partition"]
+    tl = opts.get("--time") or opts.get("-t")
+    name = opts.get("-J") or opts.get("--job-name") or (Path(script).stem if script else "sbatch")
+    nproc = opts.get("--ntasks") or opts.get("-n") or 1
+    if com is None:
+        com, log = f"{name}.com", f"{name}.log"
+    jid, err = cl.submit(name, part, tl, os.getcwd(), com, log, nproc=nproc)
+    if jid is None:
+        print(err, file=sys.stderr)
+        return 1
+    print(jid if parsable else f"Submitted batch job {jid}")
+    return 0
+
+
+def _cmd_wrapper(argv, cl, prog):
+    """Hgbatch / gsub: -n NPROC -p PART -t TIME [--gdv X] file.com"""
+    ap = argparse.ArgumentParser(prog=prog, add_help=False)
+    ap.add_argument("-n", default="1")
+    ap.add_argument("-p", default=cl.config["default_partition"])
+    ap.add_argument("-t", default=None)
+    ap.add_argument("--gdv", default=None)
+    ap.add_argument("com")
+    a, _ = ap.parse_known_args(argv)
+    base = os.path.splitext(a.com)[0]
+    jid, err = cl.submit(os.path.basename(base), a.p, a.t, os.getcwd(), a.com, f"{base}.log", nproc=a.n)
+    if jid is None:
+        print(err, file=sys.stderr)
+        return 1
+    print(f"Submitted batch job {jid}")
+    return 0
+
+
+def cmd_scancel(argv, cl):
+    rc = 0
+    for jid in argv:
+        if jid.startswith("-"):
+            continue
+        if not cl.cancel(jid):
+            print(f"scancel: error: Kill job error on job id {jid}: Invalid job id specified", file=sys.stderr)
+            rc = 1
+    return rc
+
+
+def cmd_sacct(argv, cl):
+    ap = argparse.ArgumentParser(prog="sacct", add_help=False)
+    ap.add_argument("-j", "--jobs")
+    ap.add_argument("-o", "--format", default="JobID,JobName,Partition,State,Elapsed")
+    ap.add_argument("-n", "--noheader", action="store_true")
+    ap.add_argument("-P", "--parsable2", action="store_true")
+    ap.add_argument("-X", "--allocations", action="store_true")
+    ap.add_argument("-u", "--user")
+    a, _ = ap.parse_known_args(argv)
+    fields = [f.split("%")[0] for f in a.format.split(",")]
+    ids = set(a.jobs.split(",")) if a.jobs else None
+    now = cl.now()
+    getters = {
+        "JobID": lambda j: str(j["id"]), "JobName": lambda j: j["name"],
+        "Partition": lambda j: j["partition"], "State": lambda j: j["state"],
+        "User": lambda j: j["user"],
+        "Elapsed": lambda j: _fmt_elapsed(((j["end"] or now) - j["start"]) if j["start"] else 0),
+        "Submit": lambda j: _iso(j["submit"]), "Start": lambda j: _iso(j["start"]),
+        "End": lambda j: _iso(j["end"]), "Timelimit": lambda j: _fmt_elapsed(j["time_limit"] or 0),
+        "ExitCode": lambda j: "0:0" if j["state"] == "COMPLETED" else "1:0",
+    }
+    sep = "|" if a.parsable2 else " "
+    out = [] if a.noheader else [sep.join(fields)]
+    for j in sorted(cl.state["jobs"].values(), key=lambda j: j["id"]):
+        if ids and str(j["id"]) not in ids:
+            continue
+        if a.user and j["user"] != a.user:
+            continue
+        out.append(sep.join(getters.get(f, lambda _: "")(j) for f in fields))
+    print("\n".join(out))
+    return 0
+
+
+HANDLERS = {
+    "squeue": cmd_squeue, "sinfo": cmd_sinfo, "sbatch": cmd_sbatch, "scancel": cmd_scancel,
+    "sacct": cmd_sacct, "Hgbatch": lambda a, c: _cmd_wrapper(a, c, "Hgbatch"),
+    "gsub": lambda a, c: _cmd_wrapper(a, c, "gsub"),
+}
+
+
+def tick_loop(interval=0.1):
+    """Advance the fake queue until no job is pending or running."""
+    root = state_dir()
+    while True:
+        with FakeCluster(root) as cl:
+            busy = cl.active()
+        if not busy:
+            with contextlib.suppress(OSError):
+                (root / "ticker.pid").unlink()
+            return 0
+        time.sleep(interval)
+
+
+def run_command(name, argv):
+    with FakeCluster() as cl:
+        return HANDLERS[name](argv, cl)
+
+
+def install_shims(bin_dir, python=None):
+    """
+    Write executables named like the SLURM commands into `bin_dir`.
+    Returns the directory; prepend it to PATH to activate the fake cluster.
+    """
+    bin_dir = Path(bin_dir)
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    python = python or sys.executable
+    pkg_root = Path(__file__).resolve().parent.parent
+    for name in COMMANDS:
+        path = bin_dir / name
+        path.write_text(
+            "#!/bin/sh\n"
+            f'PYTHONPATH="{pkg_root}${{PYTHONPATH:+:$PYTHONPATH}}" '
+            f'exec "{python}" -m gausskit.fakeslurm {name} "$@"\n'
+        )
+        path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return bin_dir
+
+
+def write_config(root=None, **overrides):
+    """Write `config.json` for the fake cluster (DEFAULT_CONFIG + overrides)."""
+    root = Path(root) if root else state_dir()
+    root.mkdir(parents=True, exist_ok=True)
+    cfg = dict(DEFAULT_CONFIG)
+    cfg.update(overrides)
+    (root / "config.json").write_text(json.dumps(cfg, indent=2))
+    return cfg
+
+
+@contextlib.contextmanager
+def fake_cluster_env(workdir=None, **config):
+    """
+    Context manager: fresh fake cluster + shims on PATH, cwd = `workdir`
+    (a temp dir if None).  Restores PATH/cwd/env on exit.
+    """
+    tmp = None
+    if workdir is None:
+        tmp = tempfile.mkdtemp(prefix="gausskit-fakeslurm-")
+        workdir = tmp
+    workdir = Path(workdir).resolve()
+    root = workdir / ".fakeslurm"
+    shutil.rmtree(root, ignore_errors=True)
+    write_config(root, **config)
+    bin_dir = install_shims(root / "bin")
+    old_env = {k: os.environ.get(k) for k in ("PATH", "GAUSSKIT_FAKESLURM_DIR", "XDG_RUNTIME_DIR")}
+    old_cwd = os.getcwd()
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"
+    os.environ["GAUSSKIT_FAKESLURM_DIR"] = str(root)
+    os.environ["XDG_RUNTIME_DIR"] = str(root)     # private shared-squeue cache
+    os.chdir(workdir)
+    try:
+        yield workdir
+    finally:
+        os.chdir(old_cwd)
+        for k, v in old_env.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+# ── benchmark harness ─────────────────────────────────────────────────────────
+
+_BENCH_COM = """%chk={name}.chk
+#p b3lyp/6-31g(d) sp
+
+bench {name}
+
+0 1
+O   0.000000   0.000000   0.117300
+H   0.000000   0.757160  -0.469200
+H   0.000000  -0.757160  -0.469200
+
+"""
+
+
+class _PollTimer:
+    """Stand-in for the `time` module inside scheduler: counts sleeps."""
+
+    def __init__(self):
+        self.sleep_total = 0.0
+        self.sleeps = 0
+
+    def sleep(self, sec):
+        self.sleeps += 1
+        self.sleep_total += sec
+        time.sleep(sec)
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def bench_batch(n_jobs, poll_interval=0.5, runtime=(0.5, 2.0), nodes=64, quiet=True):
+    """
+    Run GaussianJobScheduler.run_batch on `n_jobs` inputs against the fake
+    cluster.  Returns a dict of timings.
+    """
+    from . import scheduler as sched_mod
+    with fake_cluster_env(runtime=list(runtime), time_scale=1.0,
+                          partitions={"medium": {"nodes": nodes, "time_limit": "1-00:00:00",
+                                                 "start_delay": 0}}) as wd:
+        for k in range(n_jobs):
+            (wd / f"job{k:04d}.com").write_text(_BENCH_COM.format(name=f"job{k:04d}"))
+        sched = sched_mod.GaussianJobScheduler(None, None, None, poll_interval=poll_interval,
+                                               submit_cmd="Hgbatch")
+        timer = _PollTimer()
+        real_time, real_submit = sched_mod.time, sched.submit_job
+        submit_times = []
+
+        def timed_submit(base):
+            t = time.perf_counter()
+            jid = real_submit(base)
+            submit_times.append(time.perf_counter() - t)
+            return jid
+
+        sched.submit_job = timed_submit
+        sched_mod.time = timer
+        out = open(os.devnull, "w") if quiet else sys.stdout
+        t0 = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(out):
+                sched.run_batch()
+        finally:
+            sched_mod.time = real_time
+            if quiet:
+                out.close()
+        total = time.perf_counter() - t0
+        submit_total = sum(submit_times)
+        wait_total = total - submit_total
+        polls = max(timer.sleeps, 1)
+        return {
+            "jobs": n_jobs,
+            "makespan_s": total,
+            "submit_throughput_jobs_per_s": n_jobs / submit_total if submit_total else float("inf"),
+            "polls": timer.sleeps,
+            "poll_overhead_s": max(wait_total - timer.sleep_total, 0.0),
+            "poll_overhead_per_poll_ms": max(wait_total - timer.sleep_total, 0.0) / polls * 1000,
+        }
+
+
+def bench_chain(poll_interval=0.5, runtime=(0.5, 1.0), quiet=True):
+    """Time from GS/ES completion to FC submission in a GS→ES→FC chain."""
+    from . import scheduler as sched_mod
+    with fake_cluster_env(runtime=list(runtime), time_scale=1.0) as wd:
+        for name in ("gs", "es", "fc"):
+            (wd / f"{name}.com").write_text(_BENCH_COM.format(name=name))
+        sched = sched_mod.GaussianJobScheduler("gs", "es", "fc", poll_interval=poll_interval,
+                                               submit_cmd="Hgbatch")
+        out = open(os.devnull, "w") if quiet else sys.stdout
+        try:
+            with contextlib.redirect_stdout(out):
+                sched.run_chain()
+        finally:
+            if quiet:
+                out.close()
+        with FakeCluster(wd / ".fakeslurm") as cl:
+            jobs = {j["name"]: j for j in cl.state["jobs"].values()}
+            epoch, scale = cl.state["epoch"], float(cl.config.get("time_scale", 1.0))
+        ready = max(jobs["gs"]["end"], jobs["es"]["end"])
+        latency = (jobs["fc"]["submit"] - ready) / scale
+        return {"time_to_next_stage_s": latency, "poll_interval_s": poll_interval,
+                "epoch": epoch}
+
+
+def run_benchmark(sizes=(10, 100, 1000), poll_interval=0.5):
+    rows = []
+    for n in sizes:
+        print(f"⏱️  Batch of {n} jobs …")
+        r = bench_batch(n, poll_interval=poll_interval)
+        rows.append(r)
+        print(f"   makespan {r['makespan_s']:.1f}s | submit {r['submit_throughput_jobs_per_s']:.1f} jobs/s | "
+              f"{r['polls']} polls, overhead {r['poll_overhead_per_poll_ms']:.1f} ms/poll")
+    c = bench_chain(poll_interval=poll_interval)
+    print(f"⏱️  Chain time-to-next-stage: {c['time_to_next_stage_s']:.2f}s "
+          f"(poll interval {poll_interval}s)")
+    return rows, c
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] in HANDLERS:
+        return run_command(argv[0], argv[1:])
+    if argv and argv[0] == "tick":
+        return tick_loop()
+    if argv and argv[0] == "g16":
+        return fake_gaussian(argv[1:])
+    ap = argparse.ArgumentParser(prog="python -m gausskit.fakeslurm",
+                                 description="Fake SLURM/Gaussian for testing the GaussKit scheduler.")
+    sub = ap.add_subparsers(dest="action")
+    b = sub.add_parser("bench", help="Measure scheduler throughput against the fake cluster.")
+    b.add_argument("--jobs", type=int, nargs="+", default=[10, 100, 1000])
+    b.add_argument("--poll", type=float, default=0.5)
+    s = sub.add_parser("shims", help="Write fake SLURM executables into a directory.")
+    s.add_argument("bin_dir")
+    args = ap.parse_args(argv)
+    if args.action == "bench":
+        run_benchmark(args.jobs, args.poll)
+    elif args.action == "shims":
+        print(install_shims(args.bin_dir))
+    else:
+        ap.print_help()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
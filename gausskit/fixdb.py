@@ -0,0 +1,205 @@
+# gausskit/fixdb.py
+"""
+Fix-success history: which gaussian_errors.yaml fixes actually worked for us.
+
+Every fix applied to an input (scheduler retry loop, `gausskit handle`,
+`gausskit triage --fix`) is recorded in a local SQLite store together with
+the error it addressed.  Its outcome is filled in lazily from the job's log:
+once <input>.log is newer than the fix and terminated, the attempt counts
+as a success (with time-to-success = log mtime − fix time) or a failure.
+
+`rank_fixes()` orders an error's candidate fixes (its `fix` and
+`escalation` steps) by smoothed success rate (ok+1)/(n+2), then median
+time-to-success, then their order in the YAML; a fix that failed
+`give_up_after` times without ever succeeding is dropped, so retries that
+are bound to fail stop costing compute.
+
+    gausskit fixes [--error TEXT]     # success table per error and fix
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import time
+from pathlib import Path
+
+from .checkpoints import job_state
+from .metrics import _fmt
+
+DEFAULT_FIX_DB = Path(os.environ.get("GAUSSKIT_FIX_DB",
+                                     os.path.expanduser("~/.cache/gausskit/fix_history.sqlite")))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fixes (
+    id       INTEGER PRIMARY KEY,
+    link     TEXT NOT NULL,
+    error    TEXT NOT NULL,
+    fix      TEXT NOT NULL,     -- canonical JSON of the fix step
+    input    TEXT NOT NULL,     -- absolute input base (no .com)
+    jobid    TEXT,
+    applied  REAL NOT NULL,
+    outcome  TEXT,              -- NULL while pending, 'ok' / 'failed'
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS fixes_error ON fixes (link, error);
+CREATE INDEX IF NOT EXISTS fixes_pending ON fixes (outcome, input);
+"""
+
+
+def fix_key(fix):
+    """Canonical text of a fix step (the keys that change an input)."""
+    return json.dumps({k: sorted(fix.get(k) or []) for k in
+                       ("keywords_to_add", "keywords_to_remove", "lines_to_replace")}, sort_keys=True)
+
+
+def describe_fix(fix):
+    """'+kw -kw' summary of a fix step."""
+    return " ".join([f"+{k}" for k in fix.get("keywords_to_add") or []] +
+                    [f"-{k}" for k in fix.get("keywords_to_remove") or []]) or "(no change)"
+
+
+class FixHistory:
+    def __init__(self, path=DEFAULT_FIX_DB, give_up_after=5):
+        self.path = Path(path)
+        self.give_up_after = give_up_after
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+
+    def _connect(self):
+        # one short-lived connection per call: safe across threads and processes
+        db = sqlite3.connect(self.path, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def record_applied(self, link, error, fix, input_base, jobid=None, applied=None):
+        """Log that `fix` was applied to `input_base` for (link, error) at `applied` (default: now)."""
+        self.record_many([(link, error, fix, input_base, jobid, applied)])
+
+    def record_many(self, rows):
+        """record_applied for many (link, error, fix, input base, jobid, applied) rows in one transaction."""
+        now = time.time()
+        with self._connect() as db:
+            db.executemany("INSERT INTO fixes (link, error, fix, input, jobid, applied) VALUES (?,?,?,?,?,?)",
+                           [(l, e, fix_key(f), os.path.abspath(b), j, t or now) for l, e, f, b, j, t in rows])
+
+    def resolve_pending(self, inputs=None):
+        """
+        Fill in outcomes of pending attempts whose log has terminated since
+        the fix.  `inputs`: only these input bases.  Returns the number resolved.
+        """
+        with self._connect() as db:
+            rows = db.execute("SELECT id, input, applied FROM fixes WHERE outcome IS NULL").fetchall()
+            wanted = {os.path.abspath(b) for b in inputs} if inputs is not None else None
+            done = 0
+            for rid, base, applied in rows:
+                if wanted is not None and base not in wanted:
+                    continue
+                log = f"{base}.log"
+                try:
+                    mtime = os.path.getmtime(log)
+                except OSError:
+                    continue
+                if mtime < applied:
+                    continue
+                state = job_state(base)
+                if state in ("ok", "failed"):
+                    db.execute("UPDATE fixes SET outcome=?, finished=? WHERE id=?", (state, mtime, rid))
+                    done += 1
+        return done
+
+    def stats(self, link=None, error=None):
+        """{(link, error, fix key): {'n', 'ok', 'failed', 'pending', 'tts'}} (tts: seconds to success)."""
+        sql, args = "SELECT link, error, fix, outcome, applied, finished FROM fixes", []
+        if link is not None:
+            sql += " WHERE link=? AND error=?"
+            args = [link, error]
+        out = {}
+        with self._connect() as db:
+            for l, e, fix, outcome, applied, finished in db.execute(sql, args):
+                s = out.setdefault((l, e, fix), {"n": 0, "ok": 0, "failed": 0, "pending": 0, "tts": []})
+                if outcome is None:
+                    s["pending"] += 1
+                    continue
+                s["n"] += 1
+                s[outcome] += 1
+                if outcome == "ok":
+                    s["tts"].append(finished - applied)
+        return out
+
+    def best_fix(self, link, error, candidates):
+        """The top-ranked candidate, or None when every candidate has been given up on."""
+        ranked = self.rank_fixes(link, error, candidates)
+        return ranked[0] if ranked else None
+
+    def rank_fixes(self, link, error, candidates):
+        """
+        `candidates` (fix steps, YAML order) best first, without fixes that
+        failed give_up_after times and never succeeded.
+        """
+        stats = {fix: s for (_, _, fix), s in self.stats(link, error).items()}
+
+        def key(item):
+            pos, fix = item
+            s = stats.get(fix_key(fix))
+            if not s:
+                return (-0.5, float("inf"), pos)
+            rate = (s["ok"] + 1) / (s["n"] + 2)
+            tts = statistics.median(s["tts"]) if s["tts"] else float("inf")
+            return (-rate, tts, pos)
+
+        ranked = []
+        for pos, fix in sorted(enumerate(candidates), key=key):
+            s = stats.get(fix_key(fix))
+            if s and not s["ok"] and s["failed"] >= self.give_up_after:
+                continue
+            ranked.append(fix)
+        return ranked
+
+
+_default = None
+
+
+def default_history():
+    """Process-wide FixHistory on DEFAULT_FIX_DB, or None if the store cannot be opened."""
+    global _default
+    if _default is None:
+        try:
+            _default = FixHistory()
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️ Fix history unavailable ({e}); using the YAML fix order.")
+            _default = False
+    return _default or None
+
+
+def fixes_cli(argv=None):
+    ap = argparse.ArgumentParser(prog="gausskit fixes",
+                                 description="Success rate of each error fix applied so far.")
+    ap.add_argument("--error", help="only errors whose name contains this text")
+    ap.add_argument("--db", default=str(DEFAULT_FIX_DB), help=f"history file [{DEFAULT_FIX_DB}]")
+    args = ap.parse_args(argv)
+
+    hist = FixHistory(args.db)
+    hist.resolve_pending()
+    rows = [(k, s) for k, s in hist.stats().items()
+            if not args.error or args.error.lower() in k[1].lower()]
+    if not rows:
+        print("ℹ️ No fixes recorded yet.")
+        return 0
+    rows.sort(key=lambda r: (r[0][0], r[0][1], -(r[1]["ok"] + 1) / (r[1]["n"] + 2)))
+    last = None
+    for (link, error, fix), s in rows:
+        if (link, error) != last:
+            print(f"🔗 [{link}] {error}")
+            last = (link, error)
+        rate = f"{100 * s['ok'] / s['n']:.0f}%" if s["n"] else "—"
+        tts = _fmt(statistics.median(s["tts"]) if s["tts"] else None)
+        print(f"   {describe_fix(json.loads(fix)):<45} {s['ok']:>3}/{s['n']:<3} ok {rate:>5}  "
+              f"median time-to-success {tts:>7}" + (f"  ({s['pending']} pending)" if s["pending"] else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(fixes_cli())
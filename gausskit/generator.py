@@ -6,6 +6,7 @@ from prompt_toolkit.completion import WordCompleter
 from prompt_toolkit.completion import WordCompleter, PathCompleter
 from gausskit.completions import tab_autocomplete_prompt, HybridCompleter
 from gausskit.utils import safe_float_input, add_modredundant_to_opt
+from gausskit.comfile import read_input
 
 def read_xyz_file(xyz_path):
     """Reads XYZ coordinates with flexible delimiters and optional atomic index column."""
@@ -394,50 +395,22 @@ def create_default_fc_input(gs_base: str, es_base: str) -> str:
     """
     Read gs_base.com and es_base.com, extract:
       - oldchk  ← from es_base %chk=
-      - route   ← from es_base “#P …”
-      - charge, mult ← from es_base first “X Y” line
+      - charge, mult ← from es_base charge/multiplicity line
+    (each input parsed once with gausskit.comfile)
     and write es_base_fc.com → es_base_fc.chk
     Returns the FC base name (without .com).
     """
 
-    def extract_chk(com_path):
-        with open(com_path) as f:
-            for L in f:
-                L = L.strip()
-                if L.lower().startswith('%chk='):
-                    return L.split('=',1)[1]
-        # fallback
-        return os.path.splitext(com_path)[0] + '.chk'
-
-    def extract_route(com_path):
-        with open(com_path) as f:
-            for L in f:
-                if L.lower().startswith('#p'):
-                    return L.strip()[2:].strip()
-        raise RuntimeError(f"No route line (#P) in {com_path}")
-
-    def extract_charge_mult(com_path):
-        with open(com_path) as f:
-            lines = [l.rstrip() for l in f]
-        # skip headers, find title then next nonblank = charge multiplicity
-        seen_title = False
-        for L in lines:
-            if not L.startswith(('%', '#')) and L.strip():
-                if not seen_title:
-                    seen_title = True
-                else:
-                    parts = L.split()
-                    if len(parts) >= 2:
-                        return parts[0], parts[1]
-        return "0", "1"
-
-    gs_com = gs_base + '.com'
-    es_com = es_base + '.com'
-
-    oldchk_GS = extract_chk(gs_com)
-    oldchk_ES = extract_chk(es_com)
-    route = extract_route(es_com)
-    charge, mult = extract_charge_mult(es_com)
+    gs = read_input(gs_base + '.com')
+    es = read_input(es_base + '.com')
+    gs_step, es_step = gs.jobs[0], es.jobs[0]
+    if es_step.route is None:
+        raise RuntimeError(f"No route section in {es_base}.com")
+
+    oldchk_GS = gs_step.link0.get('chk') or gs_base + '.chk'
+    oldchk_ES = es_step.link0.get('chk') or es_base + '.chk'
+    mol = es_step.molecule
+    charge, mult = (mol.charge, mol.mult) if mol else ("0", "1")
 
     fc_base = f"{es_base}_fc"
     fc_com  = fc_base + '.com'
@@ -0,0 +1,539 @@
+# gausskit/lint.py
+"""
+Pre-submission linter for Gaussian inputs.
+
+gaussian_errors.yaml tells us why jobs died; most of its L1/L101/L301
+entries are input mistakes that can be seen before the job ever reaches
+the queue.  Each check here is registered with `@lint_check(name)`; a DB
+entry names the check that predicts it with a `lint:` key (a name, or a
+mapping {check: name, …parameters}), so every finding is reported with the
+Gaussian error it would have caused and that entry's notes.
+
+Checks (per --Link1-- step):
+  layout               route / title / charge-multiplicity blocks present
+  terminating_blank    the molecule (and every later section) ends with a
+                       blank line
+  atomic_symbols       every atom is a known element, ghost or dummy
+  no_atoms             a molecule is given unless geom=check/allcheck
+  charge_multiplicity  multiplicity possible for the electron count
+  route_conflicts      keyword pairs Gaussian refuses (sp + freq, …)
+  chk_path             the %Chk directory exists and is writable
+  oldchk               checkpoints read (%OldChk, guess=read, geom=check,
+                       FC body lines) exist and are readable, or are
+                       written by an earlier step or another input of the
+                       same batch
+  gen_basis            gen/genecp comes with a basis footer
+  gen_ecp              genecp comes with an ECP block
+  modredundant         ModRedundant lines only with opt=modredundant
+
+`lint_inputs()` lints many files on a thread pool; `scheduler.submit_job`,
+`run_batch` and `utils.submit_job` / `bulk_submit` refuse inputs with errors.
+
+    gausskit lint [files/dirs…] [-r] [--jobs N] [--strict] [--json]
+"""
+
+import argparse
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from .checkpoints import READS_OWN_CHK, resolve_chk
+from .generator import periodic_table
+
+LINT_CHECKS = {}
+
+_Z = {s.lower(): z for z, s in enumerate(periodic_table) if s}
+_GHOSTS = {"bq", "x", "xx", "tv", "gh"}
+
+_CM_RE = re.compile(r"^\s*[-+]?\d+\s+\d+(\s+[-+]?\d+\s+\d+)*\s*$")
+# B/A/D/L/X/O + atom indices (or *) + optional action letter and numbers
+_MODRED_RE = re.compile(
+    r"^\s*(?:[BADLXO]\s+)?(?:(?:\d+|\*)\s+)*(?:\d+|\*)(?:\s+[FARBKSDH](?:\s+[-+]?[\d.]+)*)?\s*$", re.I)
+_ROUTE_SPLIT = re.compile(r"\s+(?![^()]*\))")
+
+
+def lint_check(name):
+    """Register a check: fn(step, ctx, **params) yielding (level, line, message)."""
+    def deco(fn):
+        LINT_CHECKS[name] = fn
+        return fn
+    return deco
+
+
+class LintIssue:
+    def __init__(self, path, line, level, check, message, link=None, error=None, note=None):
+        self.path = path
+        self.line = line
+        self.level = level          # error / warning
+        self.check = check
+        self.message = message
+        self.link = link            # gaussian_errors.yaml entry it predicts
+        self.error = error
+        self.note = note
+
+    def to_dict(self):
+        return {k: getattr(self, k) for k in
+                ("path", "line", "level", "check", "message", "link", "error", "note")}
+
+
+_rules = None
+
+
+def lint_rules():
+    """{check name: (link, error name, notes, params)} from gaussian_errors.yaml (loaded once)."""
+    global _rules
+    if _rules is None:
+        from .error_fixer import load_error_db
+        rules = {}
+        for link, errors in (load_error_db() or {}).items():
+            for name, entry in (errors or {}).items():
+                spec = (entry or {}).get("lint")
+                if not spec:
+                    continue
+                params = dict(spec) if isinstance(spec, dict) else {"check": spec}
+                check = params.pop("check")
+                note = (entry.get("notes") or "").strip().splitlines()
+                rules[check] = (link, name, note[0] if note else None, params)
+        _rules = rules
+    return _rules
+
+
+# ── parsing ─────────────────────────────────────────────────────────────────
+
+class Step:
+    """One --Link1-- step of an input; line numbers are 1-based file lines."""
+
+    def __init__(self, index):
+        self.index = index
+        self.link0 = {}             # key → (line, value)
+        self.route = ""
+        self.route_line = None
+        self.words = {}             # keyword → option string ('' if none)
+        self.basis = None           # basis after method/…
+        self.title = None           # (line, [lines]) or None
+        self.cm = None              # (line, charge, mult) or None
+        self.cm_block = None        # first line of the block expected to hold charge/mult
+        self.atoms = []             # (line, first token)
+        self.stray = []             # (line, text) ModRedundant-looking lines inside the geometry
+        self.sections = []          # (line, [lines]) after the molecule
+        self.terminated = True      # ends with a blank line
+        self.empty = False
+
+    def option(self, keyword, prefix):
+        """True when `keyword` carries an option starting with `prefix` (opt=(modred,…))."""
+        opts = self.words.get(keyword)
+        return bool(opts) and any(o.startswith(prefix) for o in re.split(r"[(),=\s]+", opts) if o)
+
+    @property
+    def geom_mode(self):
+        geom = self.words.get("geom", "")
+        if "allcheck" in geom or "allchk" in geom:
+            return "allcheck"
+        return "check" if "check" in geom or "chk" in geom else None
+
+
+def _route_words(route):
+    text = re.sub(r"^#[pnt]?\s*", "", route.strip(), flags=re.I).lower()
+    words, basis = {}, None
+    for tok in _ROUTE_SPLIT.split(text):
+        if not tok:
+            continue
+        if "/" in tok and not tok.startswith(("iop", "(")):
+            method, basis = tok.split("/", 1)
+            words.setdefault(method, "")
+            words.setdefault(basis, "")
+            continue
+        m = re.match(r"([a-z0-9+\-*]+)\s*(.*)", tok)
+        if m:
+            words[m.group(1)] = m.group(2).lstrip("=")
+    return words, basis
+
+
+def _blocks(numbered):
+    """Split (line, text) pairs into blank-separated blocks."""
+    blocks, cur = [], []
+    for n, L in numbered:
+        if L.strip():
+            cur.append((n, L.rstrip()))
+        elif cur:
+            blocks.append(cur)
+            cur = []
+    if cur:
+        blocks.append(cur)
+    return blocks
+
+
+def parse_steps(text):
+    """Split an input into Step objects (Link 0, route, title, charge/mult, atoms, sections)."""
+    steps, chunk = [], []
+    lines = text.splitlines()
+    for n, L in enumerate(lines + ["--link1--"], 1):
+        if L.strip().lower() == "--link1--":
+            steps.append(_parse_step(len(steps), chunk))
+            chunk = []
+        elif not L.lstrip().startswith("!"):
+            chunk.append((n, L))
+    steps = [s for s in steps if not s.empty]
+    for i, s in enumerate(steps):
+        s.index = i
+    return steps
+
+
+def _parse_step(index, numbered):
+    st = Step(index)
+    st.empty = not any(L.strip() for _, L in numbered)
+    st.terminated = bool(numbered) and not numbered[-1][1].strip()
+    i, n = 0, len(numbered)
+    while i < n and not numbered[i][1].strip().startswith("#"):
+        s = numbered[i][1].strip()
+        if s.startswith("%") and "=" in s:
+            key, val = s[1:].split("=", 1)
+            st.link0[key.strip().lower()] = (numbered[i][0], val.strip())
+        i += 1
+    if i < n:
+        st.route_line = numbered[i][0]
+        route = []
+        while i < n and numbered[i][1].strip():
+            route.append(numbered[i][1].strip())
+            i += 1
+        st.route = " ".join(route)
+        st.words, st.basis = _route_words(st.route)
+    blocks = _blocks(numbered[i:])
+    if not st.route:
+        return st
+    if st.geom_mode != "allcheck":
+        if blocks and not _CM_RE.match(blocks[0][0][1]):
+            st.title = (blocks[0][0][0], [L for _, L in blocks[0]])
+            blocks = blocks[1:]
+        if blocks:
+            st.cm_block = blocks[0][0][0]
+            first, rest = blocks[0][0], blocks[0][1:]
+            if _CM_RE.match(first[1]):
+                tok = first[1].split()
+                st.cm = (first[0], int(tok[0]), int(tok[1]))
+                for ln, L in rest:
+                    if L.strip().lower().startswith(("variables", "constants")):
+                        # Z-matrix variables may follow without a blank line
+                        break
+                    if _MODRED_RE.match(L) and not _is_atom_line(L):
+                        st.stray.append((ln, L.strip()))
+                    else:
+                        st.atoms.append((ln, L.split()[0]))
+            blocks = blocks[1:]
+    st.sections = [(b[0][0], [L for _, L in b]) for b in blocks]
+    return st
+
+
+def _is_atom_line(line):
+    """
+    Symbol (or atomic number) and three coordinates, integers allowed:
+    'B 1 2 3' is a boron atom, 'D 1 2 3 4' / 'A 1 2 3' are ModRedundant input.
+    """
+    tok = line.split()
+    return len(tok) >= 4 and all(re.match(r"^[-+]?[\d.]+(e[-+]?\d+)?$", t, re.I) for t in tok[-3:]) \
+        and element_z(tok[0]) is not None
+
+
+def element_z(token):
+    """Nuclear charge of a molecule-spec atom token (0 for ghosts/dummies), or None if unknown."""
+    low = token.strip().lower()
+    if low.isdigit():
+        return int(low) if int(low) < len(periodic_table) else None
+    m = re.match(r"^([a-z]+)", low)
+    if not m:
+        return None
+    if m.group(1) in _GHOSTS or "-bq" in low or low.startswith("bq"):
+        return 0
+    return _Z.get(m.group(1))
+
+
+def _is_modred(lines):
+    # after the molecule, bare indices ('1 2 3 4') are a dihedral, not atom 1 at (2, 3, 4)
+    return all(_MODRED_RE.match(L) for L in lines) and not any(_is_atom_line(L) and "." in L for L in lines)
+
+
+def _is_basis(lines):
+    return any("****" in L for L in lines) or any(L.strip().startswith("@") for L in lines)
+
+
+# ── checks ──────────────────────────────────────────────────────────────────
+
+@lint_check("layout")
+def check_layout(step, ctx):
+    if not step.route:
+        yield "error", None, f"step {step.index + 1}: no route section (# line)"
+        return
+    if step.geom_mode == "allcheck":
+        return
+    if step.title is None:
+        yield "error", step.cm_block or step.route_line, \
+            "no title section (missing blank line between route and title?)"
+    elif any(_CM_RE.match(L) for L in step.title[1][1:]):
+        yield "error", step.title[0], "charge/multiplicity line inside the title block " \
+                                      "(missing blank line after the title?)"
+        return
+    if step.cm is None:
+        yield "error", step.cm_block or step.title[0], "no charge/multiplicity line"
+    for ln, L in step.stray[:1]:
+        yield "error", ln, f"'{L}' inside the molecule block (missing blank line before ModRedundant input?)"
+
+
+@lint_check("terminating_blank")
+def check_terminating_blank(step, ctx):
+    if not step.route or step.terminated or step.geom_mode == "allcheck":
+        return
+    if step.cm and not step.sections:
+        yield "error", None, f"step {step.index + 1}: no blank line after the molecule specification"
+    elif step.sections:
+        yield "warning", None, f"step {step.index + 1} does not end with a blank line"
+
+
+@lint_check("atomic_symbols")
+def check_atomic_symbols(step, ctx):
+    for ln, tok in step.atoms:
+        if element_z(tok) is None:
+            yield "error", ln, f"unrecognized atomic symbol '{tok}'"
+
+
+@lint_check("no_atoms")
+def check_no_atoms(step, ctx):
+    if step.cm and not step.atoms and step.geom_mode is None:
+        yield "error", step.cm[0], "no atoms after the charge/multiplicity line and no geom=check"
+
+
+@lint_check("charge_multiplicity")
+def check_charge_multiplicity(step, ctx):
+    if not step.cm or not step.atoms:
+        return
+    zs = [element_z(tok) for _, tok in step.atoms]
+    if None in zs:
+        return
+    ln, charge, mult = step.cm
+    electrons = sum(zs) - charge
+    unpaired = mult - 1
+    if mult < 1 or electrons < 0:
+        yield "error", ln, f"charge {charge} / multiplicity {mult} impossible"
+    elif unpaired > electrons or (electrons - unpaired) % 2:
+        yield "error", ln, (f"{electrons} electrons (charge {charge}) cannot have multiplicity "
+                            f"{mult}; try {2 if electrons % 2 else 1}")
+
+
+@lint_check("route_conflicts")
+def check_route_conflicts(step, ctx, conflicts=()):
+    for pair in conflicts:
+        if all(w in step.words for w in pair):
+            yield "error", step.route_line, f"'{' + '.join(pair)}' cannot be combined in one route"
+
+
+@lint_check("chk_path")
+def check_chk_path(step, ctx):
+    if "chk" not in step.link0:
+        return
+    ln, val = step.link0["chk"]
+    d = os.path.dirname(resolve_chk(ctx.dir, val))
+    if not os.path.isdir(d):
+        yield "error", ln, f"%Chk directory does not exist: {d}"
+    elif not os.access(d, os.W_OK):
+        yield "error", ln, f"%Chk directory is not writable: {d}"
+
+
+@lint_check("oldchk")
+def check_oldchk(step, ctx):
+    reads = []
+    if "oldchk" in step.link0:
+        ln, val = step.link0["oldchk"]
+        reads.append((ln, "%OldChk", resolve_chk(ctx.dir, val)))
+    elif "chk" in step.link0 and READS_OWN_CHK.search(step.route):
+        ln, val = step.link0["chk"]
+        reads.append((ln, "%Chk (read by the route)", resolve_chk(ctx.dir, val)))
+    for ln, lines in step.sections:
+        for L in lines:
+            if L.strip().lower().endswith(".chk") and len(L.split()) == 1:
+                reads.append((ln, "checkpoint", resolve_chk(ctx.dir, L)))
+    for ln, what, path in reads:
+        if ctx.produced(path, step.index):
+            continue
+        if not os.path.exists(path):
+            yield "error", ln, f"{what} not found: {os.path.relpath(path, ctx.dir)}"
+        elif not os.access(path, os.R_OK):
+            yield "error", ln, f"{what} not readable: {os.path.relpath(path, ctx.dir)}"
+
+
+def _gen(step):
+    names = set(step.words) | ({step.basis} if step.basis else set())
+    return "genecp" if "genecp" in names else "gen" if "gen" in names else None
+
+
+@lint_check("gen_basis")
+def check_gen_basis(step, ctx):
+    if _gen(step) and not any(_is_basis(lines) for _, lines in step.sections):
+        yield "error", step.route_line, f"'{_gen(step)}' in the route but no basis set footer (****)"
+
+
+@lint_check("gen_ecp")
+def check_gen_ecp(step, ctx):
+    if _gen(step) != "genecp":
+        return
+    basis = [k for k, (_, lines) in enumerate(step.sections) if _is_basis(lines)]
+    # an @file include may hold the ECPs as well
+    included = basis and step.sections[basis[0]][1][0].lstrip().startswith("@")
+    if basis and basis[0] == len(step.sections) - 1 and not included:
+        yield "error", step.route_line, "'genecp' in the route but no ECP block after the basis footer"
+
+
+@lint_check("modredundant")
+def check_modredundant(step, ctx):
+    if not step.cm:
+        return
+    modred = [(ln, lines) for ln, lines in step.sections if _is_modred(lines)]
+    wanted = step.option("opt", "modred")
+    if modred and not wanted:
+        yield "error", modred[0][0], "ModRedundant lines but no opt=modredundant in the route"
+    elif wanted and not modred and not step.stray:
+        yield "warning", step.route_line, "opt=modredundant but no ModRedundant section"
+
+
+# ── driver ──────────────────────────────────────────────────────────────────
+
+class _Context:
+    def __init__(self, path, steps, writers, own=()):
+        self.path = path
+        self.dir = os.path.dirname(os.path.abspath(path))
+        self.writers = writers      # chk → number of pending inputs writing it
+        self.own = own
+        self.step_chks = [resolve_chk(self.dir, s.link0["chk"][1]) if "chk" in s.link0 else None
+                          for s in steps]
+
+    def produced(self, chk, step_index):
+        """Written by an earlier step of this input or by another input of the batch."""
+        return chk in self.step_chks[:step_index] or self.writers.get(chk, 0) > (chk in self.own)
+
+
+def _read(path):
+    with open(path, "r", errors="ignore") as f:
+        return parse_steps(f.read())
+
+
+def _writes(path, steps):
+    d = os.path.dirname(os.path.abspath(path))
+    return {resolve_chk(d, s.link0["chk"][1]) for s in steps if "chk" in s.link0}
+
+
+def lint_input(path, produced=(), steps=None, _writers=None):
+    """List of LintIssue for one input.  `produced`: checkpoints other pending jobs will write."""
+    try:
+        steps = steps if steps is not None else _read(path)
+    except OSError as e:
+        return [LintIssue(path, None, "error", "layout", f"cannot read input: {e}")]
+    if not steps:
+        return [LintIssue(path, None, "error", "layout", "empty input")]
+    rules = lint_rules()
+    if _writers is None:
+        ctx = _Context(path, steps, dict.fromkeys(produced, 1))
+    else:
+        ctx = _Context(path, steps, _writers, _writes(path, steps))
+    issues = []
+    for step in steps:
+        for name, check in LINT_CHECKS.items():
+            link, error, note, params = rules.get(name, (None, None, None, {}))
+            for level, line, msg in check(step, ctx, **params):
+                issues.append(LintIssue(path, line, level, name, msg, link, error, note))
+    return sorted(issues, key=lambda i: i.line or 0)
+
+
+def lint_inputs(paths, jobs=None):
+    """
+    Lint many inputs in parallel; a checkpoint written by one of them counts
+    as present for the others.  Returns {path: [LintIssue]} in input order.
+    """
+    paths = list(paths)
+    if not paths:
+        return {}
+    workers = min(jobs or os.cpu_count() or 4, len(paths))
+
+    def load(p):
+        try:
+            return _read(p)
+        except OSError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        parsed = list(ex.map(load, paths))
+        writes = [_writes(p, s) if s else set() for p, s in zip(paths, parsed)]
+        count = Counter(c for w in writes for c in w)
+        results = list(ex.map(lambda i: lint_input(paths[i], steps=parsed[i], _writers=count),
+                              range(len(paths))))
+    return dict(zip(paths, results))
+
+
+def has_errors(issues):
+    return any(i.level == "error" for i in issues)
+
+
+def print_issues(issues, root="."):
+    """Print one input's findings; returns True when it has errors."""
+    if not issues:
+        return False
+    for i in issues:
+        icon = "❌" if i.level == "error" else "⚠️"
+        where = f"{os.path.relpath(i.path, root)}" + (f":{i.line}" if i.line else "")
+        print(f"{icon} {where}: {i.message}")
+        if i.error:
+            hint = f" — {i.note}" if i.note else ""
+            print(f"     ↳ would fail in {i.link}: {i.error}{hint}")
+    return has_errors(issues)
+
+
+def lint_before_submit(coms, jobs=None):
+    """Lint inputs about to be submitted; prints findings, returns the set of inputs with errors."""
+    bad = set()
+    for com, issues in lint_inputs(coms, jobs).items():
+        if print_issues(issues):
+            bad.add(com)
+    if bad:
+        print(f"🚫 {len(bad)} input(s) failed the pre-submission lint and were not submitted "
+              f"(see `gausskit lint`).")
+    return bad
+
+
+def _collect(targets, recursive):
+    for t in targets:
+        if os.path.isdir(t):
+            walker = os.walk(t) if recursive else [(t, None, os.listdir(t))]
+            for root, _, files in walker:
+                for f in sorted(files):
+                    if f.endswith((".com", ".gjf")):
+                        yield os.path.join(root, f)
+        else:
+            yield t if os.path.exists(t) or t.endswith((".com", ".gjf")) else t + ".com"
+
+
+def lint_cli(argv=None):
+    ap = argparse.ArgumentParser(prog="gausskit lint",
+                                 description="Check Gaussian inputs for mistakes before they reach the queue.")
+    ap.add_argument("targets", nargs="*", default=["."], help=".com files or directories [default: .]")
+    ap.add_argument("-r", "--recursive", action="store_true")
+    ap.add_argument("--jobs", type=int, default=None, help="parallel workers [CPU count]")
+    ap.add_argument("--strict", action="store_true", help="warnings also fail")
+    ap.add_argument("--json", action="store_true", help="print findings as JSON")
+    args = ap.parse_args(argv)
+
+    paths = list(dict.fromkeys(_collect(args.targets, args.recursive)))
+    results = lint_inputs(paths, args.jobs)
+    failed = [p for p, iss in results.items()
+              if has_errors(iss) or (args.strict and iss)]
+    if args.json:
+        print(json.dumps({p: [i.to_dict() for i in iss] for p, iss in results.items()}, indent=2))
+    else:
+        for p, iss in results.items():
+            print_issues(iss)
+        n_warn = sum(1 for iss in results.values() for i in iss if i.level == "warning")
+        icon = "❌" if failed else "✅"
+        print(f"{icon} {len(paths)} input(s) checked: {len(failed)} failing, {n_warn} warning(s).")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(lint_cli())
@@ -0,0 +1,267 @@
+# gausskit/metrics.py
+"""
+Scheduler metrics: how long jobs wait versus run, and what polling costs.
+
+Metrics are off unless asked for: set $GAUSSKIT_METRICS (`1` for
+`gausskit-metrics.jsonl` in the working directory, or a path) or pass
+`gausskit submit --metrics [PATH]`.  `SchedulerMetrics` then appends one JSON
+object per event to that JSON-lines file:
+
+    submitted  job, jobid, partition, nproc
+    started    job, jobid            (its log appeared)
+    finished   job, jobid, outcome   ('ok' / 'failed')
+    stage      job, parents, latency (next chain stage submitted; latency =
+                                      seconds since the last parent finished)
+    poll       duration, jobs        (one scheduler polling round)
+
+and keeps a Prometheus textfile-collector file (`gausskit.prom` next to the
+metrics file, or $GAUSSKIT_PROM_FILE) up to date with counters and quantiles.
+
+`gausskit schedule stats [metrics.jsonl …]` prints percentiles of queue
+wait, runtime, chain latency and poll cost from those files.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import tempfile
+import time
+
+METRICS_FILE = "gausskit-metrics.jsonl"
+PROM_FILE = "gausskit.prom"
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def metrics_path(cwd=None):
+    """Metrics file requested by $GAUSSKIT_METRICS (`1`/`on`: default name in `cwd`); None if off."""
+    val = os.environ.get("GAUSSKIT_METRICS", "").strip()
+    if val.lower() in ("", "0", "off", "no", "false"):
+        return None
+    if val.lower() in ("1", "on", "yes", "true"):
+        val = METRICS_FILE
+    return os.path.abspath(os.path.join(cwd or os.getcwd(), os.path.expanduser(val)))
+
+
+def percentile(values, q):
+    """Linear-interpolated percentile of `values` (q in 0..1); None if empty."""
+    vals = sorted(values)
+    if not vals:
+        return None
+    pos = (len(vals) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(vals) - 1)
+    return vals[lo] + (vals[hi] - vals[lo]) * (pos - lo)
+
+
+class SchedulerMetrics:
+    """Collect per-job timestamps and per-poll costs; `path=None` disables everything."""
+
+    def __init__(self, path=None, prom_path=None, prom_interval=30):
+        self.path = path
+        self.prom_path = (prom_path or os.environ.get("GAUSSKIT_PROM_FILE")
+                          or os.path.join(os.path.dirname(path or ""), PROM_FILE))
+        self.prom_interval = prom_interval
+        self.run = f"{os.getpid()}-{int(time.time())}"
+        self.jobs = {}          # base → {"jobid", "submitted", "started", "finished", "outcome"}
+        self.waits, self.runtimes, self.latencies = [], [], []
+        self.counts = {"submitted": 0, "ok": 0, "failed": 0}
+        self.polls = 0
+        self.poll_seconds = 0.0
+        self._prom_stamp = 0.0
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def _emit(self, event, **fields):
+        if not self.enabled:
+            return
+        rec = {"ts": round(time.time(), 3), "run": self.run, "event": event}
+        rec.update(fields)
+        try:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(rec) + "\n")
+        except OSError as e:
+            print(f"⚠️ Could not write metrics to {self.path}: {e}")
+            self.path = None
+
+    # -- job lifecycle -----------------------------------------------------
+
+    def submitted(self, base, jobid, partition=None, nproc=None):
+        self.jobs[base] = {"jobid": jobid, "submitted": time.time(),
+                           "started": None, "finished": None, "outcome": None}
+        self.counts["submitted"] += 1
+        self._emit("submitted", job=base, jobid=jobid, partition=partition, nproc=nproc)
+
+    def started(self, base):
+        rec = self.jobs.get(base)
+        if rec is None or rec["started"] is not None:
+            return
+        rec["started"] = time.time()
+        self.waits.append(rec["started"] - rec["submitted"])
+        self._emit("started", job=base, jobid=rec["jobid"])
+
+    def finished(self, base, outcome):
+        rec = self.jobs.get(base)
+        if rec is None or rec["finished"] is not None:
+            return
+        self.started(base)
+        rec["finished"], rec["outcome"] = time.time(), outcome
+        self.runtimes.append(rec["finished"] - rec["started"])
+        self.counts["ok" if outcome == "ok" else "failed"] += 1
+        self._emit("finished", job=base, jobid=rec["jobid"], outcome=outcome)
+
+    def stage(self, base, parents):
+        """`base` (next chain stage) was just submitted after `parents` finished."""
+        done = [self.jobs[p]["finished"] for p in parents
+                if p in self.jobs and self.jobs[p]["finished"]]
+        latency = time.time() - max(done) if done else None
+        if latency is not None:
+            self.latencies.append(latency)
+        self._emit("stage", job=base, parents=list(parents),
+                   latency=None if latency is None else round(latency, 3))
+
+    @contextlib.contextmanager
+    def poll(self, n_jobs=0):
+        """Time one polling round: `with metrics.poll(len(jobs)): …`."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t0
+            self.polls += 1
+            self.poll_seconds += dt
+            self._emit("poll", duration=round(dt, 6), jobs=n_jobs)
+            if time.time() - self._prom_stamp >= self.prom_interval:
+                self.write_prom()
+
+    # -- Prometheus textfile ----------------------------------------------
+
+    def write_prom(self):
+        """Atomically rewrite the textfile-collector file."""
+        if not self.enabled:
+            return
+        self._prom_stamp = time.time()
+        active = sum(1 for r in self.jobs.values() if r["finished"] is None)
+        lines = [
+            "# HELP gausskit_jobs_submitted_total Jobs submitted by this scheduler.",
+            "# TYPE gausskit_jobs_submitted_total counter",
+            f"gausskit_jobs_submitted_total {self.counts['submitted']}",
+            "# HELP gausskit_jobs_finished_total Jobs finished, by outcome.",
+            "# TYPE gausskit_jobs_finished_total counter",
+            f'gausskit_jobs_finished_total{{outcome="ok"}} {self.counts["ok"]}',
+            f'gausskit_jobs_finished_total{{outcome="failed"}} {self.counts["failed"]}',
+            "# HELP gausskit_jobs_active Jobs submitted and not yet finished.",
+            "# TYPE gausskit_jobs_active gauge",
+            f"gausskit_jobs_active {active}",
+            "# HELP gausskit_polls_total Scheduler polling rounds.",
+            "# TYPE gausskit_polls_total counter",
+            f"gausskit_polls_total {self.polls}",
+            "# HELP gausskit_poll_seconds_total Time spent polling.",
+            "# TYPE gausskit_poll_seconds_total counter",
+            f"gausskit_poll_seconds_total {self.poll_seconds:.6f}",
+        ]
+        for name, vals, help_ in (
+            ("gausskit_job_wait_seconds", self.waits, "Submission to start."),
+            ("gausskit_job_runtime_seconds", self.runtimes, "Start to finish."),
+            ("gausskit_chain_latency_seconds", self.latencies, "Parent finished to next stage submitted."),
+        ):
+            lines += [f"# HELP {name} {help_}", f"# TYPE {name} summary"]
+            for q in QUANTILES:
+                v = percentile(vals, q)
+                lines.append(f'{name}{{quantile="{q}"}} {"NaN" if v is None else f"{v:.3f}"}')
+            lines += [f"{name}_sum {sum(vals):.3f}", f"{name}_count {len(vals)}"]
+        d = os.path.dirname(os.path.abspath(self.prom_path))
+        try:
+            fd, tmp = tempfile.mkstemp(prefix=".gausskit-prom-", dir=d)
+            with os.fdopen(fd, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, self.prom_path)
+        except OSError as e:
+            print(f"⚠️ Could not write {self.prom_path}: {e}")
+
+
+# ── stats report ──────────────────────────────────────────────────────────────
+
+def load_events(paths):
+    events = []
+    for path in paths:
+        try:
+            with open(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError as e:
+            print(f"⚠️ Cannot read {path}: {e}")
+    return events
+
+
+def summarize(events):
+    """{metric: [values]} for wait, runtime, chain latency and poll cost (seconds)."""
+    sub, start = {}, {}
+    out = {"wait": [], "runtime": [], "chain latency": [], "poll": []}
+    outcomes = {"ok": 0, "failed": 0}
+    for e in sorted(events, key=lambda e: e.get("ts", 0)):
+        key = (e.get("run"), e.get("job"), e.get("jobid"))
+        ev = e.get("event")
+        if ev == "submitted":
+            sub[key] = e["ts"]
+        elif ev == "started" and key in sub:
+            start[key] = e["ts"]
+            out["wait"].append(e["ts"] - sub[key])
+        elif ev == "finished":
+            if key in start:
+                out["runtime"].append(e["ts"] - start[key])
+            outcomes[e.get("outcome") if e.get("outcome") in outcomes else "failed"] += 1
+        elif ev == "stage" and e.get("latency") is not None:
+            out["chain latency"].append(e["latency"])
+        elif ev == "poll":
+            out["poll"].append(e.get("duration", 0.0))
+    return out, outcomes
+
+
+def _fmt(v):
+    if v is None:
+        return "-"
+    if v < 1:
+        return f"{v * 1000:.1f}ms"
+    if v < 120:
+        return f"{v:.1f}s"
+    if v < 7200:
+        return f"{v / 60:.1f}m"
+    return f"{v / 3600:.2f}h"
+
+
+def print_stats(paths):
+    events = load_events(paths)
+    if not events:
+        print("❌ No metrics found (run the scheduler first; see gausskit-metrics.jsonl).")
+        return 1
+    data, outcomes = summarize(events)
+    runs = len({e.get("run") for e in events})
+    print(f"📊 Scheduler stats from {len(events)} events in {runs} run(s): "
+          f"{outcomes['ok']} ok, {outcomes['failed']} failed")
+    print(f"{'metric':<15}{'n':>7}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+    for name, vals in data.items():
+        row = [percentile(vals, q) for q in QUANTILES] + [max(vals) if vals else None]
+        print(f"{name:<15}{len(vals):>7}" + "".join(f"{_fmt(v):>10}" for v in row))
+    if data["poll"]:
+        print(f"⏱️ Total polling time: {_fmt(sum(data['poll']))} over {len(data['poll'])} polls")
+    return 0
+
+
+def stats_cli(argv=None):
+    """`gausskit schedule stats [files…]`"""
+    ap = argparse.ArgumentParser(prog="gausskit schedule stats",
+                                 description="Percentiles of queue wait, runtime, chain latency and poll cost.")
+    ap.add_argument("files", nargs="*", default=[METRICS_FILE],
+                    help=f"metrics JSON-lines files [default: {METRICS_FILE}]")
+    args = ap.parse_args(argv)
+    return print_stats(args.files)
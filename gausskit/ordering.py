@@ -0,0 +1,165 @@
+# gausskit/ordering.py
+"""
+Backlog ordering for batch submission.
+
+`run_batch` used to submit in `os.listdir` order, so under a partition quota
+a few long jobs could block hundreds of short ones.  These helpers rank the
+backlog by predicted runtime and dependencies:
+
+  - fifo          : directory order (old behaviour)
+  - sjf           : shortest predicted job first
+  - largest-first : longest predicted job first (LPT, good for makespan)
+  - critical-path : longest chain of dependent work first; a job whose
+                    %OldChk is produced by another backlog job waits for it
+
+Predicted runtime is atoms × basis functions × job-type weight, or the
+fitted `ResourcePredictor` when one is passed in.
+"""
+
+import heapq
+import os
+
+from .predictor import parse_com_features, _BASIS_PER_ATOM
+
+ORDER_POLICIES = ("fifo", "sjf", "largest-first", "critical-path")
+
+# relative cost of each job type on top of a single point
+_JOB_WEIGHT = {"opt": 8.0, "freq": 4.0, "td": 3.0, "stable": 1.5,
+               "scan": 20.0, "irc": 15.0, "pimom": 1.2, "fc": 2.0}
+
+
+def _read_link0(com):
+    """Return (%chk, %oldchk) basenames (lower-case, without extension) of `com`."""
+    chk = old = None
+    with open(com, 'r', errors='ignore') as f:
+        for L in f:
+            s = L.strip().lower()
+            if s.startswith('%chk='):
+                chk = os.path.splitext(os.path.basename(s.split('=', 1)[1].strip()))[0]
+            elif s.startswith('%oldchk='):
+                old = os.path.splitext(os.path.basename(s.split('=', 1)[1].strip()))[0]
+            elif s.startswith('#'):
+                break
+    return chk, old
+
+
+def estimate_cost(base, predictor=None):
+    """Predicted runtime (arbitrary units, or CPU seconds with a predictor)."""
+    com = f"{base}.com"
+    if predictor is not None and predictor.coef:
+        feat = parse_com_features(com)
+        if not feat["nbasis"]:
+            feat["nbasis"] = predictor.estimate_nbasis(feat["natoms"] or 1, feat["basis"])
+        med, _ = predictor.predict_cpu(feat)
+        if med is not None:
+            return med
+    feat = parse_com_features(com)
+    natoms = feat["natoms"] or 1
+    nbasis = feat["nbasis"] or natoms * _BASIS_PER_ATOM.get(feat["basis"] or "", 15)
+    weight = 1.0
+    for jt in feat["job_types"]:
+        weight *= _JOB_WEIGHT.get(jt, 1.0)
+    return natoms * nbasis * weight
+
+
+def find_dependencies(bases):
+    """
+    {base: set(parent bases)} where a parent writes the %chk that the child
+    reads via %OldChk.
+    """
+    link0 = {b: _read_link0(f"{b}.com") for b in bases}
+    producer = {}
+    for b, (chk, _) in link0.items():
+        if chk:
+            producer.setdefault(chk, b)
+    deps = {}
+    for b, (_, old) in link0.items():
+        parent = producer.get(old)
+        deps[b] = {parent} if parent and parent != b else set()
+    return deps
+
+
+def critical_path_lengths(costs, deps):
+    """Longest path of remaining work starting at each job (own cost included)."""
+    children = {b: set() for b in costs}
+    for b, parents in deps.items():
+        for p in parents:
+            if p in children:
+                children[p].add(b)
+    memo = {}
+
+    def walk(b, seen=()):
+        if b in memo:
+            return memo[b]
+        if b in seen:          # cycle guard: treat as leaf
+            return costs[b]
+        tail = max((walk(c, seen + (b,)) for c in children[b]), default=0.0)
+        memo[b] = costs[b] + tail
+        return memo[b]
+
+    return {b: walk(b) for b in costs}
+
+
+def order_jobs(names, costs, deps, policy="fifo"):
+    """Sort `names` by policy given their costs and dependencies (fifo keeps the order)."""
+    if policy not in ORDER_POLICIES:
+        raise ValueError(f"Unknown order policy {policy!r} (choose from {', '.join(ORDER_POLICIES)})")
+    names = list(names)
+    if policy == "sjf":
+        return sorted(names, key=lambda b: costs[b])
+    if policy == "largest-first":
+        return sorted(names, key=lambda b: -costs[b])
+    if policy == "critical-path":
+        cp = critical_path_lengths(costs, deps)
+        return sorted(names, key=lambda b: -cp[b])
+    return names
+
+
+def order_backlog(bases, policy="fifo", predictor=None):
+    """
+    Return (ordered bases, costs dict, deps dict) for the chosen policy.
+    """
+    if policy not in ORDER_POLICIES:
+        raise ValueError(f"Unknown order policy {policy!r} (choose from {', '.join(ORDER_POLICIES)})")
+    bases = list(bases)
+    costs = {b: estimate_cost(b, predictor) for b in bases}
+    deps = find_dependencies(bases)
+    return order_jobs(bases, costs, deps, policy), costs, deps
+
+
+def simulate_schedule(order, costs, slots, deps=None):
+    """
+    List-schedule `order` onto `slots` parallel slots (next ready job takes
+    the first free slot).  Returns (makespan, mean completion time).
+    """
+    if not order:
+        return 0.0, 0.0
+    deps = deps or {}
+    slots = max(int(slots), 1)
+    free = [0.0] * slots
+    heapq.heapify(free)
+    finish = {}
+    pending = list(order)
+    while pending:
+        t = heapq.heappop(free)
+        # first job in order whose parents are finished by time t (or earliest-ready)
+        pick = None
+        for b in pending:
+            ready = max((finish.get(p, 0.0) for p in deps.get(b, ()) if p in costs), default=0.0)
+            if all(p in finish or p not in costs for p in deps.get(b, ())) and ready <= t:
+                pick, start = b, t
+                break
+        if pick is None:
+            # nothing ready now: take the first whose parents are done, start when ready
+            for b in pending:
+                if all(p in finish or p not in costs for p in deps.get(b, ())):
+                    pick = b
+                    start = max([t] + [finish[p] for p in deps.get(b, ()) if p in finish])
+                    break
+        if pick is None:      # dependency cycle: just run in order
+            pick, start = pending[0], t
+        pending.remove(pick)
+        finish[pick] = start + costs[pick]
+        heapq.heappush(free, finish[pick])
+    done = list(finish.values())
+    return max(done), sum(done) / len(done)
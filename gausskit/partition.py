@@ -0,0 +1,302 @@
+# gausskit/partition.py
+"""
+Adaptive SLURM partition selection for the job scheduler.
+
+`SlurmPartitionMonitor` polls `sinfo` and `squeue --start` (cached for
+`ttl` seconds) and estimates, per partition, how long a new job would wait
+before it starts.  A *policy* turns those estimates into an ordered list of
+partitions to try.  Policies are plain functions registered in
+`PARTITION_POLICIES`; add your own with `@register_policy("name")`.
+
+Built-in policies:
+  - quota-first   : primary partition while under `max_primary`, then fastest start
+  - fastest-start : lowest expected time-to-start
+  - cheapest      : lowest cost weight (e.g. SU/core-hour), then fastest start;
+                    costs come from `costs=` or $GAUSSKIT_PARTITION_COSTS
+                    ("short=1,medium=2.5"), unlisted partitions cost 1
+
+A node counts as free when it is idle, or mixed with at least `job_cpus`
+idle CPUs (from `sinfo -N … %C`).
+"""
+
+import getpass
+import os
+import subprocess
+import time
+from datetime import datetime
+
+from .squeue_cache import SharedSqueueCache
+
+
+def parse_slurm_time(text):
+    """
+    Convert a SLURM time string into seconds.
+    Accepts 'D-HH:MM:SS', 'HH:MM:SS', 'MM:SS', 'MM' and 'UNLIMITED'/'infinite'.
+    Returns None for unlimited or unparsable values.
+    """
+    text = (text or "").strip()
+    if not text or text.lower() in ("unlimited", "infinite", "n/a", "none"):
+        return None
+    days = 0
+    if "-" in text:
+        d, text = text.split("-", 1)
+        try:
+            days = int(d)
+        except ValueError:
+            return None
+    try:
+        parts = [int(float(p)) for p in text.split(":")]
+    except ValueError:
+        return None
+    if len(parts) == 3:
+        h, m, s = parts
+    elif len(parts) == 2:
+        h, m, s = 0, parts[0], parts[1]
+    elif len(parts) == 1:
+        h, m, s = 0, parts[0], 0
+    else:
+        return None
+    return days * 86400 + h * 3600 + m * 60 + s
+
+
+def parse_costs(text):
+    """'short=1,medium=2.5' → {'short': 1.0, 'medium': 2.5}; raises ValueError on bad entries."""
+    costs = {}
+    for item in (text or "").split(","):
+        if not item.strip():
+            continue
+        name, sep, val = item.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"Bad partition cost {item.strip()!r} (expected name=cost)")
+        costs[name.strip()] = float(val)
+    return costs
+
+
+def env_costs():
+    """Partition costs from $GAUSSKIT_PARTITION_COSTS ({} if unset)."""
+    return parse_costs(os.environ.get("GAUSSKIT_PARTITION_COSTS", ""))
+
+
+def format_seconds(sec):
+    """Render seconds as 'HH:MM:SS' (hours may exceed 24)."""
+    if sec is None:
+        return "n/a"
+    sec = int(round(sec))
+    return f"{sec // 3600:02d}:{(sec % 3600) // 60:02d}:{sec % 60:02d}"
+
+
+class PartitionState:
+    """Snapshot of one partition as seen by `sinfo`/`squeue`."""
+
+    def __init__(self, name):
+        self.name = name
+        self.available = True
+        self.time_limit = None      # seconds, None = unlimited
+        self.total_nodes = 0
+        self.idle_nodes = 0         # nodes that could start one of our jobs now
+        self.pending = 0            # pending jobs (all users)
+        self.my_jobs = 0            # jobs of this user (any state)
+        self.start_waits = []       # squeue --start estimates, seconds from now
+        self.est_wait = 0.0         # expected time-to-start, seconds
+        self.cost = 1.0
+
+    def fits(self, walltime):
+        """True if a job of `walltime` seconds fits under this partition's limit."""
+        if walltime is None or self.time_limit is None:
+            return True
+        return walltime <= self.time_limit
+
+    def __repr__(self):
+        return (f"PartitionState({self.name!r}, idle={self.idle_nodes}/{self.total_nodes}, "
+                f"pending={self.pending}, mine={self.my_jobs}, "
+                f"wait={format_seconds(self.est_wait)})")
+
+
+class SlurmPartitionMonitor:
+    """
+    Cached view of partition load.  One `sinfo` and one `squeue --start`
+    call per `ttl` seconds, no matter how often `snapshot()` is called; the
+    user's own jobs come from the shared `squeue -u` cache.
+    """
+
+    def __init__(self, ttl=60, user=None, mean_runtime=3600, costs=None, job_cpus=None):
+        self.ttl = ttl
+        self.user = user or getpass.getuser()
+        self.mean_runtime = mean_runtime   # fallback per-job runtime for backlog estimate
+        self.costs = dict(costs or {})
+        self.job_cpus = job_cpus           # a mixed node is free if this many CPUs are idle
+        self.queue = SharedSqueueCache(self.user)
+        self._cache = None
+        self._stamp = 0.0
+
+    def _run(self, cmd):
+        try:
+            res = subprocess.run(cmd, capture_output=True, text=True)
+        except OSError as e:
+            print(f"⚠️ Could not run {cmd[0]}: {e}")
+            return ""
+        if res.returncode != 0:
+            print(f"⚠️ {' '.join(cmd)} failed: {res.stderr.strip()}")
+            return ""
+        return res.stdout
+
+    def _poll(self):
+        states = {}
+
+        # sinfo -N: partition|avail|timelimit|nodes|state|CPUs A/I/O/T   (one row per node)
+        out = self._run(["sinfo", "-h", "-N", "-o", "%P|%a|%l|%D|%t|%C"])
+        for line in out.splitlines():
+            fields = line.strip().split("|")
+            if len(fields) < 5:
+                continue
+            name = fields[0].rstrip("*")
+            st = states.setdefault(name, PartitionState(name))
+            st.available = fields[1].strip().lower() == "up"
+            st.time_limit = parse_slurm_time(fields[2])
+            try:
+                n = int(fields[3])
+            except ValueError:
+                n = 0
+            st.total_nodes += n
+            state = fields[4].strip().lower().rstrip("*~#")
+            if state == "idle":
+                st.idle_nodes += n
+            elif state == "mix":
+                st.idle_nodes += self._mixed_free(n, fields[5] if len(fields) > 5 else "")
+
+        # squeue --start: expected start times of everyone's pending jobs
+        now = datetime.now()
+        out = self._run(["squeue", "-h", "-t", "PD", "--start", "-o", "%P|%S"])
+        for line in out.splitlines():
+            fields = line.strip().split("|")
+            if len(fields) < 2:
+                continue
+            for name in fields[0].split(","):
+                st = states.setdefault(name, PartitionState(name))
+                st.pending += 1
+                try:
+                    start = datetime.strptime(fields[1].strip(), "%Y-%m-%dT%H:%M:%S")
+                except ValueError:
+                    continue
+                st.start_waits.append(max(0.0, (start - now).total_seconds()))
+
+        # our own jobs, for quota-style policies (shared squeue -u cache)
+        for job in self.queue.jobs():
+            name = job["partition"]
+            if name:
+                states.setdefault(name, PartitionState(name)).my_jobs += 1
+
+        for st in states.values():
+            st.cost = float(self.costs.get(st.name, 1.0))
+            st.est_wait = self.estimate_wait(st)
+        return states
+
+    def _mixed_free(self, nodes, cpus):
+        """How many of `nodes` mixed nodes with idle CPUs `cpus` ('A/I/O/T') fit one job."""
+        try:
+            idle = int(cpus.split("/")[1])
+        except (IndexError, ValueError):
+            return 0
+        per_node = idle / max(nodes, 1)
+        need = self.job_cpus or 1
+        return nodes if per_node >= need else 0
+
+    def estimate_wait(self, st):
+        """
+        Expected seconds until a new job starts in `st`:
+          - idle nodes and no backlog → 0
+          - SLURM start estimates known → the latest one (we queue behind them)
+          - otherwise → backlog spread across the partition's nodes
+        """
+        if st.idle_nodes > 0 and st.pending == 0:
+            return 0.0
+        if st.start_waits:
+            return max(st.start_waits)
+        nodes = max(st.total_nodes, 1)
+        backlog = max(st.pending - st.idle_nodes, 0)
+        return backlog / nodes * self.mean_runtime
+
+    def snapshot(self, force=False):
+        """Return {partition: PartitionState}, re-polling only when stale."""
+        if force or self._cache is None or time.time() - self._stamp > self.ttl:
+            self._cache = self._poll()
+            self._stamp = time.time()
+        return self._cache
+
+    def invalidate(self):
+        self._cache = None
+
+    def note_submission(self, name):
+        """Account for a job we just submitted without re-polling SLURM."""
+        if self._cache is None:
+            return
+        st = self._cache.setdefault(name, PartitionState(name))
+        st.my_jobs += 1
+        if st.idle_nodes > 0:
+            st.idle_nodes -= 1
+        else:
+            st.pending += 1
+        st.est_wait = self.estimate_wait(st)
+
+
+# ── Policies ───────────────────────────────────────────────────────────────────
+
+PARTITION_POLICIES = {}
+
+
+def register_policy(name):
+    """Decorator: register `func(states, request) -> [partition, ...]` under `name`."""
+    def deco(func):
+        PARTITION_POLICIES[name] = func
+        return func
+    return deco
+
+
+def _eligible(states, request):
+    wanted = request.get("candidates") or list(states)
+    walltime = request.get("walltime")
+    out = []
+    for name in wanted:
+        st = states.get(name)
+        if st is None:
+            # unknown to sinfo (e.g. sinfo failed) → keep it, assume no wait
+            st = PartitionState(name)
+        if st.available and st.fits(walltime):
+            out.append(st)
+    return out
+
+
+@register_policy("fastest-start")
+def fastest_start(states, request):
+    cands = _eligible(states, request)
+    return [s.name for s in sorted(cands, key=lambda s: (s.est_wait, s.cost))]
+
+
+@register_policy("cheapest")
+def cheapest(states, request):
+    cands = _eligible(states, request)
+    return [s.name for s in sorted(cands, key=lambda s: (s.cost, s.est_wait))]
+
+
+@register_policy("quota-first")
+def quota_first(states, request):
+    primary = request.get("primary")
+    max_primary = request.get("max_primary")
+    ranked = fastest_start(states, request)
+    if primary in ranked:
+        st = states.get(primary)
+        mine = st.my_jobs if st else 0
+        ranked.remove(primary)
+        if max_primary is None or mine < max_primary:
+            ranked.insert(0, primary)
+        else:
+            ranked.append(primary)   # last resort once a slot frees up
+    return ranked
+
+
+def rank_partitions(policy, states, request):
+    """Apply the named policy; raises KeyError for unknown policies."""
+    if policy not in PARTITION_POLICIES:
+        raise KeyError(f"Unknown partition policy {policy!r} "
+                       f"(choose from: {', '.join(sorted(PARTITION_POLICIES))})")
+    return PARTITION_POLICIES[policy](states, request)
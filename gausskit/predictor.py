@@ -0,0 +1,482 @@
+# gausskit/predictor.py
+"""
+Historical resource predictor for Gaussian submissions.
+
+Learns from our own *finished* logs (``Job cpu time``, ``Elapsed time``,
+``NAtoms``, number of basis functions, job types and functional) and
+suggests per-job cores, walltime and memory instead of the fixed
+``nproc=56 / --mem=115200 / -m=92GB / 23:50:00`` defaults.
+
+Model (pure Python, no numpy):
+  log(cpu_seconds) = b0 + b1·log(nbasis) + b2·log(natoms) + Σ job-type terms
+                     + Σ functional terms (functionals seen ≥ 3 times)
+fitted by ridge least squares.  Parallel efficiency follows an Amdahl-like
+``speedup(n) = n / (1 + alpha·(n-1))`` with `alpha` taken from the observed
+cpu/elapsed ratios.  Walltime = predicted wall × exp(z·σ) × margin.
+
+The saved model records when it was fitted and the number/newest mtime of
+the logs it saw; `default_predictor` refits when that history changed or
+the model is older than MODEL_MAX_AGE (7 days, $GAUSSKIT_MODEL_MAX_AGE_DAYS).
+
+Typical use:
+    pred = default_predictor()               # cached model or fit from ./*.log
+    s = pred.suggest("mol.com")              # {'nproc', 'time', 'mem_mb', ...}
+"""
+
+import json
+import math
+import os
+import re
+import time
+from pathlib import Path
+
+from .partition import parse_slurm_time, format_seconds
+
+JOB_TYPES = ("opt", "freq", "td", "stable", "scan", "irc", "pimom", "fc")
+
+DEFAULT_MODEL_PATH = Path(os.path.expanduser("~/.cache/gausskit/resource_model.json"))
+MODEL_MAX_AGE = float(os.environ.get("GAUSSKIT_MODEL_MAX_AGE_DAYS", 7)) * 86400
+
+# rough contracted functions per atom, used only when a basis has no history
+_BASIS_PER_ATOM = {
+    "sto-3g": 5, "3-21g": 9, "6-31g": 9, "6-31g(d)": 15, "6-31g*": 15,
+    "6-31+g(d,p)": 19, "6-311g(d,p)": 22, "def2svp": 14, "def2-svp": 14,
+    "def2tzvp": 31, "def2-tzvp": 31, "cc-pvdz": 14, "cc-pvtz": 30,
+    "aug-cc-pvdz": 23, "aug-cc-pvtz": 46,
+}
+
+_ROUTE_WORDS = {
+    "opt", "freq", "sp", "stable", "irc", "scan", "nosymm", "symm", "chkbasis",
+    "guess", "geom", "test", "force", "polar", "output", "pop", "td", "fc",
+}
+
+_NPROC_RE = re.compile(r'Will use up to\s+(\d+)\s+processors')
+
+_TIME_RE = re.compile(
+    r'(\d+)\s+days?\s+(\d+)\s+hours?\s+(\d+)\s+minutes?\s+([\d.]+)\s+seconds?')
+
+
+def _time_to_seconds(text):
+    m = _TIME_RE.search(text)
+    if not m:
+        return None
+    d, h, mi, s = m.groups()
+    return int(d) * 86400 + int(h) * 3600 + int(mi) * 60 + float(s)
+
+
+def parse_route_features(route):
+    """
+    From a route string return (functional, basis, job_types set).
+    Works on both '.com' and echoed '.log' routes.
+    """
+    route = route.strip().lstrip('#').strip()
+    tokens = route.split()
+    if tokens and tokens[0].lower() in ("p", "n", "t"):
+        tokens = tokens[1:]
+    functional = basis = None
+    for tok in tokens:
+        if '/' in tok and '=' not in tok.split('/')[0]:
+            functional, basis = tok.split('/', 1)
+            break
+    else:
+        # 'B3LYP genecp' style: first two bare words that are not job keywords
+        bare = [t for t in tokens
+                if '=' not in t and '(' not in t and t.lower() not in _ROUTE_WORDS]
+        if bare:
+            functional = bare[0]
+            basis = bare[1] if len(bare) > 1 else None
+    low = route.lower()
+    jt = set()
+    if re.search(r'\bopt\b|\bopt=', low):
+        jt.add("opt")
+        if "modredundant" in low:
+            jt.add("scan")
+    if re.search(r'\bfreq\b|\bfreq=', low):
+        jt.add("freq")
+        if re.search(r'\bfc\b|readfc', low):
+            jt.add("fc")
+    if re.search(r'\btd\b|\btd=|\btd\(', low):
+        jt.add("td")
+    if "stable" in low:
+        jt.add("stable")
+    if re.search(r'\bscan\b', low):
+        jt.add("scan")
+    if "irc" in low:
+        jt.add("irc")
+    if "pimom" in low:
+        jt.add("pimom")
+    if functional:
+        functional = functional.lower()
+    if basis:
+        basis = basis.lower()
+    return functional, basis, jt
+
+
+def parse_log_record(logfile):
+    """
+    Pull the predictor features out of one finished log.
+    Returns a dict, or None if the log did not terminate normally or
+    lacks timing/size information.
+    """
+    rec = {"logfile": str(logfile), "cpu": 0.0, "wall": 0.0, "natoms": None,
+           "nbasis": None, "nproc": None, "functional": None, "basis": None,
+           "job_types": set()}
+    normal = False
+    route_next = False
+    with open(logfile, 'r', errors='ignore') as f:
+        for line in f:
+            s = line.strip()
+            if route_next:
+                route_next = False
+                if s.startswith('#'):
+                    fn, bs, jt = parse_route_features(s)
+                    rec["functional"] = rec["functional"] or fn
+                    rec["basis"] = rec["basis"] or bs
+                    rec["job_types"] |= jt
+            if s.startswith('-----') and rec["functional"] is None and not rec["job_types"]:
+                route_next = True
+            elif rec["natoms"] is None and s.startswith("NAtoms="):
+                try:
+                    rec["natoms"] = int(s.split()[1])
+                except (IndexError, ValueError):
+                    pass
+            elif rec["nbasis"] is None and "basis functions," in s:
+                try:
+                    rec["nbasis"] = int(s.split()[0])
+                except ValueError:
+                    pass
+            elif s.startswith("Will use up to"):
+                m = _NPROC_RE.match(s)
+                if m:
+                    rec["nproc"] = int(m.group(1))
+            elif s.startswith("Job cpu time:"):
+                rec["cpu"] += _time_to_seconds(s) or 0.0
+            elif s.startswith("Elapsed time:"):
+                rec["wall"] += _time_to_seconds(s) or 0.0
+            elif "Normal termination" in s:
+                normal = True
+            elif "Error termination" in s:
+                normal = False
+    if not normal or rec["cpu"] <= 0 or not rec["nbasis"] or not rec["natoms"]:
+        return None
+    return rec
+
+
+def collect_history(paths, recursive=True):
+    """Parse every usable .log under `paths` (files or directories)."""
+    records = []
+    for p in paths:
+        p = Path(p)
+        if p.is_dir():
+            logs = p.rglob("*.log") if recursive else p.glob("*.log")
+        else:
+            logs = [p]
+        for log in logs:
+            try:
+                rec = parse_log_record(log)
+            except OSError:
+                rec = None
+            if rec:
+                records.append(rec)
+    return records
+
+
+def history_stamp(paths, recursive=True):
+    """{'dirs', 'logs', 'newest'} of the .log files under `paths`, from stat() only."""
+    n, newest = 0, 0.0
+    for p in paths:
+        p = Path(p)
+        logs = (p.rglob("*.log") if recursive else p.glob("*.log")) if p.is_dir() else [p]
+        for log in logs:
+            try:
+                mtime = log.stat().st_mtime
+            except OSError:
+                continue
+            n += 1
+            newest = max(newest, mtime)
+    return {"dirs": sorted(str(Path(p).resolve()) for p in paths), "logs": n, "newest": round(newest, 3)}
+
+
+def parse_com_features(comfile):
+    """
+    Features of a not-yet-run input: functional, basis, job types, natoms.
+    Atoms are counted from the first molecule specification (the block
+    after the charge/multiplicity line).
+    """
+    with open(comfile, 'r', errors='ignore') as f:
+        lines = [L.rstrip('\n') for L in f]
+    route_parts, jt = [], set()
+    functional = basis = oldchk = None
+    natoms = 0
+    i, n = 0, len(lines)
+    # Link 0 + route
+    while i < n and not lines[i].strip().startswith('#'):
+        if lines[i].strip().lower().startswith('%oldchk='):
+            oldchk = lines[i].split('=', 1)[1].strip()
+        i += 1
+    while i < n and lines[i].strip():
+        route_parts.append(lines[i].strip())
+        i += 1
+    if route_parts:
+        functional, basis, jt = parse_route_features(" ".join(route_parts))
+    # title
+    while i < n and not lines[i].strip():
+        i += 1
+    while i < n and lines[i].strip():
+        i += 1
+    while i < n and not lines[i].strip():
+        i += 1
+    # charge/mult then atoms
+    if i < n and re.match(r'^\s*[-+]?\d+\s+\d+', lines[i]):
+        i += 1
+        while i < n and lines[i].strip():
+            tok = lines[i].split()
+            if tok and re.match(r'^([A-Za-z]{1,2}(\d+)?([-(].*)?|\d{1,3})$', tok[0]):
+                natoms += 1
+            i += 1
+    # later Link1 steps add their job types
+    for L in lines:
+        if L.strip().startswith('#') and L.strip() not in route_parts:
+            jt |= parse_route_features(L)[2]
+    feat = {"functional": functional, "basis": basis,
+            "job_types": jt, "natoms": natoms, "nbasis": None}
+
+    # geom=check inputs: borrow sizes from the log that wrote the old checkpoint
+    if not natoms and oldchk:
+        parent = Path(comfile).parent / (os.path.splitext(oldchk)[0] + ".log")
+        if parent.exists():
+            try:
+                prev = parse_log_record(parent)
+            except OSError:
+                prev = None
+            if prev:
+                feat["natoms"], feat["nbasis"] = prev["natoms"], prev["nbasis"]
+                feat["functional"] = feat["functional"] or prev["functional"]
+                feat["basis"] = feat["basis"] or prev["basis"]
+    return feat
+
+
+# ── tiny linear algebra ──────────────────────────────────────────────────────
+
+def _solve(A, b):
+    """Solve A x = b (A square) by Gaussian elimination with partial pivoting."""
+    n = len(A)
+    M = [row[:] + [b[i]] for i, row in enumerate(A)]
+    for c in range(n):
+        piv = max(range(c, n), key=lambda r: abs(M[r][c]))
+        if abs(M[piv][c]) < 1e-12:
+            continue
+        M[c], M[piv] = M[piv], M[c]
+        for r in range(n):
+            if r != c and M[r][c]:
+                f = M[r][c] / M[c][c]
+                M[r] = [a - f * bb for a, bb in zip(M[r], M[c])]
+    return [M[i][n] / M[i][i] if abs(M[i][i]) > 1e-12 else 0.0 for i in range(n)]
+
+
+class ResourcePredictor:
+    """Fit-on-history resource model.  See module docstring."""
+
+    def __init__(self, margin=1.3, z=1.0, core_ladder=(4, 8, 16, 28, 56),
+                 target_wall=4 * 3600, min_wall=15 * 60, max_wall="23:50:00",
+                 mem_per_core_mb=115200 // 56):
+        self.margin = margin
+        self.z = z
+        self.core_ladder = tuple(sorted(core_ladder))
+        self.target_wall = target_wall
+        self.min_wall = min_wall
+        self.max_wall = parse_slurm_time(max_wall) if isinstance(max_wall, str) else max_wall
+        self.mem_per_core_mb = mem_per_core_mb
+        # fitted state
+        self.features = []
+        self.coef = []
+        self.sigma = 1.0
+        self.alpha = 0.05
+        self.basis_per_atom = {}
+        self.n_samples = 0
+        self.fitted_at = 0.0
+        self.history = None         # history_stamp() of the logs it was fitted on
+
+    # ---- fitting ----
+    def _feature_names(self, records):
+        counts = {}
+        for r in records:
+            if r["functional"]:
+                counts[r["functional"]] = counts.get(r["functional"], 0) + 1
+        # the most common functional is the reference level (no dummy), so an
+        # unseen functional predicts like the one we run most
+        funcs = sorted(f for f, c in counts.items() if c >= 3)
+        if funcs:
+            funcs.remove(max(funcs, key=lambda f: counts[f]))
+        return (["const", "log_nbasis", "log_natoms"]
+                + [f"jt:{j}" for j in JOB_TYPES]
+                + [f"fn:{f}" for f in funcs])
+
+    def _vector(self, feat):
+        x = []
+        for name in self.features:
+            if name == "const":
+                x.append(1.0)
+            elif name == "log_nbasis":
+                x.append(math.log(max(feat["nbasis"], 1)))
+            elif name == "log_natoms":
+                x.append(math.log(max(feat["natoms"], 1)))
+            elif name.startswith("jt:"):
+                x.append(1.0 if name[3:] in feat["job_types"] else 0.0)
+            else:
+                x.append(1.0 if feat.get("functional") == name[3:] else 0.0)
+        return x
+
+    def fit(self, records, ridge=1e-3):
+        """Fit the model on records from `collect_history`."""
+        records = [r for r in records if r["cpu"] > 0 and r["nbasis"] and r["natoms"]]
+        self.n_samples = len(records)
+        self.fitted_at = time.time()
+        if not records:
+            return self
+        self.features = self._feature_names(records)
+        k = len(self.features)
+        XtX = [[0.0] * k for _ in range(k)]
+        Xty = [0.0] * k
+        rows = []
+        for r in records:
+            x = self._vector(r)
+            y = math.log(r["cpu"])
+            rows.append((x, y))
+            for i in range(k):
+                Xty[i] += x[i] * y
+                for j in range(k):
+                    XtX[i][j] += x[i] * x[j]
+        for i in range(1, k):
+            XtX[i][i] += ridge * len(records)
+        self.coef = _solve(XtX, Xty)
+        resid = [y - sum(c * v for c, v in zip(self.coef, x)) for x, y in rows]
+        dof = max(len(rows) - k, 1)
+        self.sigma = math.sqrt(sum(e * e for e in resid) / dof) if len(rows) > k else 0.5
+
+        # parallel inefficiency from observed speedups
+        alphas = []
+        for r in records:
+            n = r["nproc"]
+            if n and n > 1 and r["wall"] > 0:
+                speedup = min(r["cpu"] / r["wall"], n)
+                if speedup > 0:
+                    alphas.append(max(0.0, (n / speedup - 1) / (n - 1)))
+        if alphas:
+            alphas.sort()
+            self.alpha = alphas[len(alphas) // 2]
+
+        per_atom = {}
+        for r in records:
+            if r["basis"]:
+                per_atom.setdefault(r["basis"], []).append(r["nbasis"] / r["natoms"])
+        self.basis_per_atom = {b: sum(v) / len(v) for b, v in per_atom.items()}
+        return self
+
+    # ---- persistence ----
+    def to_dict(self):
+        return {
+            "features": self.features, "coef": self.coef, "sigma": self.sigma,
+            "alpha": self.alpha, "basis_per_atom": self.basis_per_atom,
+            "n_samples": self.n_samples, "fitted_at": self.fitted_at,
+            "history": self.history,
+        }
+
+    def save(self, path=DEFAULT_MODEL_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.to_dict(), indent=2))
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL_PATH, **kwargs):
+        data = json.loads(Path(path).read_text())
+        self = cls(**kwargs)
+        for key, val in data.items():
+            setattr(self, key, val)
+        return self
+
+    # ---- prediction ----
+    def estimate_nbasis(self, natoms, basis):
+        per = self.basis_per_atom.get(basis) or _BASIS_PER_ATOM.get(basis or "", 15)
+        return max(int(round(natoms * per)), 1)
+
+    def speedup(self, n):
+        return n / (1 + self.alpha * (n - 1))
+
+    def predict_cpu(self, feat):
+        """Median and upper (z·σ) predicted CPU seconds for a feature dict."""
+        if not self.coef:
+            return None, None
+        mu = sum(c * v for c, v in zip(self.coef, self._vector(feat)))
+        return math.exp(mu), math.exp(mu + self.z * self.sigma)
+
+    def suggest(self, comfile, default_nproc=56, default_time="23:50:00"):
+        """
+        Suggest {'nproc', 'time', 'mem_mb', 'pred_wall', 'nbasis'} for `comfile`.
+        Falls back to the defaults when the model is empty.
+        """
+        feat = parse_com_features(comfile)
+        if not feat["nbasis"]:
+            feat["nbasis"] = self.estimate_nbasis(feat["natoms"] or 1, feat["basis"])
+        med, upper = self.predict_cpu(feat)
+        if med is None:
+            return {"nproc": default_nproc, "time": default_time,
+                    "mem_mb": self.mem_per_core_mb * default_nproc,
+                    "pred_wall": None, "nbasis": feat["nbasis"]}
+
+        # smallest core count that brings the upper estimate under target_wall
+        nproc = self.core_ladder[-1]
+        for n in self.core_ladder:
+            if upper / self.speedup(n) <= self.target_wall:
+                nproc = n
+                break
+        wall = upper / self.speedup(nproc) * self.margin
+        wall = min(max(wall, self.min_wall), self.max_wall or wall)
+        return {
+            "nproc": nproc,
+            "time": format_seconds(wall),
+            "mem_mb": self.mem_per_core_mb * nproc,
+            "pred_wall": med / self.speedup(nproc),
+            "nbasis": feat["nbasis"],
+        }
+
+
+_DEFAULT = None
+
+
+def _stale(model, stamp, max_age):
+    return (time.time() - (model.fitted_at or 0) > max_age
+            or model.history != stamp)
+
+
+def default_predictor(history_dirs=(".",), model_path=DEFAULT_MODEL_PATH, refit=False,
+                      max_age=MODEL_MAX_AGE):
+    """
+    Process-wide predictor: load the saved model, or fit one from the logs in
+    `history_dirs` (and save it) when none exists, `refit` is requested, the
+    logs changed since the last fit or the model is older than `max_age` s.
+    """
+    global _DEFAULT
+    if _DEFAULT is not None and not refit and time.time() - _DEFAULT.fitted_at <= max_age:
+        return _DEFAULT
+    model_path = Path(model_path)
+    stamp = history_stamp(history_dirs)
+    model = None
+    if model_path.exists() and not refit:
+        try:
+            model = ResourcePredictor.load(model_path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read {model_path}: {e}")
+    if model is not None and not _stale(model, stamp, max_age):
+        _DEFAULT = model
+    else:
+        records = collect_history(history_dirs)
+        _DEFAULT = ResourcePredictor().fit(records)
+        _DEFAULT.history = stamp
+        if records:
+            _DEFAULT.save(model_path)
+            print(f"📈 Resource model fitted on {len(records)} logs → {model_path}")
+    return _DEFAULT
@@ -0,0 +1,163 @@
+# gausskit/restart.py
+"""
+Restart jobs that ran out of walltime from their checkpoint.
+
+A job killed at its time limit leaves a log without any termination line
+(and, on SLURM, a "CANCELLED ... DUE TO TIME LIMIT" notice in the .qlog).
+`timed_out()` recognises that from the backend state or the files, and
+`make_restart_input()` writes `<name>_r1.com` (then `_r2`, …) that keeps the
+same %chk and continues from it:
+
+  - optimizations : opt=(…,Restart) geom=AllCheck guess=Read
+  - frequencies   : freq=(…,Restart) geom=AllCheck guess=Read
+  - anything else : rerun with geom=AllCheck guess=Read (SCF guess reused)
+
+Title, charge/multiplicity, geometry and (for gen/genecp) the basis come
+from the checkpoint, so the restart input is only Link 0 + route; any
+--Link1-- steps after the first are carried over unchanged.
+"""
+
+import os
+import re
+
+from .backends import ACTIVE_STATES
+from .comfile import Route
+
+_RESTART_SUFFIX = re.compile(r"_r(\d+)$")
+_LINK1 = re.compile(r"^\s*--link1--\s*$", re.I)
+
+
+def _qlog_paths(base):
+    return [f"{base}.qlog", f"{base}.com.qlog"]
+
+
+def _qlog_says_time_limit(base):
+    for path in _qlog_paths(base):
+        try:
+            with open(path, "r", errors="ignore") as f:
+                if "DUE TO TIME LIMIT" in f.read():
+                    return True
+        except OSError:
+            continue
+    return False
+
+
+def log_terminated(base):
+    """True if base.log ends in Normal or Error termination."""
+    path = f"{base}.log"
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - 4096, 0))
+            tail = f.read().decode(errors="ignore")
+    except OSError:
+        return False
+    return "Normal termination" in tail or "Error termination" in tail
+
+
+def timed_out(base, state=None):
+    """
+    Did the job for `base` hit its walltime?
+      - backend/sacct state TIMEOUT
+      - a .qlog with SLURM's "DUE TO TIME LIMIT" notice
+      - a truncated log (no termination line) for a job the backend reports
+        as COMPLETED; an UNKNOWN state (squeue/sacct had nothing) may still
+        be running and is never restarted onto the same %chk
+    """
+    if state == "TIMEOUT":
+        return True
+    if state in ACTIVE_STATES or state == "CANCELLED":
+        return False
+    if not os.path.exists(f"{base}.log") or log_terminated(base):
+        return False
+    if _qlog_says_time_limit(base):
+        return True
+    return state == "COMPLETED"
+
+
+def next_restart_base(base):
+    """job → job_r1, job_r1 → job_r2, …"""
+    m = _RESTART_SUFFIX.search(base)
+    if m:
+        return f"{base[:m.start()]}_r{int(m.group(1)) + 1}"
+    return f"{base}_r1"
+
+
+def restart_count(base):
+    m = _RESTART_SUFFIX.search(base)
+    return int(m.group(1)) if m else 0
+
+
+def restart_route(route):
+    """Rewrite a route section so the job continues from its checkpoint."""
+    r = Route.parse(route)
+    # geometry, guess and read-in basis all come from the checkpoint
+    r.remove("geom guess")
+    for kw in r.keywords:
+        if kw.model and kw.name.split("/", 1)[1].lower() in ("gen", "genecp"):
+            kw.name = kw.name.split("/", 1)[0] + "/ChkBasis"
+        elif kw.key in ("gen", "genecp"):
+            kw.name = "ChkBasis"
+    if r.has("opt"):
+        # constraints live in the checkpoint; ModRedundant input is not read again
+        r.remove("opt=modredundant")
+        r.add("opt=Restart")
+    elif r.has("freq"):
+        r.add("freq=Restart")
+    r.add("geom=AllCheck guess=Read")
+    return str(r)
+
+
+def make_restart_input(base, new_base=None):
+    """
+    Write the restart input for `base`.com and return its base name, or
+    None if no usable %chk exists.
+    """
+    com = f"{base}.com"
+    try:
+        with open(com, "r", errors="ignore") as f:
+            lines = f.read().splitlines()
+    except OSError as e:
+        print(f"❌ Cannot read {com}: {e}")
+        return None
+
+    # first step only; later --Link1-- steps are copied verbatim
+    rest = []
+    for i, L in enumerate(lines):
+        if _LINK1.match(L):
+            lines, rest = lines[:i], lines[i:]
+            break
+
+    link0, route, chk = [], [], None
+    i = 0
+    while i < len(lines) and not lines[i].strip().startswith("#"):
+        s = lines[i].strip()
+        if s.startswith("%"):
+            if s.lower().startswith("%chk="):
+                chk = s.split("=", 1)[1].strip()
+            if not s.lower().startswith("%oldchk="):
+                link0.append(s)
+        i += 1
+    while i < len(lines) and lines[i].strip():
+        route.append(lines[i].strip())
+        i += 1
+
+    if not route:
+        print(f"❌ No route section in {com}.")
+        return None
+    if not chk:
+        print(f"❌ {com} has no %chk — cannot restart from checkpoint.")
+        return None
+    chk_path = os.path.join(os.path.dirname(os.path.abspath(com)), chk)
+    if not os.path.exists(chk_path):
+        print(f"❌ Checkpoint {chk} of {com} not found — cannot restart.")
+        return None
+
+    new_base = new_base or next_restart_base(base)
+    body = link0 + [restart_route(" ".join(route)), ""]
+    if rest:
+        body += rest
+    with open(f"{new_base}.com", "w") as f:
+        f.write("\n".join(body).rstrip("\n") + "\n\n")
+    print(f"🔁 Restart input {new_base}.com written from {chk}.")
+    return new_base
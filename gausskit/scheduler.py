@@ -1,6 +1,7 @@
 # gausskit/scheduler.py
 
 import os, re
+import shutil
 import sys
 import time
 import subprocess
@@ -14,7 +15,16 @@ from prompt_toolkit import prompt
 from prompt_toolkit.completion import WordCompleter, PathCompleter
 
 from gausskit.completions import tab_autocomplete_prompt, HybridCompleter
+from .backends import make_backend, SubmissionError, TERMINAL_STATES
 from .generator import create_default_fc_input
+from .lint import lint_input, lint_before_submit, print_issues
+from .metrics import SchedulerMetrics, metrics_path
+from .ordering import ORDER_POLICIES, order_backlog, simulate_schedule
+from .partition import (
+    SlurmPartitionMonitor, PARTITION_POLICIES, rank_partitions,
+    parse_slurm_time, format_seconds, parse_costs, env_costs,
+)
+from .restart import timed_out, log_terminated, make_restart_input, restart_count
 
 
 def daemonize(logfile="gausskit-scheduler.log"):
@@ -39,7 +49,9 @@ def daemonize(logfile="gausskit-scheduler.log"):
 
 class GaussianJobScheduler:
     """
-    Orchestrates submission of Gaussian (.com) jobs via submit_cmd:
+    Orchestrates submission of Gaussian (.com) jobs via submit_cmd
+    (an execution backend from gausskit.backends: Hgbatch, gsub, sbatch,
+    or a local core-aware runner):
       - Chain mode (GS→ES→FC)
       - Single-job mode
       - Batch mode (all .com without .log)
@@ -66,6 +78,21 @@ class GaussianJobScheduler:
         max_primary=2,
         fallback_part=None,
         wait_for_slot=True,
+        partition_policy=None,
+        candidate_parts=None,
+        partition_costs=None,
+        sinfo_ttl=60,
+        predict_resources=False,
+        order_policy="fifo",
+        local_cores=None,
+        auto_restart=True,
+        max_restarts=3,
+        fix_failures=False,
+        max_retries=3,
+        metrics_file=None,
+        prom_file=None,
+        backend=None,
+        lint=True,
     ):
         # --- job inputs & SLURM settings ---
         self.gs_input = gs_input
@@ -77,6 +104,9 @@ class GaussianJobScheduler:
         self.time_limit = time_limit
         self.gdv = gdv
         self.submit_cmd = submit_cmd
+        # sbatch / hgbatch / gsub / local (anything else runs locally as a command);
+        # the scheduler daemon passes in one backend shared across its sessions
+        self.backend = backend or make_backend(submit_cmd, gdv=gdv, max_cores=local_cores)
 
         # --- email notification settings ---
         self.email_notify = email_notify
@@ -87,34 +117,114 @@ class GaussianJobScheduler:
         self.quota_enabled = quota_enabled
         self.primary_part = primary_part
         self.max_primary = max_primary
-        self.fallback_part = fallback_part
+        # a fallback equal to the primary is no fallback (the prompt defaults to it)
+        self.fallback_part = fallback_part if fallback_part != primary_part else None
         self.wait_for_slot = wait_for_slot
+        self.refusal = None     # why the last submit_job() returned None: missing/lint/error/full
+
+        # --- adaptive partition policy (see gausskit.partition) ---
+        self.partition_policy = partition_policy
+        self.candidate_parts = list(candidate_parts or [])
+        self.monitor = None
+        if partition_policy:
+            if partition_policy not in PARTITION_POLICIES:
+                raise ValueError(f"Unknown partition policy: {partition_policy}")
+            if partition_costs is None:
+                partition_costs = env_costs()
+            if partition_policy == "cheapest" and not partition_costs:
+                raise ValueError("Partition policy 'cheapest' needs partition costs "
+                                 "(partition_costs or $GAUSSKIT_PARTITION_COSTS)")
+            self.monitor = SlurmPartitionMonitor(ttl=sinfo_ttl, costs=partition_costs,
+                                                 job_cpus=int(nproc))
+
+        # --- historical resource prediction (see gausskit.predictor) ---
+        self.predict_resources = predict_resources
+        self.predictor = None
+        if predict_resources:
+            from .predictor import default_predictor
+            self.predictor = default_predictor()
+
+        # --- batch backlog ordering (see gausskit.ordering) ---
+        if order_policy not in ORDER_POLICIES:
+            raise ValueError(f"Unknown order policy: {order_policy}")
+        self.order_policy = order_policy
+
+        # --- walltime restarts from checkpoint (see gausskit.restart) ---
+        self.auto_restart = auto_restart
+        self.max_restarts = max_restarts
+        self.restarted = {}     # base → restart base that replaced it
+        self.given_up = set()   # timed out again after max_restarts
+        self.killed = {}        # base → backend state of a job that ended without a termination line
+
+        # --- per-job failure handling ---
+        self.fix_failures = fix_failures
+        self.failed = set()
+        self.max_retries = max_retries
+        self.retries = {}       # base → fix-and-resubmit attempts
+        self.fix_plans = {}     # base → {(link, error): fix ladder step}
+        self.fix_ladders = {}   # base → {(link, error): fixes ranked by gausskit.fixdb}
+        self.job_resources = {} # base → (nproc, time_limit, mem_mb) of its first submission
+
+        # --- pre-submission input lint (see gausskit.lint) ---
+        self.lint = lint
+        self.linted = {}        # input base → .com mtime when it last passed
+
+        # --- metrics: JSON lines + Prometheus textfile (see gausskit.metrics) ---
+        # None → $GAUSSKIT_METRICS (off when unset); "" → off
+        if metrics_file is None:
+            metrics_file = metrics_path()
+        self.metrics = SchedulerMetrics(metrics_file, prom_file)
 
         # will collect (basename, jobid) for email
         self.submitted_jobs = []
+        self.job_ids = {}       # base → latest Job ID
 
     def count_user_jobs(self, partition):
         """
         Return how many jobs this user currently has in a given SLURM partition.
         """
-        user = getpass.getuser()
-        res = subprocess.run(
-            ["squeue", "-u", user, "-h", "-p", partition],
-            capture_output=True,
-            text=True,
-        )
-        # count only non-blank lines
-        return len([L for L in res.stdout.splitlines() if L.strip()])
+        return self.backend.count_jobs(partition)
+
+    def _policy_partitions(self, time_limit=None):
+        """
+        Rank partitions with `self.partition_policy` using cached sinfo/squeue
+        data.  Partitions whose time limit is shorter than `time_limit`
+        (default `self.time_limit`) are dropped.
+        """
+        candidates = self.candidate_parts or [
+            p for p in (self.primary_part, self.fallback_part, self.partition) if p
+        ]
+        request = {
+            "candidates": list(dict.fromkeys(candidates)),
+            "walltime": parse_slurm_time(time_limit or self.time_limit),
+            "primary": self.primary_part if self.quota_enabled else None,
+            "max_primary": self.max_primary if self.quota_enabled else None,
+        }
+        states = self.monitor.snapshot()
+        ranked = rank_partitions(self.partition_policy, states, request)
+        if ranked:
+            best = states.get(ranked[0])
+            eta = format_seconds(best.est_wait) if best else "n/a"
+            print(f"📊 Policy '{self.partition_policy}' → {', '.join(ranked)} (best start ≈ {eta})")
+        else:
+            print(f"⚠️ Policy '{self.partition_policy}': no partition fits time limit {time_limit or self.time_limit}")
+        return ranked
 
     def _choose_partition(self):
         """
         Pick a partition for submission:
+          - If a partition policy is set: its top-ranked partition
           - If quota is disabled: return `self.partition`
           - If primary has slots: return primary
           - Else if fallback defined: return fallback
           - Else if wait_for_slot: block until primary has a slot
           - Else: return primary anyway
         """
+        if self.partition_policy:
+            ranked = self._policy_partitions()
+            if ranked:
+                return ranked[0]
+
         if not self.quota_enabled:
             return self.partition
 
@@ -138,20 +248,41 @@ class GaussianJobScheduler:
         return self.primary_part
 
 
-    def submit_job(self, input_base):
+    def submit_job(self, input_base, resources=None):
         """
-        Submit `input_base`.com via submit_cmd, retrying across partitions until
+        Submit `input_base`.com via the execution backend, retrying across partitions until
         we get a numeric Job ID (or indefinitely if wait_for_slot=True).
-        Returns the Job ID string, or None if the submission itself fails.
+        `resources` = (nproc, time_limit, mem_mb) overrides defaults and prediction.
+        Returns the Job ID string, or None (reason in self.refusal) if nothing was submitted.
         """
         com = f"{input_base}.com"
+        self.refusal = None
         if not os.path.exists(com):
             print(f"❌ Missing input file: {com}")
+            self.refusal = "missing"
             return None
+        if self.lint and self.linted.get(input_base) != os.path.getmtime(com):
+            if print_issues(lint_input(com)):
+                print(f"🚫 {com} not submitted: fix the input above (see `gausskit lint`).")
+                self.refusal = "lint"
+                return None
+            self.linted[input_base] = os.path.getmtime(com)
     
+        nproc, time_limit, mem = self.nproc, self.time_limit, None
+        if resources:
+            nproc, time_limit, mem = resources
+        elif self.predictor:
+            sug = self.predictor.suggest(com, default_nproc=nproc, default_time=time_limit)
+            nproc, time_limit, mem = sug["nproc"], sug["time"], sug["mem_mb"]
+            print(f"📈 Predicted resources for {com}: {nproc} cores, {time_limit}, {mem} MB")
+
         # Build list of partitions to attempt, in order
         parts = []
-        if self.quota_enabled:
+        if self.partition_policy:
+            parts = self._policy_partitions(time_limit) or [
+                self.primary_part if self.quota_enabled else self.partition
+            ]
+        elif self.quota_enabled:
             parts.append(self.primary_part)
             if self.fallback_part:
                 parts.append(self.fallback_part)
@@ -169,57 +300,38 @@ class GaussianJobScheduler:
                         print(f"⚠️ Primary '{part}' full ({cnt}/{self.max_primary}), skipping.")
                         continue
     
-                if self.submit_cmd.lower() == "hgbatch":
-                    cmd = [
-                        "Hgbatch",
-                        "-n", str(self.nproc),
-                        "-p", part,
-                        "-t", self.time_limit,
-                        "--gdv", self.gdv,
-                        com,
-                    ]
-                elif self.submit_cmd.lower() == "gsub":
-                    cmd = [
-                        "gsub",
-                        "-n", str(self.nproc),
-                        "-p", part,
-                        "-t", self.time_limit,
-                        com,
-                    ]
-                else:  # direct g16 call or fallback
-                    cmd = [self.submit_cmd, com]
-    
-                result = subprocess.run(cmd, capture_output=True, text=True)
-    
-                if result.returncode != 0:
-                    print(f"❌ Submission failed (return code ≠ 0) on '{part}':\n{result.stderr.strip()}")
-                    return None
-    
-                match = re.search(r"\b(\d+)\b", result.stdout)
-                jobid = match.group(1) if match else None
-
-                stderr_lower = result.stderr.lower()
-                if "error" in stderr_lower or "qos" in stderr_lower or "limit" in stderr_lower:
-                    print(f"❌ Submission error in stderr on '{part}':\n{result.stderr.strip()}")
+                try:
+                    jobid = self.backend.submit(com, nproc=nproc, partition=part,
+                                                time_limit=time_limit, mem=mem)
+                except SubmissionError as e:
+                    print(f"❌ Submission failed on '{part}':\n{e}")
+                    self.refusal = "error"
                     return None
     
                 if not jobid or jobid in {"0", "00"}:
-                    print(f"⚠️ Invalid or missing Job ID from stdout:\n{result.stdout.strip()}")
-                    print(f"⚠️ STDERR output was:\n{result.stderr.strip()}")
-                    print(f"⚠️ Command used: {' '.join(cmd)}")
+                    print(f"⚠️ No Job ID from {self.backend.name} for {com} on '{part}'.")
                 else:
                     print(f"✅ Submitted {com} → Job ID {jobid} (partition={part})")
                     if jobid and jobid.isdigit() and jobid not in {"0", "00"}:
                         self.submitted_jobs.append((input_base, jobid))
+                        self.job_ids[input_base] = jobid
+                        self.killed.pop(input_base, None)
+                        self.job_resources.setdefault(input_base, (nproc, time_limit, mem))
+                        self.metrics.submitted(input_base, jobid, part, nproc)
+                        if self.monitor:
+                            self.monitor.note_submission(part)
 
                     return jobid
     
             if not self.wait_for_slot:
                 print("❌ All partitions full (and wait_for_slot=False). Aborting.")
+                self.refusal = "full"
                 return None
     
             print(f"⏳ Waiting {self.poll_interval}s before retrying submissions…")
             time.sleep(self.poll_interval)
+            if self.partition_policy:
+                parts = self._policy_partitions(time_limit) or parts
 
 
 #    def submit_job(self, input_base):
@@ -358,49 +470,216 @@ class GaussianJobScheduler:
 
     
  
+    def resolve(self, base):
+        """Follow walltime restarts: the base whose log decides `base`'s outcome."""
+        while self.restarted.get(base):
+            base = self.restarted[base]
+        return base
+
+    def _restart_timeouts(self, bases):
+        """
+        Ask the backend about jobs among `bases` whose log has no termination
+        line.  Jobs that ran out of walltime are resubmitted from their %chk
+        (with auto_restart); jobs the backend ended any other way (CANCELLED,
+        FAILED, OUT_OF_MEMORY, NODE_FAIL, or finished without writing a log)
+        never will terminate their log and go into `self.killed`, which
+        `_job_outcome` reports as failed.
+        Returns {old base: restart base} for this round.
+        """
+        cands = [b for b in bases
+                 if b not in self.restarted and b not in self.given_up and b not in self.killed
+                 and not log_terminated(b)]
+        if not cands:
+            return {}
+        ids = [self.job_ids[b] for b in cands if self.job_ids.get(b)]
+        try:
+            states = self.backend.bulk_status(ids) if ids else {}
+        except SubmissionError as e:
+            print(f"⚠️ Could not query job states: {e}")
+            states = {}
+        moved = {}
+        for b in cands:
+            state = states.get(self.job_ids.get(b))
+            if not (self.auto_restart and timed_out(b, state)):
+                if state in TERMINAL_STATES and not log_terminated(b):
+                    where = f"{b}.log has no termination line" if os.path.exists(f"{b}.log") else f"no {b}.log"
+                    print(f"❌ {b} (Job ID {self.job_ids[b]}) ended as {state}; {where}.")
+                    self.killed[b] = state
+                continue
+            if restart_count(b) >= self.max_restarts:
+                print(f"❌ {b} hit the walltime again after {self.max_restarts} restarts; giving up.")
+                self.given_up.add(b)
+                continue
+            new = make_restart_input(b)
+            if not new:
+                self.given_up.add(b)
+                continue
+            jid = self.submit_job(new, resources=self.job_resources.get(b))
+            if not jid:
+                self.given_up.add(b)
+                continue
+            print(f"⏱️ {b} hit the walltime → restarted as {new} (Job ID {jid})")
+            self.metrics.finished(b, "timeout")
+            self.restarted[b] = new
+            moved[b] = new
+        return moved
+
+    def _log_tail(self, base, nbytes=4096):
+        """Last lines of base.log, or None if it does not exist yet."""
+        log_path = f"{base}.log"
+        if not os.path.exists(log_path):
+            return None
+        try:
+            with open(log_path, "rb") as f:
+                f.seek(-nbytes, os.SEEK_END)
+                return f.read().decode(errors="ignore").splitlines()
+        except OSError:
+            with open(log_path, "r", errors="ignore") as f:
+                return f.readlines()[-100:]
+
+    def _fix_and_resubmit(self, base):
+        """
+        Error-fix-and-resubmit loop for a failed job: match base.log against
+        gaussian_errors.yaml and move one step up that error's fix ladder
+        (`fix`, then its `escalation` steps, reordered by their success in
+        the fix history, see gausskit.fixdb).  base.com is rebuilt from the
+        original input (kept as base.com.orig) with the current step of
+        every error seen so far and linted; only then is the failed log moved
+        to base.log.failN and the job resubmitted with its original
+        cores/walltime.  A step that cannot be applied, fails the lint or is
+        refused by the queue puts base.com and base.log back as they were,
+        costs one retry and the next step is tried.
+        Returns True if the job was resubmitted, False once the retry budget
+        or the ladder is exhausted.
+        """
+        from .error_fixer import load_error_db, extract_log_content, match_errors, apply_fixes, fix_ladder
+        from .fixdb import default_history, describe_fix
+
+        hist = default_history()
+        if hist:
+            hist.resolve_pending()
+        db = load_error_db()
+        matches = match_errors(extract_log_content(f"{base}.log"), db) if os.path.exists(f"{base}.log") else []
+        plan = self.fix_plans.setdefault(base, {})      # (link, name) → ladder step
+        ladders = self.fix_ladders.setdefault(base, {})  # (link, name) → fixes, best first
+        com, orig, log = f"{base}.com", f"{base}.com.orig", f"{base}.log"
+        if not os.path.exists(orig):
+            shutil.copyfile(com, orig)
+        with open(com) as f:
+            before = f.read()       # the input base.log came from
+
+        while True:
+            n = self.retries.get(base, 0)
+            if n >= self.max_retries:
+                print(f"❌ {base}: retry budget of {self.max_retries} used up.")
+                return False
+            step = None
+            for link, name, _, _ in matches:
+                if (link, name) not in ladders:
+                    ladder = fix_ladder(db[link][name])
+                    ladders[(link, name)] = hist.rank_fixes(link, name, ladder) if hist else ladder
+                ladder = ladders[(link, name)]
+                rung = plan[(link, name)] + 1 if (link, name) in plan else 0
+                if rung < len(ladder):
+                    step = (link, name, rung, len(ladder))
+                    break
+            if step is None:
+                what = "further " if plan else ""
+                print(f"ℹ️ No {what}automatic fix known for {base}.log.")
+                return False
+            link, name, rung, nsteps = step
+            plan[(link, name)] = rung
+            self.retries[base] = n + 1
+            fix = ladders[(link, name)][rung]
+
+            applied = time.time()
+            shutil.copyfile(orig, com)
+            if not all(apply_fixes(com, ladders[key][r]) for key, r in plan.items()):
+                reason = "could not be applied"
+            elif self.lint and print_issues(lint_input(com)):
+                reason = "fails lint"
+            else:
+                failed = f"{base}.log.fail{n + 1}"
+                os.replace(log, failed)
+                jid = self.submit_job(base, resources=self.job_resources.get(base))
+                if jid:
+                    if hist:
+                        hist.record_applied(link, name, fix, base, jid, applied)
+                    print(f"🔧 {base}: [{link}] {name} fix step {rung + 1}/{nsteps} ({describe_fix(fix)}), "
+                          f"retry {n + 1}/{self.max_retries} → Job ID {jid}")
+                    return True
+                os.replace(failed, log)
+                reason = f"not submitted ({self.refusal})"
+            with open(com, "w") as f:
+                f.write(before)
+            print(f"↩️ {base}: [{link}] {name} fix step {rung + 1}/{nsteps} ({describe_fix(fix)}) "
+                  f"{reason}; retry {n + 1}/{self.max_retries} spent.")
+
     def wait_for(self, label, checks):
         """
-        Block until **all** (base, keyword) in `checks` are satisfied in the tail of their log file.
-        If any log shows 'Error termination', abort immediately.
+        Block until every (base, keyword) in `checks` is satisfied in the tail
+        of its log file, or that job has failed.
+        A failed job (Error termination, ended by the backend without one —
+        CANCELLED, FAILED, OUT_OF_MEMORY, NODE_FAIL, also before it wrote a
+        log — or no restart possible after hitting the walltime) is marked failed — and with fix_failures, sent through
+        the fix-and-resubmit loop until its retry budget is spent — while the
+        others keep being watched.  Jobs that hit the walltime are restarted
+        from their checkpoint and the restart is watched instead.
+        Returns {base: 'ok' | 'failed'} for the bases in `checks`.
         """
         print(f"⏳ Waiting for {label} …")
+        keywords = dict(checks)
+        current = {b: b for b in keywords}      # base in checks → base being watched
+        outcome = {}
         while True:
-            all_done = True
-            for base, keyword in checks:
-                log_path = f"{base}.log"
-                if not os.path.exists(log_path):
-                    all_done = False
-                    continue
-    
-                # Check for error termination first
-                try:
-                    with open(log_path, "rb") as f:
-                        f.seek(-4096, os.SEEK_END)
-                        tail = f.read().decode(errors="ignore").splitlines()
-                except OSError:
-                    with open(log_path, "r", errors="ignore") as f:
-                        tail = f.readlines()[-100:]
-    
-                for line in tail:
-                    if "Error termination" in line:
-                        print(f"❌ ERROR termination detected in {base}.log")
-                        self.send_email(
-                            subject="❌ GaussKit: Job Failed",
-                            body=f"Failure detected.\nCheck {base}.log.",
-                            tail_log=f"{base}.log"
-                        )
-#                        self.send_email("GaussKit: Job Chain Failed ❌", f"Failure detected.\nCheck {base}.log.")
-
-                        sys.exit(1)  # exit the program
-    
-                if not any(keyword in line for line in tail):
-                    all_done = False
-    
-            if all_done:
-                print(f"✅ {label} done.")
-                return
-    
+            with self.metrics.poll(len(current) - len(outcome)):
+                for orig, base in current.items():
+                    if orig in outcome:
+                        continue
+                    if base in self.failed:     # given up while the backlog was fed
+                        outcome[orig] = "failed"
+                        continue
+                    tail = self._log_tail(base)
+                    if tail is None and base not in self.killed:
+                        continue
+                    tail = tail or []
+                    self.metrics.started(base)
+                    # Check for error termination first
+                    if (base in self.given_up or base in self.killed
+                            or any("Error termination" in L for L in tail)):
+                        if base not in self.given_up and base not in self.killed:
+                            print(f"❌ ERROR termination detected in {base}.log")
+                        self.metrics.finished(base, "failed")
+                        if self.fix_failures and self._fix_and_resubmit(base):
+                            continue
+                        outcome[orig] = "failed"
+                        self.failed.add(base)
+                    elif any(keywords[orig] in L for L in tail):
+                        outcome[orig] = "ok"
+                        self.metrics.finished(base, "ok")
+
+                pending = [o for o in current if o not in outcome]
+                if pending:
+                    moved = self._restart_timeouts([current[o] for o in pending])
+                    for o in pending:
+                        current[o] = moved.get(current[o], current[o])
+
+            if not pending:
+                self.metrics.write_prom()
+                nfail = sum(1 for v in outcome.values() if v == "failed")
+                if nfail:
+                    print(f"⚠️ {label} finished: {len(outcome) - nfail} succeeded, {nfail} failed.")
+                else:
+                    print(f"✅ {label} done.")
+                return outcome
+
             time.sleep(self.poll_interval)
+
+    def summary(self, outcome):
+        """One-line success/failure/retry count for a wait_for() result."""
+        ok = sum(1 for v in outcome.values() if v == "ok")
+        return (f"{ok} succeeded, {len(outcome) - ok} failed, "
+                f"{sum(self.retries.values())} fix retries, {len(self.restarted)} walltime restarts")
     
     
     def send_email(self, subject=None, body=None, tail_log=None):
@@ -464,9 +743,10 @@ class GaussianJobScheduler:
         self.wait_for("GS", [(self.gs_input, "Normal termination")])
         self.wait_for("ES", [(self.es_input, "Normal termination")])
     
-        # Check GS
-        gs_log = f"{self.gs_input}.log"
-        if not self.log_terminated_successfully(self.gs_input):
+        # Check GS (or its walltime restart)
+        gs = self.resolve(self.gs_input)
+        gs_log = f"{gs}.log"
+        if not self.log_terminated_successfully(gs):
             self.send_email(
                 subject="❌ GaussKit: GS Job Failed",
                 body=f"Failure detected in GS job: {gs_log}",
@@ -475,9 +755,10 @@ class GaussianJobScheduler:
             print("❌ Halting chain due to GS failure.")
             return
     
-        # Check ES
-        es_log = f"{self.es_input}.log"
-        if not self.log_terminated_successfully(self.es_input):
+        # Check ES (or its walltime restart)
+        es = self.resolve(self.es_input)
+        es_log = f"{es}.log"
+        if not self.log_terminated_successfully(es):
             self.send_email(
                 subject="❌ GaussKit: ES Job Failed",
                 body=f"Failure detected in ES job: {es_log}",
@@ -491,13 +772,15 @@ class GaussianJobScheduler:
         if not fid:
             print("❌ FC submission failed.")
             return
+        self.metrics.stage(self.fc_input, [gs, es])
     
         print("⏳ Waiting for FC to finish...")
         self.wait_for("FC", [(self.fc_input, "Normal termination")])
     
         # Check FC
-        fc_log = f"{self.fc_input}.log"
-        if not self.log_terminated_successfully(self.fc_input):
+        fc = self.resolve(self.fc_input)
+        fc_log = f"{fc}.log"
+        if not self.log_terminated_successfully(fc):
             self.send_email(
                 subject="❌ GaussKit: FC Job Failed",
                 body=f"Failure detected in FC job: {fc_log}",
@@ -608,14 +891,127 @@ class GaussianJobScheduler:
         jid = self.submit_job(single_base)
         if not jid:
             return
-        self.wait_for("single job", [(single_base, "Normal termination")])
-        if self.email_notify:
+        outcome = self.wait_for("single job", [(single_base, "Normal termination")])
+        if outcome.get(single_base) == "failed":
+            base = self.resolve(single_base)
+            self.send_email(
+                subject="❌ GaussKit: Job Failed",
+                body=f"Failure detected.\nCheck {base}.log.",
+                tail_log=f"{base}.log"
+            )
+        elif self.email_notify:
             self.send_email()
 
+    def _job_outcome(self, base):
+        """'ok' / 'failed' once base.log has terminated or the backend ended the job, else None."""
+        if base in self.killed:
+            return "failed"
+        if self.check_log_tail(base, "Normal termination"):
+            return "ok"
+        if self.check_log_tail(base, "Error termination"):
+            return "failed"
+        return None
+
+    def _free_slots(self, backlog_size):
+        """How many backlog jobs may be submitted right now."""
+        if not self.quota_enabled or self.fallback_part:
+            return backlog_size
+        return max(self.max_primary - self.count_user_jobs(self.primary_part), 0)
+
+    def _report_ordering(self, fifo, ordered, costs, deps):
+        slots = self.max_primary if self.quota_enabled and not self.fallback_part else len(fifo)
+        ms_fifo, mean_fifo = simulate_schedule(fifo, costs, slots, deps)
+        ms, mean = simulate_schedule(ordered, costs, slots, deps)
+        unit = "CPU-s" if self.predictor else "cost units"
+        gain = (1 - ms / ms_fifo) * 100 if ms_fifo else 0.0
+        print(f"📋 Order '{self.order_policy}' on {slots} slot(s): predicted makespan "
+              f"{ms:.4g} vs FIFO {ms_fifo:.4g} {unit} ({gain:+.1f}% shorter), "
+              f"mean completion {mean:.4g} vs {mean_fifo:.4g}")
+
+    def _lint_backlog(self, ordered, deps):
+        """
+        Lint the whole backlog at once (checkpoints written by one input count
+        as present for the others) and drop failing inputs and the jobs that
+        would read their checkpoints.
+        """
+        bad = {com[:-4] for com in lint_before_submit([f"{b}.com" for b in ordered])}
+        blocked = set(bad)
+        while True:
+            more = {b for b in ordered if b not in blocked and deps.get(b, set()) & blocked}
+            if not more:
+                break
+            blocked |= more
+        for b in ordered:
+            if b in blocked and b not in bad:
+                print(f"⏭️ Skipping {b}: a parent input failed the lint.")
+            elif b not in blocked:
+                self.linted[b] = os.path.getmtime(f"{b}.com")
+        return [b for b in ordered if b not in blocked]
+
+    def _feed_backlog(self, ordered, deps):
+        """
+        Hold the backlog locally and submit in `ordered` order whenever a
+        quota slot is free and the job's %OldChk parents finished normally.
+        A failed parent first goes through the fix-and-resubmit loop (with
+        fix_failures); its children are only dropped once it is given up.
+        Returns the list of bases that were actually submitted.
+        """
+        backlog = list(ordered)
+        submitted, dropped = [], set()
+        while backlog:
+            progressed = False
+            with self.metrics.poll(len(backlog)):
+                for b in submitted:
+                    if os.path.exists(f"{self.resolve(b)}.log"):
+                        self.metrics.started(self.resolve(b))
+                for p in {p for b in backlog for p in deps.get(b, ())}:
+                    base = self.resolve(p)
+                    if base in self.failed or self._job_outcome(base) != "failed":
+                        continue
+                    if not (self.fix_failures and p in submitted and base not in self.given_up
+                            and self._fix_and_resubmit(base)):
+                        self.failed.add(base)
+                slots = self._free_slots(len(backlog))
+                for b in list(backlog):
+                    if slots <= 0:
+                        break
+                    parents = deps.get(b, set())
+                    states = {p: self._job_outcome(self.resolve(p)) for p in parents}
+                    for p, st in states.items():
+                        if st:
+                            self.metrics.finished(self.resolve(p), st)
+                    if any(p in dropped or self.resolve(p) in self.failed or self.resolve(p) in self.given_up
+                           for p in parents):
+                        print(f"⏭️ Skipping {b}: a parent job failed.")
+                        backlog.remove(b)
+                        dropped.add(b)
+                        progressed = True
+                        continue
+                    if not all(st == "ok" for st in states.values()):
+                        continue
+                    jid = self.submit_job(b)
+                    backlog.remove(b)
+                    progressed = True
+                    if jid:
+                        submitted.append(b)
+                        slots -= 1
+                        if parents:
+                            self.metrics.stage(b, [self.resolve(p) for p in parents])
+                    else:
+                        dropped.add(b)
+            if backlog and not progressed:
+                # parents that ran out of walltime would block their children forever
+                self._restart_timeouts([self.resolve(b) for b in submitted])
+                time.sleep(self.poll_interval)
+        return submitted
+
     def run_batch(self):
         """
         Submit every .com in cwd that lacks a .log, then wait for all
         to finish before optionally emailing.
+        With an order policy other than FIFO, quota enabled, or %OldChk
+        dependencies between inputs, the backlog is held locally and fed
+        into free slots in policy order.
         """
         bases = [f[:-4] for f in os.listdir() if f.endswith(".com")]
         todo = [b for b in bases if not os.path.exists(f"{b}.log")]
@@ -624,15 +1020,39 @@ class GaussianJobScheduler:
             print("✅ No .com without .log to submit.")
             return
 
-        # submit all at once
-        for b in todo:
-            self.submit_job(b)
+        ordered, costs, deps = order_backlog(todo, self.order_policy, self.predictor)
+        if self.lint:
+            ordered = self._lint_backlog(ordered, deps)
+            todo = [b for b in todo if b in ordered]
+            if not todo:
+                print("❌ No batch inputs passed the lint.")
+                return
+        self._report_ordering(todo, ordered, costs, deps)
+
+        if self.order_policy == "fifo" and not self.quota_enabled and not any(deps.values()):
+            # submit all at once
+            for b in ordered:
+                self.submit_job(b)
+        else:
+            todo = self._feed_backlog(ordered, deps)
+            if not todo:
+                print("❌ No batch jobs were submitted.")
+                return
 
         # then wait for all
         checks = [(b, "Normal termination") for b in todo]
-        self.wait_for(f"{len(todo)} batch jobs", checks)
+        outcome = self.wait_for(f"{len(todo)} batch jobs", checks)
+        print(f"📊 Batch summary: {self.summary(outcome)}")
+        failed = sorted(self.resolve(b) for b, v in outcome.items() if v == "failed")
+        for b in failed:
+            print(f"   ❌ {b}.log")
 
-        if self.email_notify:
+        if failed:
+            self.send_email(
+                subject=f"⚠️ GaussKit: {len(failed)} of {len(outcome)} batch jobs failed",
+                body="\n".join([self.summary(outcome), ""] + [f"  • {b}.log" for b in failed]),
+            )
+        elif self.email_notify:
             self.send_email()
 
     def run(self, mode, single_input=None):
@@ -690,9 +1110,53 @@ def run_job_scheduler():
         ans2 = prompt("Wait for slot if full? (y/n) [default: y]: ").strip().lower() or "y"
         wait_slot = ans2.startswith("y")
 
-    submit_cmd = prompt("Submission command (Hgbatch/gsub/g16) [default: Hgbatch]: ").strip() or "Hgbatch"
+    # Adaptive partition policy?
+    policies = sorted(PARTITION_POLICIES)
+    policy = prompt(
+        f"Partition policy (none/{'/'.join(policies)}) [default: none]: ",
+        completer=WordCompleter(["none"] + policies),
+    ).strip().lower() or "none"
+    if policy not in PARTITION_POLICIES:
+        policy = None
+    cand_parts = None
+    costs = None
+    if policy == "cheapest":
+        default = os.environ.get("GAUSSKIT_PARTITION_COSTS", "")
+        while True:
+            raw = prompt(f"Partition costs (name=cost,…) [default: {default or 'none'}]: ").strip() or default
+            try:
+                costs = parse_costs(raw)
+            except ValueError as e:
+                print(f"❌ {e}")
+                continue
+            break
+        if not costs:
+            print("⚠️ No partition costs given; using 'fastest-start' instead of 'cheapest'.")
+            policy = "fastest-start"
+    if policy:
+        raw = prompt("Candidate partitions (comma-sep) [default: primary/fallback]: ").strip()
+        cand_parts = [p.strip() for p in raw.split(",") if p.strip()] or None
+
+    submit_cmd = prompt(
+        "Submission command (Hgbatch/gsub/sbatch/local, or a local command like g16) [default: Hgbatch]: ",
+        completer=WordCompleter(["Hgbatch", "gsub", "sbatch", "local", "g16"]),
+    ).strip() or "Hgbatch"
+    local_cores = None
+    if submit_cmd.lower() not in ("hgbatch", "gsub", "sbatch"):
+        lc = prompt(f"Cores available on this machine [default: {os.cpu_count()}]: ").strip()
+        local_cores = int(lc) if lc else None
     nproc = prompt("Number of processors [default: 56]: ").strip() or "56"
     time_limit = prompt("Time limit (HH:MM:SS) [default: 23:50:00]: ").strip() or "23:50:00"
+    ans = prompt("Predict cores/walltime per job from finished logs? (y/n) [default: n]: ").strip().lower() or "n"
+    predict = ans.startswith("y")
+    ans = prompt("Restart jobs that hit the walltime from their checkpoint? (y/n) [default: y]: ").strip().lower() or "y"
+    restart = ans.startswith("y")
+    ans = prompt("Auto-fix failed jobs (gaussian_errors.yaml) and resubmit? (y/n) [default: n]: ").strip().lower() or "n"
+    fix_failures = ans.startswith("y")
+    max_retries = 3
+    if fix_failures:
+        mr = prompt(f"Retry budget per job [default: {max_retries}]: ").strip()
+        max_retries = int(mr) if mr else max_retries
 
 
     # Email?
@@ -715,9 +1179,42 @@ def run_job_scheduler():
             fc = create_default_fc_input(gs, es)
         else:
             fc = prompt(" FC .com: ", completer=WordCompleter(coms)).strip().removesuffix(".com")
+    # Batch ordering?
+    order = "fifo"
+    if mode == "3":
+        order = prompt(
+            f"Batch order ({'/'.join(ORDER_POLICIES)}) [default: fifo]: ",
+            completer=WordCompleter(list(ORDER_POLICIES)),
+        ).strip().lower() or "fifo"
+        if order not in ORDER_POLICIES:
+            print(f"⚠️ Unknown order '{order}', using fifo.")
+            order = "fifo"
+
     # Background?
     ans = prompt("Run scheduler in background? (y/n) [default: n]: ").strip().lower() or "n"
     bg = ans.startswith("y")
+    if bg and not email:
+        # hand the jobs to the per-user scheduler daemon instead of forking a poller
+        from .daemon import submit as daemon_submit, OPTIONS
+        opts = {
+            "backend": submit_cmd, "nproc": int(nproc), "time": time_limit,
+            "primary": primary if quota else None, "max_primary": maxp,
+            "fallback": fallback if quota else None, "wait_slot": wait_slot, "policy": policy,
+            "candidates": cand_parts, "predict": predict, "order": order,
+            "local_cores": local_cores, "restart": restart,
+            "fix": fix_failures, "max_retries": max_retries,
+        }
+        opts = {k: v for k, v in opts.items() if v != OPTIONS[k][1]}
+        if mode == "1":
+            dmode, bases = "chain", [gs, es, fc]
+        elif mode == "2":
+            dmode, bases = "single", [single]
+        else:
+            dmode, bases = "batch", []
+        if daemon_submit(dmode, bases, opts).get("ok"):
+            print("🚀 Follow it with `gausskit status` / `gausskit attach`.")
+            return
+        print("⚠️ Scheduler daemon unavailable; forking a background scheduler instead.")
     if bg and not daemonize():
         print("🚀 Scheduler is now running in background (see gausskit-scheduler.log).")
         return
@@ -740,6 +1237,15 @@ def run_job_scheduler():
         fallback_part=fallback,
         wait_for_slot=wait_slot,
         submit_cmd=submit_cmd,
+        partition_policy=policy,
+        candidate_parts=cand_parts,
+        partition_costs=costs,
+        predict_resources=predict,
+        order_policy=order,
+        local_cores=local_cores,
+        auto_restart=restart,
+        fix_failures=fix_failures,
+        max_retries=max_retries,
     )
     
     sched.run(mode, single_input=single)
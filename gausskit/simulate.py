@@ -0,0 +1,656 @@
+# gausskit/simulate.py
+"""
+Discrete-event simulator for tuning scheduler policies offline.
+
+Replays a workload through a model of the cluster and of
+`GaussianJobScheduler`'s submission logic, so settings such as
+`max_primary`, a fallback partition, a partition policy, the batch order
+or node packing can be compared before trying them for real.
+
+Workload (list of `SimJob`):
+  - synthetic_workload() : log-normal runtimes, core counts, optional
+                           GS→ES→FC-style chains and Poisson arrivals
+  - workload_from_logs() : runtimes and core counts of finished .log files
+  - workload_from_metrics(): submit/start/finish times recorded by the
+                           scheduler (gausskit-metrics.jsonl)
+
+Cluster model (dict, JSON or YAML file), per partition:
+  nodes, cores_per_node, time_limit, start_delay (s before a submitted job
+  is eligible), queue_delay (mean of an extra exponential delay), busy
+  (fraction of nodes held by other users), cost, exclusive (whole-node
+  allocation) — plus cluster-wide backfill (first-fit scan depth, 0 = strict
+  FIFO) and restart_loss (seconds of work redone after a walltime restart).
+
+Policy (dict of GaussianJobScheduler keyword names): partition,
+quota_enabled, primary_part, max_primary, fallback_part, wait_for_slot,
+partition_policy, candidate_parts, order_policy, poll_interval, nproc,
+time_limit, auto_restart, max_restarts, predict_resources.  Partition
+policies come from the same registry as the scheduler
+(`gausskit.partition.register_policy`), so new ones are simulated as soon
+as they are registered.  The scheduler only notices finished jobs at its
+poll ticks, as in `wait_for`/`_feed_backlog`.
+
+Reported: makespan, queue waits (submit → start), hold times (arrival →
+submit), chain latency, core-hours used and wasted (idle cores on
+exclusive nodes, work redone after walltime restarts, failed jobs).
+
+    gausskit simulate --jobs 2000 --policy max_primary=2 --policy max_primary=4,fallback_part=short
+    gausskit simulate --logs ~/runs --cluster cluster.yaml --sweep order_policy=fifo,sjf,critical-path
+"""
+
+import argparse
+import heapq
+import json
+import math
+import random
+import time
+
+from .metrics import QUANTILES, percentile, _fmt
+from .ordering import ORDER_POLICIES, order_jobs
+from .partition import (
+    PARTITION_POLICIES, PartitionState, SlurmPartitionMonitor,
+    parse_slurm_time, rank_partitions,
+)
+
+DEFAULT_CLUSTER = {
+    "partitions": {
+        "medium": {"nodes": 20, "cores_per_node": 56, "time_limit": "1-00:00:00",
+                   "start_delay": 60, "queue_delay": 600, "busy": 0.5},
+        "short": {"nodes": 8, "cores_per_node": 56, "time_limit": "06:00:00",
+                  "start_delay": 30, "queue_delay": 300, "busy": 0.3},
+        "test": {"nodes": 2, "cores_per_node": 56, "time_limit": "01:00:00",
+                 "start_delay": 0, "queue_delay": 0, "busy": 0.0},
+    },
+    "backfill": 100,
+    "restart_loss": 600,
+}
+
+DEFAULT_POLICY = {
+    "partition": "medium",
+    "quota_enabled": False,
+    "primary_part": "medium",
+    "max_primary": 2,
+    "fallback_part": None,
+    "wait_for_slot": True,
+    "partition_policy": None,
+    "candidate_parts": None,
+    "order_policy": "fifo",
+    "poll_interval": 10,
+    "nproc": 56,
+    "time_limit": "23:50:00",
+    "auto_restart": True,
+    "max_restarts": 3,
+    "predict_resources": False,
+}
+
+
+class SimJob:
+    """One job of the workload; `cores`/`walltime` None → the policy's nproc/time_limit."""
+
+    __slots__ = ("name", "runtime", "cores", "request", "arrival", "parents", "fails", "walltime",
+                 "remaining", "restarts", "state", "partition", "node", "alloc",
+                 "t_ready", "t_submit", "t_start", "t_end", "segment", "attempt")
+
+    def __init__(self, name, runtime, cores=None, walltime=None, arrival=0.0, parents=(), fails=False):
+        self.name = name
+        self.runtime = float(runtime)
+        self.cores = cores
+        self.request = walltime         # seconds; the simulated walltime is set per run
+        self.arrival = float(arrival)
+        self.parents = tuple(parents)
+        self.fails = fails              # ends in Error termination after its runtime
+
+    def __repr__(self):
+        return f"SimJob({self.name!r}, runtime={self.runtime:.0f}, cores={self.cores})"
+
+
+# ── workloads ─────────────────────────────────────────────────────────────────
+
+def synthetic_workload(n, runtime_median=3600, runtime_sigma=1.0, cores=(56,),
+                       chain_fraction=0.0, arrival_rate=0.0, error_rate=0.0, seed=None):
+    """
+    `n` jobs with log-normal runtimes (median, sigma of ln).  A
+    `chain_fraction` of them are grouped in three-job chains (two parents,
+    then a child), like GS/ES → FC.  `arrival_rate` jobs per hour arrive as
+    a Poisson stream; 0 puts everything in the backlog at t = 0.
+    """
+    rng = random.Random(seed)
+    jobs, t, i = [], 0.0, 0
+    mu = math.log(runtime_median)
+    while i < n:
+        if arrival_rate:
+            t += rng.expovariate(arrival_rate / 3600.0)
+
+        def make(name, parents=()):
+            return SimJob(name, rng.lognormvariate(mu, runtime_sigma), rng.choice(cores),
+                          arrival=t, parents=parents, fails=rng.random() < error_rate)
+
+        if n - i >= 3 and rng.random() < chain_fraction:
+            gs, es = make(f"job{i}_gs"), make(f"job{i}_es")
+            jobs += [gs, es, make(f"job{i}_fc", (gs.name, es.name))]
+            i += 3
+        else:
+            jobs.append(make(f"job{i}"))
+            i += 1
+    return jobs
+
+
+def workload_from_logs(paths, recursive=True):
+    """Finished logs → jobs with their wall time and core count, all arriving at t = 0."""
+    from .predictor import collect_history
+    jobs = []
+    for rec in collect_history(paths, recursive=recursive):
+        if rec["wall"] > 0:
+            jobs.append(SimJob(rec["logfile"], rec["wall"], rec["nproc"]))
+    return jobs
+
+
+def workload_from_metrics(paths):
+    """Jobs recorded by the scheduler (gausskit.metrics): real arrival times and runtimes."""
+    from .metrics import load_events
+    sub, start, jobs = {}, {}, []
+    for e in sorted(load_events(paths), key=lambda e: e.get("ts", 0)):
+        key = (e.get("run"), e.get("job"), e.get("jobid"))
+        if e.get("event") == "submitted":
+            sub[key] = e
+        elif e.get("event") == "started":
+            start[key] = e["ts"]
+        elif e.get("event") == "finished" and key in sub and key in start:
+            jobs.append(SimJob(f"{e['job']}#{e.get('jobid')}", e["ts"] - start[key],
+                               sub[key].get("nproc"), arrival=sub[key]["ts"],
+                               fails=e.get("outcome") == "failed"))
+    t0 = min((j.arrival for j in jobs), default=0.0)
+    for j in jobs:
+        j.arrival -= t0
+    return jobs
+
+
+# ── cluster model ─────────────────────────────────────────────────────────────
+
+class _Partition:
+    def __init__(self, name, spec, rng):
+        self.name = name
+        self.cores_per_node = int(spec.get("cores_per_node", 56))
+        n = int(spec.get("nodes", 1))
+        busy = int(round(n * float(spec.get("busy", 0.0))))
+        self.free = [0] * busy + [self.cores_per_node] * (n - busy)
+        self.time_limit = parse_slurm_time(str(spec["time_limit"])) if spec.get("time_limit") else None
+        self.start_delay = float(spec.get("start_delay", 0))
+        self.queue_delay = float(spec.get("queue_delay", 0))
+        self.cost = float(spec.get("cost", 1.0))
+        self.exclusive = bool(spec.get("exclusive", False))
+        self.available = spec.get("available", True)
+        self.queue = []             # eligible jobs, FIFO
+        self.mine = 0               # our jobs submitted here and not finished
+        self.rng = rng
+
+    def delay(self):
+        extra = self.rng.expovariate(1.0 / self.queue_delay) if self.queue_delay else 0.0
+        return self.start_delay + extra
+
+    def place(self, job):
+        """Node index for `job`, or None if it does not fit right now."""
+        need = self.cores_per_node if self.exclusive else job.alloc
+        for i, f in enumerate(self.free):
+            if f >= need and (not self.exclusive or f == self.cores_per_node):
+                return i
+        return None
+
+    def state(self, mean_runtime, job_cpus=None):
+        """PartitionState as SlurmPartitionMonitor sees it (mixed nodes count if `job_cpus` fit)."""
+        need = self.cores_per_node if self.exclusive or not job_cpus else min(job_cpus, self.cores_per_node)
+        st = PartitionState(self.name)
+        st.available = self.available
+        st.time_limit = self.time_limit
+        st.total_nodes = len(self.free)
+        st.idle_nodes = sum(1 for f in self.free if f >= need)
+        st.pending = len(self.queue)
+        st.my_jobs = self.mine
+        st.cost = self.cost
+        return st
+
+
+class _Monitor:
+    """Stand-in for SlurmPartitionMonitor: same wait estimate, simulated partitions."""
+
+    estimate_wait = SlurmPartitionMonitor.estimate_wait
+
+    def __init__(self, mean_runtime):
+        self.mean_runtime = mean_runtime
+
+
+# ── engine ────────────────────────────────────────────────────────────────────
+
+_ARRIVE, _POLL, _ELIGIBLE, _FINISH = range(4)
+
+
+class Simulation:
+    """One replay of `jobs` on `cluster` under `policy` (dicts merged over the defaults)."""
+
+    def __init__(self, jobs, cluster=None, policy=None, seed=0):
+        self.cluster = dict(DEFAULT_CLUSTER, **(cluster or {}))
+        self.policy = dict(DEFAULT_POLICY, **(policy or {}))
+        unknown = set(self.policy) - set(DEFAULT_POLICY)
+        if unknown:
+            raise ValueError(f"Unknown policy setting(s): {', '.join(sorted(unknown))}")
+        p = self.policy
+        if p["order_policy"] not in ORDER_POLICIES:
+            raise ValueError(f"Unknown order policy {p['order_policy']!r}")
+        if p["partition_policy"] and p["partition_policy"] not in PARTITION_POLICIES:
+            raise ValueError(f"Unknown partition policy {p['partition_policy']!r}")
+        self.rng = random.Random(seed)
+        self.parts = {name: _Partition(name, spec, self.rng)
+                      for name, spec in self.cluster["partitions"].items()}
+        used = [p["partition"]]
+        if p["quota_enabled"]:
+            used += [p["primary_part"], p["fallback_part"]]
+        if p["partition_policy"]:
+            used += list(p["candidate_parts"] or ())
+        for name in used:
+            if name and name not in self.parts:
+                raise ValueError(f"Policy uses partition {name!r} not in the cluster model")
+        self.jobs = {j.name: j for j in jobs}
+        self.default_wall = parse_slurm_time(p["time_limit"])
+        for j in self.jobs.values():
+            j.alloc = int(j.cores or p["nproc"])
+            j.walltime = j.request or self._walltime(j)
+            j.remaining, j.restarts, j.state, j.attempt = j.runtime, 0, "new", 0
+            j.partition = j.node = j.t_submit = j.t_start = j.t_end = None
+            j.t_ready = None
+        self.children = {n: [] for n in self.jobs}
+        for j in self.jobs.values():
+            for par in j.parents:
+                if par in self.children:
+                    self.children[par].append(j.name)
+        costs = {n: j.runtime for n, j in self.jobs.items()}
+        deps = {n: set(j.parents) for n, j in self.jobs.items()}
+        fifo = sorted(self.jobs, key=lambda n: self.jobs[n].arrival)
+        self.rank = {n: i for i, n in enumerate(order_jobs(fifo, costs, deps, p["order_policy"]))}
+        self.mean_runtime = (sum(costs.values()) / len(costs)) if costs else 3600.0
+        self.monitor = _Monitor(self.mean_runtime)
+
+        self.events, self._seq = [], 0
+        self.polls_at = set()
+        self.ready = []             # (rank, seq, name) — arrived, parents done, not submitted
+        self.noticed = []           # finished since the last poll
+        self.restart_queue = []     # timed out, waiting to be restarted at the next poll
+        self.now = 0.0
+        self.waits, self.holds, self.latencies = [], [], []
+        self.used = self.waste_packing = self.waste_restart = self.waste_failed = 0.0
+        self.submissions = self.polls = 0
+
+    def _walltime(self, job):
+        if self.policy["predict_resources"]:
+            # prediction with a 1.3 margin and log-normal error, capped by the limit
+            guess = job.runtime * 1.3 * self.rng.lognormvariate(0.0, 0.3)
+            return min(max(guess, 60.0), self.default_wall or guess)
+        return self.default_wall or float("inf")
+
+    # -- event queue -------------------------------------------------------
+
+    def _push(self, t, kind, payload=None):
+        self._seq += 1
+        heapq.heappush(self.events, (t, self._seq, kind, payload))
+
+    def _request_poll(self, t):
+        pi = self.policy["poll_interval"]
+        tp = math.ceil(t / pi) * pi if pi else t
+        if tp not in self.polls_at:
+            self.polls_at.add(tp)
+            self._push(tp, _POLL)
+
+    # -- scheduler side ----------------------------------------------------
+
+    def _make_ready(self, job):
+        job.state, job.t_ready = "ready", self.now
+        heapq.heappush(self.ready, (self.rank[job.name], job.attempt, job.name))
+
+    def _candidates(self, job, states):
+        p = self.policy
+        if p["partition_policy"]:
+            request = {
+                "candidates": p["candidate_parts"] or list(dict.fromkeys(
+                    x for x in (p["primary_part"], p["fallback_part"], p["partition"]) if x)),
+                "walltime": job.walltime,
+                "primary": p["primary_part"] if p["quota_enabled"] else None,
+                "max_primary": p["max_primary"] if p["quota_enabled"] else None,
+            }
+            ranked = rank_partitions(p["partition_policy"], states, request)
+            return ranked or [p["primary_part"] if p["quota_enabled"] else p["partition"]]
+        if p["quota_enabled"]:
+            return [x for x in (p["primary_part"], p["fallback_part"]) if x]
+        return [p["partition"]]
+
+    def _poll(self):
+        p = self.policy
+        self.polls += 1
+        self.polls_at.discard(self.now)
+        # 1) finished jobs the scheduler now sees
+        for job in self.noticed:
+            if job.state == "ok":
+                for c in self.children[job.name]:
+                    child = self.jobs[c]
+                    if child.state == "blocked" and all(self.jobs[x].state == "ok"
+                                                        for x in child.parents if x in self.jobs):
+                        self._make_ready(child)
+            elif job.state in ("failed", "skipped"):
+                self._skip_children(job)
+        self.noticed = []
+        # 2) walltime restarts go ahead of the backlog
+        for job in self.restart_queue:
+            job.attempt += 1
+            job.state = "ready"
+            heapq.heappush(self.ready, (-1, job.attempt, job.name))
+        self.restart_queue = []
+        # 3) feed free slots in policy order
+        if p["quota_enabled"] and not p["fallback_part"]:
+            slots = max(p["max_primary"] - self.parts[p["primary_part"]].mine, 0)
+        else:
+            slots = len(self.ready)
+        states = None
+        if p["partition_policy"]:
+            states = {n: part.state(self.mean_runtime, int(p["nproc"])) for n, part in self.parts.items()}
+            for st in states.values():
+                st.est_wait = self.monitor.estimate_wait(st)
+        while self.ready and slots > 0:
+            _, _, name = heapq.heappop(self.ready)
+            job = self.jobs[name]
+            target = None
+            for part in self._candidates(job, states):
+                P = self.parts[part]
+                if p["quota_enabled"] and part == p["primary_part"] and P.mine >= p["max_primary"]:
+                    continue
+                target = P
+                break
+            if target is None:
+                if p["wait_for_slot"]:
+                    heapq.heappush(self.ready, (self.rank[name] if not job.attempt else -1, job.attempt, name))
+                    break
+                self._fail(job)
+                continue
+            if target.time_limit is not None and job.walltime > target.time_limit:
+                self._fail(job, "rejected")     # sbatch refuses it; submit_job drops the job
+                continue
+            self._submit(job, target, states)
+            slots -= 1
+
+    def _submit(self, job, part, states):
+        job.state, job.partition, job.t_submit = "queued", part.name, self.now
+        part.mine += 1
+        self.submissions += 1
+        if job.attempt == 0:
+            self.holds.append(self.now - job.arrival)
+            done = [self.jobs[x].t_end for x in job.parents if x in self.jobs]
+            if done:
+                self.latencies.append(self.now - max(done))
+        if states is not None:                 # like SlurmPartitionMonitor.note_submission
+            st = states[part.name]
+            st.my_jobs += 1
+            if st.idle_nodes > 0:
+                st.idle_nodes -= 1
+            else:
+                st.pending += 1
+            st.est_wait = self.monitor.estimate_wait(st)
+        self._push(self.now + part.delay(), _ELIGIBLE, job.name)
+
+    def _fail(self, job, state="failed"):
+        job.state, job.t_end = state, self.now
+        self._skip_children(job)
+
+    def _skip_children(self, job):
+        stack = list(self.children[job.name])
+        while stack:
+            c = self.jobs[stack.pop()]
+            if c.state in ("blocked", "ready", "new"):
+                c.state, c.t_end = "skipped", self.now
+                stack += self.children[c.name]
+
+    # -- cluster side ------------------------------------------------------
+
+    def _try_start(self, part):
+        depth = int(self.cluster.get("backfill", 0)) or 1
+        i = 0
+        while i < len(part.queue) and i < depth:
+            job = part.queue[i]
+            node = part.place(job)
+            if node is None:
+                if depth == 1:
+                    return
+                i += 1
+                continue
+            part.queue.pop(i)
+            held = part.cores_per_node if part.exclusive else job.alloc
+            part.free[node] -= held
+            job.node, job.state, job.t_start = node, "running", self.now
+            self.waits.append(self.now - job.t_submit)
+            job.segment = min(job.remaining, job.walltime)
+            self._push(self.now + job.segment, _FINISH, (job.name, job.attempt))
+
+    def _finish(self, job):
+        part = self.parts[job.partition]
+        held = part.cores_per_node if part.exclusive else job.alloc
+        part.free[job.node] += held
+        part.mine -= 1
+        seg = job.segment
+        self.used += held * seg
+        self.waste_packing += (held - job.alloc) * seg
+        job.t_end = self.now
+        if job.remaining > job.walltime:
+            # hit the walltime: restart from the checkpoint, redoing some work
+            lost = min(float(self.cluster.get("restart_loss", 0)), seg)
+            if self.policy["auto_restart"] and job.restarts < self.policy["max_restarts"]:
+                job.remaining -= seg - lost
+                job.restarts += 1
+                self.waste_restart += job.alloc * lost
+                job.state = "timeout"
+                self.restart_queue.append(job)
+            else:
+                job.state = "failed"
+                self.waste_failed += job.alloc * seg
+                self.noticed.append(job)
+        elif job.fails:
+            job.state = "failed"
+            self.waste_failed += job.alloc * seg
+            self.noticed.append(job)
+        else:
+            job.remaining = 0.0
+            job.state = "ok"
+            self.noticed.append(job)
+        self._request_poll(self.now)
+        self._try_start(part)
+
+    # -- main loop ---------------------------------------------------------
+
+    def run(self):
+        t0 = time.perf_counter()
+        for job in self.jobs.values():
+            self._push(job.arrival, _ARRIVE, job.name)
+        while self.events:
+            self.now, _, kind, payload = heapq.heappop(self.events)
+            if kind == _ARRIVE:
+                job = self.jobs[payload]
+                if job.state != "new":
+                    continue                       # skipped before it arrived
+                parents = [self.jobs[x] for x in job.parents if x in self.jobs]
+                if any(x.state in ("failed", "skipped") for x in parents):
+                    job.state = "skipped"
+                elif all(x.state == "ok" for x in parents):
+                    self._make_ready(job)
+                else:
+                    job.state = "blocked"
+                self._request_poll(self.now)
+            elif kind == _POLL:
+                self._poll()
+            elif kind == _ELIGIBLE:
+                job = self.jobs[payload]
+                part = self.parts[job.partition]
+                part.queue.append(job)
+                self._try_start(part)
+            elif kind == _FINISH:
+                name, attempt = payload
+                job = self.jobs[name]
+                if job.attempt == attempt and job.state == "running":
+                    self._finish(job)
+        return self.report(time.perf_counter() - t0)
+
+    def report(self, elapsed=0.0):
+        jobs = list(self.jobs.values())
+        states = {}
+        for j in jobs:
+            states[j.state] = states.get(j.state, 0) + 1
+        arrivals = [j.arrival for j in jobs]
+        ends = [j.t_end for j in jobs if j.t_end is not None]
+        used_ch = self.used / 3600.0
+        waste_ch = (self.waste_packing + self.waste_restart + self.waste_failed) / 3600.0
+        return {
+            "policy": self.policy,
+            "jobs": len(jobs),
+            "states": states,
+            "restarts": sum(j.restarts for j in jobs),
+            "submissions": self.submissions,
+            "polls": self.polls,
+            "makespan": (max(ends) - min(arrivals)) if ends else 0.0,
+            "wait": self.waits,
+            "hold": self.holds,
+            "chain_latency": self.latencies,
+            "core_hours": used_ch,
+            "waste_core_hours": waste_ch,
+            "waste": {"packing": self.waste_packing / 3600.0,
+                      "restart": self.waste_restart / 3600.0,
+                      "failed": self.waste_failed / 3600.0},
+            "elapsed": elapsed,
+        }
+
+
+def simulate(jobs, cluster=None, policy=None, seed=0):
+    """Run one simulation; returns the report dict (see Simulation.report)."""
+    return Simulation(jobs, cluster, policy, seed).run()
+
+
+def policy_from_scheduler(sched):
+    """The simulated policy matching a configured GaussianJobScheduler."""
+    return {k: getattr(sched, k) for k in DEFAULT_POLICY if hasattr(sched, k)} | {
+        "time_limit": sched.time_limit, "predict_resources": bool(sched.predictor),
+    }
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def load_cluster(path):
+    """Cluster model from a JSON or YAML file (partitions as in DEFAULT_CLUSTER)."""
+    with open(path) as f:
+        text = f.read()
+    if path.endswith((".yaml", ".yml")):
+        import yaml
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+    if "partitions" not in data:
+        data = {"partitions": data}
+    return data
+
+
+def _value(text):
+    low = text.strip().lower()
+    if low in ("none", "null", ""):
+        return None
+    if low in ("true", "yes", "y"):
+        return True
+    if low in ("false", "no", "n"):
+        return False
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text.strip()
+
+
+def parse_policy(text):
+    """'max_primary=4,fallback_part=short' → dict; candidate_parts takes a+b+c."""
+    out = {}
+    for item in filter(None, (s.strip() for s in text.split(","))):
+        key, _, val = item.partition("=")
+        key = key.strip().replace("-", "_")
+        out[key] = [x for x in val.split("+") if x] if key == "candidate_parts" else _value(val)
+        if key == "max_primary" or key == "primary_part":
+            out.setdefault("quota_enabled", True)
+    return out
+
+
+def _label(policy):
+    diff = {k: v for k, v in policy.items() if DEFAULT_POLICY.get(k) != v}
+    return ",".join(f"{k}={'+'.join(v) if isinstance(v, list) else v}" for k, v in diff.items()) or "defaults"
+
+
+def print_report(rows):
+    width = max([len("policy")] + [len(_label(r["policy"])) for r in rows]) + 2
+    print(f"{'policy':<{width}}{'makespan':>10}{'wait p50':>10}{'p90':>10}{'p99':>10}"
+          f"{'hold p50':>10}{'p90':>10}{'core-h':>10}{'waste':>8}{'ok':>7}{'fail':>6}{'rej':>5}{'rst':>5}")
+    for r in rows:
+        w = [percentile(r["wait"], q) for q in QUANTILES]
+        w += [percentile(r["hold"], q) for q in QUANTILES[:2]]
+        pct = 100.0 * r["waste_core_hours"] / r["core_hours"] if r["core_hours"] else 0.0
+        st = r["states"]
+        print(f"{_label(r['policy']):<{width}}{_fmt(r['makespan']):>10}"
+              + "".join(f"{_fmt(v):>10}" for v in w)
+              + f"{r['core_hours']:>10.0f}{pct:>7.1f}%{st.get('ok', 0):>7}"
+              + f"{st.get('failed', 0) + st.get('skipped', 0):>6}{st.get('rejected', 0):>5}{r['restarts']:>5}")
+    total = sum(r["elapsed"] for r in rows)
+    print(f"⏱️ {len(rows)} simulation(s) of {rows[0]['jobs'] if rows else 0} jobs in {total:.2f}s")
+
+
+def simulate_cli(argv=None):
+    ap = argparse.ArgumentParser(prog="gausskit simulate",
+                                 description="Replay a workload through scheduler policies on a model cluster.")
+    src = ap.add_argument_group("workload")
+    src.add_argument("--logs", nargs="+", help="finished .log files or directories")
+    src.add_argument("--metrics", nargs="+", help="scheduler metrics files (gausskit-metrics.jsonl)")
+    src.add_argument("--jobs", type=int, default=1000, help="synthetic workload size [1000]")
+    src.add_argument("--runtime-median", type=float, default=3600, help="seconds [3600]")
+    src.add_argument("--runtime-sigma", type=float, default=1.0, help="sigma of ln(runtime) [1.0]")
+    src.add_argument("--cores", type=int, nargs="+", default=[56])
+    src.add_argument("--chain-fraction", type=float, default=0.0, help="jobs in GS/ES→FC chains")
+    src.add_argument("--arrival-rate", type=float, default=0.0, help="jobs per hour; 0 = all at once")
+    src.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--cluster", help="cluster model (JSON or YAML)")
+    ap.add_argument("--policy", action="append", default=[], help="k=v,… (GaussianJobScheduler names); repeat to compare")
+    ap.add_argument("--sweep", help="k=v1,v2,… applied on top of each --policy")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", help="write full reports to this file")
+    args = ap.parse_args(argv)
+
+    if args.logs:
+        jobs = workload_from_logs(args.logs)
+    elif args.metrics:
+        jobs = workload_from_metrics(args.metrics)
+    else:
+        jobs = synthetic_workload(args.jobs, args.runtime_median, args.runtime_sigma, tuple(args.cores),
+                                  args.chain_fraction, args.arrival_rate, args.error_rate, seed=args.seed)
+    if not jobs:
+        print("❌ Empty workload.")
+        return 1
+    cluster = load_cluster(args.cluster) if args.cluster else None
+
+    policies = [parse_policy(p) for p in args.policy] or [{}]
+    if args.sweep:
+        key, _, vals = args.sweep.partition("=")
+        key = key.strip().replace("-", "_")
+        policies = [dict(p, **parse_policy(f"{key}={v}")) for p in policies for v in vals.split(",")]
+
+    rows = []
+    for pol in policies:
+        try:
+            rows.append(simulate(jobs, cluster, pol, seed=args.seed))
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+    print(f"📋 Workload: {len(jobs)} jobs, {sum(j.runtime for j in jobs) / 3600:.0f} h of runtime")
+    print_report(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=1)
+        print(f"💾 Reports written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(simulate_cli())
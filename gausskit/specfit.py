@@ -0,0 +1,339 @@
+# gausskit/specfit.py
+"""
+Least-squares fit of computed vibronic spectra to an experimental curve.
+
+For one FC log the model is the broadened stick spectrum
+
+    y(x) ≈ a · Σ_k I_k · K(x − (f·ν_k + shift); FWHM)
+
+fitted to the experimental (x, y) from `vibronic.parse_exp_data`: shift,
+FWHM and optionally the frequency scaling factor f are optimised
+(Nelder–Mead), the intensity scale a ≥ 0 is solved in closed form at every
+step.  Sticks come from the .sticks.npz cache and are binned once onto a
+uniform grid whose FFT is kept (`StickModel`), so one evaluation is a
+kernel FFT, a product, an inverse FFT and an interpolation — well under a
+millisecond, whatever the number of sticks.  The starting shift comes from an FFT
+cross-correlation with the experiment, so bands far apart still lock in.
+
+    gausskit vibronic fit EXP.csv LOGS… [--unit ev] [--column 1]
+                          [--fwhm 300] [--fwhm-range 30,3000]
+                          [--shift-range=MIN,MAX] [--freq-scale]
+                          [--shape gaussian] [--csv FILE] [--png FILE]
+                          [--jobs N]
+
+Many logs are fitted in parallel and ranked by relative residual
+Σ(y − fit)² / Σy².
+"""
+
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .lineshape import LINESHAPES, bin_sticks
+from .vibronic import convert_axis, parse_exp_data, read_sticks
+from .vibronic_batch import find_fc_logs
+
+
+_NEGLIGIBLE = 1e-6      # sticks weaker than this × the strongest are left out of the fit
+
+
+def _fast_len(n):
+    """Smallest 2^a·3^b·5^c ≥ n (cheap FFT length)."""
+    best = 1 << (n - 1).bit_length()
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            m = p35
+            while m < n:
+                m *= 2
+            best = min(best, m)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
+class StickModel:
+    """Sticks binned once onto a uniform grid (step ≤ min FWHM / 5) with their FFT cached."""
+
+    def __init__(self, nu, I, min_fwhm, max_fwhm, shape="gaussian", lorentz_fwhm=None, min_scale=1.0):
+        self.shape = shape
+        self.lorentz_fwhm = lorentz_fwhm
+        nu, I = np.asarray(nu, dtype=float), np.asarray(I, dtype=float)
+        if not I.size or not np.abs(I).max() > 0:
+            raise ValueError("spectrum has no intensity")
+        keep = np.abs(I) > _NEGLIGIBLE * np.abs(I).max()
+        nu, I = nu[keep], I[keep]
+        span = nu.max() - nu.min()
+        self.step = max(min_fwhm / 5.0, span / 65536.0)
+        # Gaussian tails are gone beyond 3 FWHM; the others are kept over the whole grid
+        reach = (3.0 if shape == "gaussian" else 10.0) * max_fwhm / min(min_scale, 1.0)
+        self.start = nu.min() - reach
+        self.size = int(np.ceil((span + 2 * reach) / self.step)) + 1
+        self.grid = self.start + self.step * np.arange(self.size)
+        pad = int(np.ceil(reach / self.step)) if shape == "gaussian" else self.size
+        self.nfft = _fast_len(self.size + pad)
+        j = np.arange(self.nfft)
+        self._dist = self.step * np.minimum(j, self.nfft - j)     # circular distances
+        self._B = np.fft.rfft(bin_sticks(nu, I, self.start, self.step, self.size), self.nfft)
+
+    def on_grid(self, fwhm, lorentz_fwhm=None):
+        """Broadened profile on self.grid (model frequencies)."""
+        params = {"lorentz_fwhm": lorentz_fwhm or self.lorentz_fwhm} if self.shape == "voigt" else {}
+        kernel = LINESHAPES[self.shape](self._dist, fwhm, **params)
+        return np.fft.irfft(self._B * np.fft.rfft(kernel), self.nfft)[:self.size]
+
+    def profile(self, x, shift, fwhm, freq_scale=1.0):
+        """Broadened profile at experimental x for sticks at freq_scale·ν + shift."""
+        # widths are given on the experimental axis; the grid is in model frequencies
+        lorentz = self.lorentz_fwhm / freq_scale if self.lorentz_fwhm else None
+        prof = self.on_grid(fwhm / freq_scale, lorentz)
+        return np.interp((x - shift) / freq_scale, self.grid, prof, left=0.0, right=0.0)
+
+
+def _amplitude(y, p):
+    pp = p @ p
+    return max(float(y @ p / pp), 0.0) if pp > 0 else 0.0
+
+
+def _nelder_mead(fun, x0, steps, max_iter=400, tol=1e-9):
+    """Minimise fun from x0 with initial simplex x0 + steps; returns (x, f, evaluations)."""
+    n = len(x0)
+    simplex = [np.asarray(x0, dtype=float)]
+    for i in range(n):
+        v = simplex[0].copy()
+        v[i] += steps[i]
+        simplex.append(v)
+    values = [fun(v) for v in simplex]
+    nfev = n + 1
+    for _ in range(max_iter):
+        order = np.argsort(values)
+        simplex = [simplex[i] for i in order]
+        values = [values[i] for i in order]
+        if abs(values[-1] - values[0]) <= tol * (abs(values[0]) + tol):
+            break
+        centroid = np.mean(simplex[:-1], axis=0)
+        xr = centroid + (centroid - simplex[-1])
+        fr = fun(xr)
+        nfev += 1
+        if fr < values[0]:
+            xe = centroid + 2.0 * (centroid - simplex[-1])
+            fe = fun(xe)
+            nfev += 1
+            simplex[-1], values[-1] = (xe, fe) if fe < fr else (xr, fr)
+        elif fr < values[-2]:
+            simplex[-1], values[-1] = xr, fr
+        else:
+            xc = centroid + 0.5 * (simplex[-1] - centroid)
+            fc = fun(xc)
+            nfev += 1
+            if fc < values[-1]:
+                simplex[-1], values[-1] = xc, fc
+            else:
+                for i in range(1, n + 1):
+                    simplex[i] = simplex[0] + 0.5 * (simplex[i] - simplex[0])
+                    values[i] = fun(simplex[i])
+                nfev += n
+    best = int(np.argmin(values))
+    return simplex[best], values[best], nfev
+
+
+def _initial_shift(model, x, y, fwhm, shift_range):
+    """Shift that best overlays the profile on the experiment (FFT cross-correlation)."""
+    step = model.step
+    xe = np.arange(x.min(), x.max() + step, step)
+    ye = np.interp(xe, x, y)
+    p0 = model.on_grid(fwhm)
+    L = 1 << (p0.size + ye.size).bit_length()
+    corr = np.fft.irfft(np.fft.rfft(p0, L) * np.conj(np.fft.rfft(ye, L)), L)
+    lags = np.arange(L)
+    lags = np.where(lags < L - ye.size, lags, lags - L)                  # circular → signed lag
+    shifts = xe[0] - model.start - lags * step
+    ok = (shifts >= shift_range[0]) & (shifts <= shift_range[1])
+    if not ok.any():
+        return 0.5 * (shift_range[0] + shift_range[1])
+    return shifts[ok][np.argmax(corr[ok])]
+
+
+class SpectrumFit:
+    def __init__(self, log, shift=None, fwhm=None, freq_scale=1.0, amplitude=None, residual=None,
+                 nfev=0, seconds=0.0, error=None):
+        self.log = log
+        self.shift = shift
+        self.fwhm = fwhm
+        self.freq_scale = freq_scale
+        self.amplitude = amplitude
+        self.residual = residual        # Σ(y − fit)² / Σy²
+        self.nfev = nfev
+        self.seconds = seconds
+        self.error = error
+
+    def to_dict(self):
+        return {k: getattr(self, k) for k in
+                ("log", "shift", "fwhm", "freq_scale", "amplitude", "residual", "nfev", "seconds", "error")}
+
+
+def fit_spectrum(nu, I, x, y, fwhm=300.0, fwhm_range=(30.0, 3000.0), shift_range=None,
+                 fit_freq_scale=False, scale_range=(0.9, 1.05), shape="gaussian", lorentz_fwhm=None,
+                 log=None):
+    """Fit sticks (nu, I) to the experimental curve (x, y), all in cm⁻¹. Returns a SpectrumFit."""
+    t0 = time.time()
+    order = np.argsort(x)
+    x, y = np.asarray(x, dtype=float)[order], np.asarray(y, dtype=float)[order]
+    yy = y @ y
+    if not yy > 0:
+        raise ValueError("experimental curve has no intensity")
+    if shift_range is None:
+        reach = (x.max() - x.min()) + (nu.max() - nu.min())
+        shift_range = (x.min() - nu.max() - 0.5 * reach, x.max() - nu.min() + 0.5 * reach)
+    model = StickModel(nu, I, fwhm_range[0], fwhm_range[1], shape, lorentz_fwhm,
+                       scale_range[0] if fit_freq_scale else 1.0)
+
+    def unpack(v):
+        shift = float(np.clip(v[0], *shift_range))
+        width = float(np.clip(np.exp(v[1]), *fwhm_range))
+        scale = float(np.clip(v[2], *scale_range)) if fit_freq_scale else 1.0
+        return shift, width, scale
+
+    def objective(v):
+        p = model.profile(x, *unpack(v))
+        a = _amplitude(y, p)
+        r = y - a * p
+        return (r @ r) / yy
+
+    shift0 = _initial_shift(model, x, y, fwhm, shift_range)
+    v0 = [shift0, np.log(fwhm)] + ([1.0] if fit_freq_scale else [])
+    steps = [max(fwhm, model.step * 5), 0.3] + ([0.01] if fit_freq_scale else [])
+    v, res, nfev = _nelder_mead(objective, v0, steps)
+    # restart once from the optimum: Nelder–Mead can stall on a collapsed simplex
+    v, res, more = _nelder_mead(objective, v, [s * 0.2 for s in steps])
+    shift, width, scale = unpack(v)
+    amp = _amplitude(y, model.profile(x, shift, width, scale))
+    return SpectrumFit(log, shift, width, scale, amp, float(res), nfev + more, time.time() - t0)
+
+
+def _fit_log(log, x, y, kw):
+    try:
+        nu, I = read_sticks(log, cache=True)
+        return fit_spectrum(nu, I, x, y, log=log, **kw)
+    except (OSError, ValueError) as e:
+        return SpectrumFit(log, error=str(e))
+
+
+def fit_many(logs, x, y, jobs=None, **kw):
+    """fit_spectrum() for every log on a process pool; SpectrumFits ranked best first (failures last)."""
+    logs = list(logs)
+    if not logs:
+        return []
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 4) as ex:
+        fits = list(ex.map(_fit_log, logs, [x] * len(logs), [y] * len(logs), [kw] * len(logs)))
+    return sorted(fits, key=lambda f: (f.residual is None, f.residual if f.residual is not None else 0.0))
+
+
+def fitted_profile(log, fit, x, shape="gaussian", lorentz_fwhm=None):
+    """The fitted curve of one SpectrumFit at x (for plots)."""
+    nu, I = read_sticks(log)
+    model = StickModel(nu, I, fit.fwhm, fit.fwhm, shape, lorentz_fwhm, fit.freq_scale)
+    return fit.amplitude * model.profile(np.asarray(x, dtype=float), fit.shift, fit.fwhm, fit.freq_scale)
+
+
+def _pair(text, ap, name):
+    try:
+        lo, hi = text.split(",", 1)
+        return float(lo), float(hi)
+    except ValueError:
+        ap.error(f"{name} must be MIN,MAX")
+
+
+def write_fits_csv(fits, path):
+    fields = ["rank", "log", "residual", "shift", "fwhm", "freq_scale", "amplitude", "nfev", "seconds", "error"]
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=fields)
+        w.writeheader()
+        for rank, fit in enumerate(fits, 1):
+            w.writerow({"rank": rank, **fit.to_dict()})
+
+
+def plot_fits(fits, x, y, path, axis="ev", shape="gaussian", lorentz_fwhm=None, top=3):
+    """Experiment with the `top` best fits overlaid → PNG (Agg canvas)."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    xp, xlabel = convert_axis(np.asarray(x), axis)
+    ax.plot(xp, y, "k-", label="experiment")
+    for fit in [f for f in fits if f.residual is not None][:top]:
+        name = os.path.splitext(os.path.basename(fit.log))[0]
+        ax.plot(xp, fitted_profile(fit.log, fit, x, shape, lorentz_fwhm), "--",
+                label=f"{name} (res {fit.residual:.3f})")
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("Intensity (arb.)")
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(path, dpi=300)
+
+
+def fit_cli(argv=None):
+    ap = argparse.ArgumentParser(prog="gausskit vibronic fit",
+                                 description="Fit computed vibronic spectra to an experimental curve and rank them.")
+    ap.add_argument("exp", help="experimental CSV (x, I1[, I2])")
+    ap.add_argument("logs", nargs="+", help="FC logs: files, directories or glob patterns")
+    ap.add_argument("--unit", choices=["cm", "nm", "ev"], default="ev", help="x unit of the CSV [ev]")
+    ap.add_argument("--column", choices=["1", "2", "3"], default="1",
+                    help="intensity: 1 = 2nd column, 2 = 3rd, 3 = their average [1]")
+    ap.add_argument("--fwhm", type=float, default=300.0, help="starting FWHM in cm⁻¹ [300]")
+    ap.add_argument("--fwhm-range", default="30,3000", help="allowed FWHM MIN,MAX in cm⁻¹ [30,3000]")
+    ap.add_argument("--shift-range",
+                    help="allowed shift MIN,MAX in cm⁻¹, e.g. --shift-range=-3000,0 [anything that overlaps]")
+    ap.add_argument("--freq-scale", action="store_true", help="also fit a frequency scaling factor")
+    ap.add_argument("--scale-range", default="0.9,1.05", help="allowed scaling factor MIN,MAX [0.9,1.05]")
+    ap.add_argument("--shape", choices=sorted(LINESHAPES), default="gaussian")
+    ap.add_argument("--lorentz-fwhm", type=float, default=None, help="Lorentzian FWHM of a Voigt [= FWHM]")
+    ap.add_argument("--csv", help="write the ranking to this CSV")
+    ap.add_argument("--png", help="plot the experiment with the best fits")
+    ap.add_argument("--top", type=int, default=3, help="fits shown in --png [3]")
+    ap.add_argument("--axis", choices=["cm", "nm", "ev"], default="ev", help="x axis of --png [ev]")
+    ap.add_argument("--jobs", type=int, default=None, help="worker processes [CPU count]")
+    args = ap.parse_args(argv)
+
+    x, y, _ = parse_exp_data(args.exp, args.unit, False, args.column)
+    if not x.size:
+        print(f"❌ No data in {args.exp}")
+        return 1
+    logs = find_fc_logs(args.logs)
+    if not logs:
+        print("❌ No logs matched.")
+        return 1
+    kw = {"fwhm": args.fwhm, "fwhm_range": _pair(args.fwhm_range, ap, "--fwhm-range"),
+          "shift_range": _pair(args.shift_range, ap, "--shift-range") if args.shift_range else None,
+          "fit_freq_scale": args.freq_scale, "scale_range": _pair(args.scale_range, ap, "--scale-range"),
+          "shape": args.shape, "lorentz_fwhm": args.lorentz_fwhm}
+    t0 = time.time()
+    fits = fit_many(logs, x, y, args.jobs, **kw)
+    print(f"📈 {len(logs)} spectra fitted to {args.exp} in {time.time() - t0:.1f} s:")
+    width = max(len(os.path.basename(f.log)) for f in fits)
+    for rank, f in enumerate(fits, 1):
+        name = os.path.basename(f.log)
+        if f.error:
+            print(f"  {rank:>3}. {name:<{width}}  ❌ {f.error}")
+            continue
+        scale = f"  f={f.freq_scale:.4f}" if args.freq_scale else ""
+        print(f"  {rank:>3}. {name:<{width}}  residual {f.residual:.4f}  shift {f.shift:+9.1f} cm⁻¹"
+              f"  FWHM {f.fwhm:7.1f} cm⁻¹{scale}")
+    if args.csv:
+        write_fits_csv(fits, args.csv)
+        print(f"📝 Wrote {args.csv}")
+    if args.png:
+        plot_fits(fits, x, y, args.png, args.axis, args.shape, args.lorentz_fwhm, args.top)
+        print(f"🖼️ Wrote {args.png}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(fit_cli())
@@ -0,0 +1,122 @@
+# gausskit/squeue_cache.py
+"""
+Shared, TTL-bounded cache of `squeue -u $USER`, for running several
+schedulers (one per project directory) side by side.
+
+The output lives in `squeue-<user>.json` under `$XDG_RUNTIME_DIR/gausskit`
+(or `~/.cache/gausskit`).  Readers take it as long as it is younger than
+`ttl` seconds; the first process to find it stale takes an exclusive lock
+on `squeue-<user>.lock`, re-checks, runs squeue once and atomically
+replaces the file.  Everyone else waiting on the lock then reads the fresh
+copy, so the cluster sees one squeue call per interval per user no matter
+how many schedulers are running.
+
+TTL defaults to 10 s; set GAUSSKIT_SQUEUE_TTL to change it.
+"""
+
+import contextlib
+import fcntl
+import getpass
+import json
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+DEFAULT_TTL = float(os.environ.get("GAUSSKIT_SQUEUE_TTL", "10"))
+_FORMAT = "%i|%P|%T|%j"
+
+
+def cache_dir():
+    """$XDG_RUNTIME_DIR/gausskit if available, else ~/.cache/gausskit."""
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime) and os.access(runtime, os.W_OK):
+        return Path(runtime) / "gausskit"
+    return Path.home() / ".cache" / "gausskit"
+
+
+class SharedSqueueCache:
+    """`jobs()` → this user's queued/running jobs, refreshed at most once per `ttl`."""
+
+    def __init__(self, user=None, ttl=DEFAULT_TTL, directory=None):
+        self.user = user or getpass.getuser()
+        self.ttl = ttl
+        d = Path(directory) if directory else cache_dir()
+        d.mkdir(parents=True, exist_ok=True)
+        self.path = d / f"squeue-{self.user}.json"
+        self.lock_path = d / f"squeue-{self.user}.lock"
+        self.calls = 0      # squeue runs made by this process
+
+    @contextlib.contextmanager
+    def _lock(self):
+        with open(self.lock_path, "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _fresh(self, data):
+        return data is not None and time.time() - data.get("stamp", 0) <= self.ttl
+
+    def _refresh(self, stale):
+        try:
+            res = subprocess.run(["squeue", "-u", self.user, "-h", "-o", _FORMAT],
+                                 capture_output=True, text=True)
+        except OSError as e:
+            print(f"⚠️ Could not run squeue: {e}")
+            return stale or {"stamp": 0, "jobs": []}
+        self.calls += 1
+        if res.returncode != 0:
+            print(f"⚠️ squeue failed: {res.stderr.strip()}")
+            return stale or {"stamp": 0, "jobs": []}
+        jobs = []
+        for line in res.stdout.splitlines():
+            fields = line.strip().split("|", 3)
+            if len(fields) == 4:
+                jid, part, state, name = fields
+                jobs.append({"id": jid, "partition": part, "state": state, "name": name})
+        data = {"stamp": time.time(), "user": self.user, "jobs": jobs}
+        fd, tmp = tempfile.mkstemp(prefix=".squeue-", dir=self.path.parent)
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+        return data
+
+    def jobs(self):
+        """List of {"id", "partition", "state", "name"} for this user."""
+        data = self._read()
+        if self._fresh(data):
+            return data["jobs"]
+        with self._lock():
+            data = self._read()           # someone may have refreshed meanwhile
+            if not self._fresh(data):
+                data = self._refresh(data)
+        return data["jobs"]
+
+    def invalidate(self):
+        """Force the next reader to re-run squeue (e.g. right after a submission)."""
+        with self._lock():
+            data = self._read()
+            if data is not None:
+                data["stamp"] = 0
+                fd, tmp = tempfile.mkstemp(prefix=".squeue-", dir=self.path.parent)
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp, self.path)
+
+    def count(self, partition=None):
+        return sum(1 for j in self.jobs() if partition is None or j["partition"] == partition)
+
+    def states(self, jobids):
+        """{jobid: raw squeue state} for those of `jobids` still in the queue."""
+        wanted = {str(j) for j in jobids}
+        return {j["id"]: j["state"] for j in self.jobs() if j["id"] in wanted}
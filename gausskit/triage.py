@@ -0,0 +1,286 @@
+# gausskit/triage.py
+"""
+Campaign-level error triage: classify every log that did not terminate
+normally, report it, and optionally fix the inputs in bulk.
+
+`batch_fix_and_report` walks logs one at a time and asks before every
+resubmission.  Here every log under the given directories is read and
+matched against gaussian_errors.yaml on a thread pool, and grouped by
+(link, error) with the files affected and the fix that would be applied
+(the best-ranked rung of that error's fix ladder, see gausskit.fixdb).
+No prompts.
+
+    gausskit triage [dirs…] [-r] [--csv FILE] [--json FILE]
+                    [--fix [--dry-run]] [--jobs N]
+
+`--fix` rewrites each failed job's .com with its proposed fix (backup in
+.com.bak) and moves the failed log to .log.failN, so batch mode picks the
+job up again; with `--dry-run` the unified diffs are shown and nothing is
+written.  Only logs that end in Error termination are fixed (an incomplete
+log may still be running), and a fixed input that fails the pre-submission
+lint (gausskit.lint) is left as it was.
+"""
+
+import argparse
+import csv
+import datetime
+import difflib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .utils import fmt_bytes
+from .checkpoints import parse_chk_refs
+from .error_fixer import extract_log_window, error_matcher, fix_ladder, fix_route_lines
+from .fixdb import default_history, describe_fix
+from .lint import lint_input, parse_steps, print_issues, has_errors
+
+
+class TriageRecord:
+    def __init__(self, log):
+        self.log = log
+        self.com = os.path.splitext(log)[0] + ".com"
+        self.state = None           # failed / incomplete
+        self.errors = []            # [(link, error name)] in DB order
+        self.fix = None             # (link, error name, fix dict) proposed
+        self.result = None          # what the bulk fix did
+        self.window = None          # bytes of the log searched
+        self.lint = []              # LintIssues of the fixed input
+
+    @property
+    def key(self):
+        if self.errors:
+            return self.errors[0]
+        return ("-", "no termination line") if self.state == "incomplete" else ("-", "unknown error")
+
+    def fix_text(self):
+        return describe_fix(self.fix[2]) if self.fix else ""
+
+    def to_dict(self):
+        return {"log": self.log, "com": self.com if os.path.exists(self.com) else None,
+                "state": self.state, "link": self.key[0], "error": self.key[1],
+                "all_errors": [f"{l}: {n}" for l, n in self.errors],
+                "fix": self.fix_text(), "result": self.result, "window_bytes": self.window}
+
+
+def _state(tail):
+    n, e = tail.rfind("Normal termination"), tail.rfind("Error termination")
+    if n < 0 and e < 0:
+        return "incomplete"
+    return "ok" if n > e else "failed"
+
+
+def find_logs(dirs=(".",), recursive=False):
+    for d in dirs:
+        if os.path.isfile(d):
+            yield d
+            continue
+        walker = os.walk(d) if recursive else [(d, None, os.listdir(d))]
+        for root, _, files in walker:
+            for f in sorted(files):
+                if f.endswith(".log"):
+                    yield os.path.join(root, f)
+
+
+def triage_log(log, matcher=None, choose=None):
+    """
+    TriageRecord for one log, or None when it terminated normally.
+    `choose(link, name, ladder)` picks the fix to propose (default: first rung).
+    """
+    matcher = matcher or error_matcher()
+    try:
+        tail, window = extract_log_window(log, matcher=matcher)
+    except OSError:
+        return None
+    rec = TriageRecord(log)
+    rec.window = window["bytes"]
+    rec.state = _state(tail)
+    if rec.state == "ok":
+        return None
+    for link, name, props in (matcher.entries[i] for i in sorted(matcher.matched_entries(tail))):
+        rec.errors.append((link, name))
+        if rec.fix is None:
+            ladder = fix_ladder(props)
+            fix = (choose(link, name, ladder) if choose else ladder[0]) if ladder else None
+            if fix:
+                rec.fix = (link, name, fix)
+    return rec
+
+
+def triage(dirs=(".",), recursive=False, jobs=None):
+    """TriageRecords of every log under `dirs` that did not terminate normally."""
+    logs = list(find_logs(dirs, recursive))
+    matcher = error_matcher()
+    hist = default_history()
+    choose = None
+    if hist:
+        hist.resolve_pending()
+        best = {(l, n): hist.best_fix(l, n, fix_ladder(p)) for l, n, p in matcher.entries}
+        choose = lambda link, name, ladder: best[(link, name)]
+    with ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 4) * 4)) as ex:
+        return [r for r in ex.map(lambda l: triage_log(l, matcher, choose), logs) if r]
+
+
+def group_records(records):
+    """[{link, error, count, files, fix, notes}] sorted by count, largest first."""
+    matcher = error_matcher()
+    notes = {(l, n): (p.get("notes") or "").strip() for l, n, p in matcher.entries}
+    groups = {}
+    for r in records:
+        g = groups.setdefault(r.key, {"link": r.key[0], "error": r.key[1], "count": 0,
+                                      "files": [], "fix": r.fix_text(),
+                                      "notes": notes.get(r.key, "").split("\n")[0]})
+        g["count"] += 1
+        g["files"].append(r.log)
+    return sorted(groups.values(), key=lambda g: (-g["count"], g["link"], g["error"]))
+
+
+def write_csv(records, path):
+    fields = ["log", "com", "state", "link", "error", "all_errors", "fix", "result", "window_bytes"]
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=fields)
+        w.writeheader()
+        for r in records:
+            row = r.to_dict()
+            row["all_errors"] = "; ".join(row["all_errors"])
+            w.writerow(row)
+
+
+def write_json(records, path, dirs=()):
+    report = {
+        "generated": datetime.datetime.now().isoformat(timespec="seconds"),
+        "dirs": list(dirs),
+        "failed_logs": len(records),
+        "groups": group_records(records),
+        "records": [r.to_dict() for r in records],
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def _next_fail_name(log):
+    n = 1
+    while os.path.exists(f"{log}.fail{n}"):
+        n += 1
+    return f"{log}.fail{n}"
+
+
+def fix_record(rec, dry_run=False, produced=()):
+    """
+    Apply the proposed fix to rec.com; returns the unified diff ('' if nothing
+    changes).  Failed logs only; the fixed input must pass the lint, with
+    `produced` the checkpoints the other inputs being fixed will write.
+    """
+    if rec.state != "failed":
+        rec.result = "not failed; left alone"
+        return ""
+    if not rec.fix:
+        rec.result = "no automatic fix"
+        return ""
+    try:
+        with open(rec.com) as f:
+            old = f.read()
+    except OSError:
+        rec.result = "no input"
+        return ""
+    lines, found = fix_route_lines(old.splitlines(), rec.fix[2], log=lambda msg: None)
+    new = "\n".join(lines) + "\n"
+    if not found or new == old:
+        rec.result = "fix changes nothing"
+        return ""
+    others = set(produced) - parse_chk_refs(rec.com)[0]
+    rec.lint = lint_input(rec.com, others, steps=parse_steps(new))
+    if has_errors(rec.lint):
+        rec.result = "fix fails lint"
+        return ""
+    diff = "".join(difflib.unified_diff(old.splitlines(True), new.splitlines(True),
+                                        rec.com, rec.com + " (fixed)"))
+    if dry_run:
+        rec.result = "would fix"
+        return diff
+    with open(rec.com + ".bak", "w") as f:
+        f.write(old)
+    tmp = rec.com + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(new)
+    os.replace(tmp, rec.com)
+    os.replace(rec.log, _next_fail_name(rec.log))
+    rec.result = "fixed"
+    return diff
+
+
+def bulk_fix(records, dry_run=False, jobs=None):
+    """Fix every record's input in parallel (recorded in the fix history); returns {log: diff}."""
+    applied = time.time()
+    produced = set()
+    for r in records:
+        if r.state == "failed" and r.fix:
+            try:
+                produced |= parse_chk_refs(r.com)[0]
+            except OSError:
+                pass
+    with ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 4) * 4)) as ex:
+        diffs = list(ex.map(lambda r: fix_record(r, dry_run, produced), records))
+    refused = [r for r in records if r.result == "fix fails lint"]
+    for r in refused:
+        print_issues(r.lint)
+    if refused:
+        print(f"🚫 {len(refused)} fix(es) left unapplied: the fixed input fails the lint.")
+    hist = default_history()
+    if hist and not dry_run:
+        hist.record_many([(*r.fix, os.path.splitext(r.com)[0], None, applied)
+                          for r in records if r.result == "fixed"])
+    return {r.log: d for r, d in zip(records, diffs)}
+
+
+def print_summary(records):
+    if not records:
+        print("✅ No failed or incomplete logs found.")
+        return
+    groups = group_records(records)
+    width = max(len(g["error"]) for g in groups)
+    print(f"🩺 {len(records)} log(s) did not terminate normally:")
+    for g in groups:
+        fix = g["fix"] or "—"
+        print(f"  {g['count']:>5}  {g['link']:<6} {g['error']:<{width}}  fix: {fix}")
+    read = [r.window for r in records if r.window is not None]
+    if read:
+        print(f"🔎 Searched {fmt_bytes(sum(read) / len(read))} per log on average "
+              f"(largest window {fmt_bytes(max(read))}).")
+
+
+def triage_cli(argv=None):
+    ap = argparse.ArgumentParser(prog="gausskit triage",
+                                 description="Classify failed Gaussian logs and fix their inputs in bulk.")
+    ap.add_argument("dirs", nargs="*", default=["."], help="directories (or .log files) [default: .]")
+    ap.add_argument("-r", "--recursive", action="store_true")
+    ap.add_argument("--csv", help="write one row per log to this CSV file")
+    ap.add_argument("--json", help="write the grouped report to this JSON file")
+    ap.add_argument("--fix", action="store_true", help="apply each proposed fix to its .com")
+    ap.add_argument("--dry-run", action="store_true", help="with --fix: only print the diffs")
+    ap.add_argument("--jobs", type=int, default=None, help="parallel workers")
+    args = ap.parse_args(argv)
+
+    records = triage(args.dirs, args.recursive, args.jobs)
+    print_summary(records)
+    if args.fix:
+        diffs = bulk_fix(records, args.dry_run, args.jobs)
+        if args.dry_run:
+            for d in diffs.values():
+                if d:
+                    print(d, end="")
+        done = sum(1 for r in records if r.result in ("fixed", "would fix"))
+        verb = "would be fixed" if args.dry_run else "fixed (failed logs moved to .log.failN)"
+        print(f"🔧 {done}/{len(records)} input(s) {verb}.")
+    if args.csv:
+        write_csv(records, args.csv)
+        print(f"📝 Wrote {args.csv}")
+    if args.json:
+        write_json(records, args.json, args.dirs)
+        print(f"📝 Wrote {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(triage_cli())
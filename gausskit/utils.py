@@ -1,6 +1,7 @@
 import re
 from prompt_toolkit.completion import Completer, PathCompleter, Completion, FuzzyCompleter, WordCompleter
 import os
+from .comfile import Route, read_input
 
 def rename_logs_from_inputs():
     base_name = input("Enter base molecule name (e.g., N2): ").strip()
@@ -277,11 +278,44 @@ def _log_skipped(logfile, message):
 def hartree_to_ev(h):
     return h * 27.2114
 
+def fmt_bytes(n):
+    """1536 → '1.5 KB'."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024.0
+    return f"{n:.2f} TB"
 
 
-def submit_job(com_file, nproc=56, partition="medium", time=None, gdv="gdvj30+"):
+
+def submit_job(com_file, nproc=56, partition="medium", time=None, gdv="gdvj30+",
+               mem=115200, predict=None, lint=True):
+    """
+    Write an sbatch script for `com_file` and submit it (see
+    gausskit.backends.SbatchBackend).  Returns the Job ID, or None.
+    With `predict=True` (or GAUSSKIT_PREDICT_RESOURCES=1 in the environment),
+    nproc/time/mem come from the historical resource model
+    (gausskit.predictor) instead of the fixed defaults.
+    Inputs that fail gausskit.lint are not submitted unless `lint=False`.
+    """
     filename = os.path.splitext(com_file)[0]
-    now = datetime.datetime.now()
+
+    if lint:
+        from .lint import lint_input, print_issues
+        if print_issues(lint_input(com_file)):
+            print(f"🚫 {com_file} not submitted: fix the input above (see `gausskit lint`).")
+            return None
+
+    if predict is None:
+        predict = os.environ.get("GAUSSKIT_PREDICT_RESOURCES", "").lower() in ("1", "y", "yes", "true")
+    if predict:
+        from .predictor import default_predictor
+        sug = default_predictor().suggest(com_file, default_nproc=nproc,
+                                          default_time=time or "23:50:00")
+        nproc, mem = sug["nproc"], sug["mem_mb"]
+        if partition != "test":
+            time = sug["time"]
+        print(f"📈 Predicted resources for {com_file}: {nproc} cores, {time}, {mem} MB")
 
     # Auto-set time for test partition
     if partition == "test" and not time:
@@ -289,47 +323,44 @@ def submit_job(com_file, nproc=56, partition="medium", time=None, gdv="gdvj30+")
     elif not time:
         time = "23:50:00"
 
-    gdv_modules = {
-        "g09": "gaussian/g09-d01",
-        "g16": "gaussian/g16-b01",
-        "gdvi10+": "gaussian/gdv-20170407-i10+",
-        "gdvj15": "gaussian/gdv-20210302-j15",
-        "gdvj26+": "gaussian/gdv-20240213-j26+",
-        "gdvj30+": "gaussian/gdv-20250101-j30+"
-    }
-    if gdv.lower() not in gdv_modules:
-        raise ValueError(f"Invalid GDV version: {gdv}")
-
-    Sname = f"Gscript.sh"
-    with open(Sname, 'w') as f:
-        f.write(f"""#!/bin/bash
-#SBATCH --mail-user=$USER@ucmerced.edu
-#SBATCH --mail-type=ALL
-#SBATCH -J {filename}
-#SBATCH -o {filename}.qlog
-#SBATCH -p {partition}
-#SBATCH --time={time}
-#SBATCH --mem=115200
-#SBATCH --nodes=1
-#SBATCH --ntasks={nproc}
-
-module load {gdv_modules[gdv.lower()]}
-
-export My_Scratch=/scratch/$USER/$SLURM_JOBID
-export GAUSS_SCRDIR=$My_Scratch
-mkdir -p $My_Scratch
-
-gdv -m=92GB -p={nproc} < {com_file} >& {filename}.log
-
-rm -rf $My_Scratch
-
-# Submitted at {now.strftime('%Y-%m-%d %H:%M:%S')}
-""")
-
-    subprocess.run(["chmod", "+x", Sname])
-    subprocess.run(["sbatch", Sname])
-    os.rename(Sname, f"{filename}.sbatch")
-    print(f"✅ Resubmitted via SLURM: {filename}.com → {filename}.sbatch")
+    from .backends import SbatchBackend, SubmissionError
+    try:
+        jobid = SbatchBackend(gdv=gdv, mem=mem).submit(com_file, nproc=nproc, partition=partition,
+                                                      time_limit=time)
+    except SubmissionError as e:
+        print(f"❌ {e}")
+        return None
+    print(f"✅ Resubmitted via SLURM: {filename}.com → {filename}.sbatch (Job ID {jobid})")
+    return jobid
+
+
+def bulk_submit(com_files, max_workers=8, **kwargs):
+    """
+    Submit many inputs concurrently (thread pool around `submit_job`, which
+    uses `sbatch --parsable`).  `kwargs` are passed to `submit_job`.
+    All inputs are linted together first; failing ones get None.
+    Returns {com_file: Job ID or None}, in input order.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    com_files = list(com_files)
+    bad = set()
+    if kwargs.pop("lint", True):
+        from .lint import lint_before_submit
+        bad = lint_before_submit(com_files, max_workers)
+    predict = kwargs.get("predict")
+    if predict is None:
+        predict = os.environ.get("GAUSSKIT_PREDICT_RESOURCES", "").lower() in ("1", "y", "yes", "true")
+    if predict:
+        # load/fit the shared model once, not in every worker
+        from .predictor import default_predictor
+        default_predictor()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        ids = list(pool.map(lambda c: None if c in bad else submit_job(c, lint=False, **kwargs),
+                            com_files))
+    ok = sum(1 for j in ids if j)
+    print(f"📦 Bulk submit: {ok}/{len(com_files)} jobs accepted.")
+    return dict(zip(com_files, ids))
 
 
 import os, datetime, subprocess
@@ -404,61 +435,24 @@ def safe_float_input(message, allow_empty=False, default=None):
             attempts += 1
 
 def add_modredundant_to_opt(route):
+    """Merge ModRedundant into the route's Opt keyword (opt → opt=ModRedundant, opt=(…) → opt=(…,ModRedundant))."""
     route = route.strip()
-
-    if "modredundant" in route.lower():
-        return route  # Already handled
-
-    # Match OPT only — not the full route
-    words = route.split()
-    new_words = []
-
-    i = 0
-    while i < len(words):
-        word = words[i]
-
-        if word.lower() == "opt":
-            # Case: just "opt"
-            new_words.append("opt=ModRedundant")
-            i += 1  # Skip the next word only if it’s not a real keyword
-        elif word.lower().startswith("opt="):
-            opt_value = word[4:]  # after opt=
-            if opt_value.startswith("(") and opt_value.endswith(")"):
-                inner = opt_value[1:-1].split(",")
-                if "modredundant" not in [v.lower() for v in inner]:
-                    inner.append("ModRedundant")
-                new_words.append("opt=(" + ",".join(inner) + ")")
-            else:
-                inner = opt_value.split(",")
-                if "modredundant" not in [v.lower() for v in inner]:
-                    inner.append("ModRedundant")
-                new_words.append("opt=(" + ",".join(inner) + ")")
-            i += 1
-        else:
-            new_words.append(word)
-            i += 1
-
-    return " ".join(new_words)
+    parsed = Route.parse(route)
+    if not parsed.has("opt") or parsed.has("opt", "modredundant"):
+        return route  # nothing to do / already handled
+    parsed.add("opt=ModRedundant")
+    new = str(parsed)
+    return new if route.startswith("#") else new.split(None, 1)[1]
 
 
 def extract_scan_variables_from_com(comfile):
     """Extract scan variable values from a corresponding .com file."""
-    var_values = {}
     try:
-        with open(comfile, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-        for line in lines:
-            if '=' in line:
-                parts = line.strip().split('=')
-                if len(parts) == 2:
-                    key = parts[0].strip()
-                    try:
-                        val = float(parts[1].strip())
-                        var_values[key] = val
-                    except ValueError:
-                        pass
-    except Exception:
-        pass
+        doc = read_input(comfile)
+    except OSError:
+        return {}
+    var_values = {}
+    for step in doc.jobs:
+        for section in step.all("variables"):
+            var_values.update(section.values())
     return var_values
-
-
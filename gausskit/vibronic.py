@@ -8,6 +8,8 @@ import matplotlib.pyplot as plt
 from prompt_toolkit import prompt
 from prompt_toolkit.completion import PathCompleter
 
+from .lineshape import broaden
+
 # ── Helpers ────────────────────────────────────────────────────────────────────
 
 def _xlabel(axis):
@@ -30,47 +32,260 @@ def convert_axis(x_arr, axis):
     else:
         return x_arr, "Wavenumber (cm⁻¹)"
 
-# ── Parsing functions ──────────────────────────────────────────────────────────
-
-def parse_spectrum(logfile, shift=0.0, normalize=False):
+def broadened_profile(nu, I, fwhm, lineshape='gaussian', lorentz_fwhm=None, points=2000):
     """
-    Extract (ν_cm, I) arrays from the 'Final Spectrum' block of a .log.
-    Applies an energy shift and optional normalization.
+    (grid, profile): sticks broadened on `points` points spanning the sticks
+    (see gausskit.lineshape).
     """
-    with open(logfile, errors='ignore') as f:
-        lines = f.read().splitlines()
-    # find the Final Spectrum marker
-    try:
-        start = next(i for i, L in enumerate(lines) if "Final Spectrum" in L) + 1
-    except StopIteration:
-        raise ValueError(f"No 'Final Spectrum' in {logfile!r}")
+    grid = np.linspace(nu.min(), nu.max(), points)
+    params = {'lorentz_fwhm': lorentz_fwhm} if lineshape == 'voigt' else {}
+    return grid, broaden(nu, I, grid, fwhm, lineshape, **params)
+
 
-    pat = re.compile(r'^\s*([-+]?\d*\.\d+)\s+([-\d\.DE+]+)')
+def _prompt_lineshape():
+    """Ask for the line shape (and the Lorentzian width of a Voigt)."""
+    sh = prompt("Line shape: [1] Gaussian  [2] Lorentzian  [3] Voigt (default=1): ").strip() or "1"
+    lineshape = {'2': 'lorentzian', '3': 'voigt'}.get(sh, 'gaussian')
+    lorentz_fwhm = None
+    if lineshape == 'voigt':
+        lf = prompt("Lorentzian FWHM (cm⁻¹) [default=same as Gaussian]: ").strip()
+        lorentz_fwhm = float(lf) if lf else None
+    return lineshape, lorentz_fwhm
+
+# ── Parsing functions ──────────────────────────────────────────────────────────
+
+_MARKER = b"Final Spectrum"
+_STICK_LINE = re.compile(r'^\s*([-+]?\d*\.\d+)\s+([-\d\.DE+]+)')
+# the first run of consecutive "energy  intensity …" lines
+_STICK_RUN = re.compile(rb'(?m)(?:^[ \t]*[-+]?\d*\.\d+[ \t]+[-\d.DE+]+[^\n]*(?:\n|\Z))+')
+
+
+def _find_last(f, marker, size, block=1 << 20):
+    """Offset of the last `marker` in binary file `f` (read backwards in blocks), or -1."""
+    pos, later = size, b""
+    while pos > 0:
+        start = max(pos - block, 0)
+        f.seek(start)
+        buf = f.read(pos - start) + later[:len(marker) - 1]
+        i = buf.rfind(marker)
+        if i >= 0:
+            return start + i
+        later, pos = buf, start
+    return -1
+
+
+def _stick_arrays(run, logfile):
+    """(ν, I) of a block of stick lines; one vectorised conversion, line by line only if that fails."""
+    lines = run.split(b"\n")
+    lines = [L for L in lines if L.strip()]
+    ncol = len(lines[0].split())
+    tokens = run.replace(b"D", b"E").split()
+    try:
+        if len(tokens) != ncol * len(lines):
+            raise ValueError("ragged stick block")
+        data = np.array(tokens).astype(float).reshape(-1, ncol)
+        return data[:, 0].copy(), data[:, 1].copy()
+    except ValueError:
+        pass
     nu, I = [], []
-    for L in lines[start:]:
-        m = pat.match(L)
-        if not m:
-            if nu:
-                break
-            continue
-        val = float(m.group(1)) + shift
-        raw = m.group(2).replace('D','E')
+    for L in lines:
+        m = _STICK_LINE.match(L.decode(errors='ignore'))
+        raw = m.group(2).replace('D', 'E')
         try:
             inten = float(raw)
         except ValueError:
             print(f"⚠️ Could not parse intensity '{raw}' in {logfile}; setting to 0")
             inten = 0.0
-        nu.append(val)
+        nu.append(float(m.group(1)))
         I.append(inten)
+    return np.array(nu), np.array(I)
 
-    if not nu:
+
+STREAM_BYTES = 64 << 20     # stick blocks larger than this are streamed into bins
+STREAM_WIDTH = 1.0          # cm⁻¹ bin width of streamed spectra
+MAX_DRAWN = 8000            # sticks drawn one by one; above this, max per pixel
+
+
+class BinnedSticks:
+    """
+    Sticks summed into fixed `width` bins while streaming.  Memory grows
+    with the energy span, not the number of sticks; no stick is dropped
+    (the bins sum to `total`) and `imax` is the tallest single stick.
+    """
+
+    def __init__(self, width=STREAM_WIDTH):
+        self.width = width
+        self.first = None                   # bin index of sums[0]
+        self.sums = np.zeros(0)
+        self.maxes = np.zeros(0)            # tallest stick per bin
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.total = 0.0
+        self.imax = -np.inf
+        self.n = 0
+
+    def add(self, nu, I):
+        if not nu.size:
+            return
+        idx = np.floor(nu / self.width).astype(np.int64)
+        lo, hi = int(idx.min()), int(idx.max())
+        if self.first is None:
+            self.first = lo
+        left = max(self.first - lo, 0)
+        right = max(hi + 1 - (self.first + self.sums.size), 0)
+        if left or right:
+            self.sums = np.pad(self.sums, (left, right))
+            self.maxes = np.pad(self.maxes, (left, right), constant_values=-np.inf)
+            self.counts = np.pad(self.counts, (left, right))
+            self.first -= left
+        rel = idx - self.first
+        self.sums += np.bincount(rel, weights=I, minlength=self.sums.size)
+        self.counts += np.bincount(rel, minlength=self.sums.size)
+        np.maximum.at(self.maxes, rel, I)
+        self.total += I.sum()
+        self.imax = max(self.imax, I.max())
+        self.n += I.size
+
+    def arrays(self):
+        """(bin centres, summed intensity, tallest stick) of the occupied bins."""
+        used = self.counts > 0
+        centres = (self.first + np.nonzero(used)[0] + 0.5) * self.width
+        return centres, self.sums[used], self.maxes[used]
+
+
+def stream_sticks(logfile, width=STREAM_WIDTH, chunk_bytes=8 << 20):
+    """BinnedSticks of the 'Final Spectrum' block, read in `chunk_bytes` pieces."""
+    binned = BinnedSticks(width)
+    with open(logfile, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        at = _find_last(f, _MARKER, size)
+        if at < 0:
+            raise ValueError(f"No 'Final Spectrum' in {logfile!r}")
+        f.seek(at)
+        head = f.read(1 << 16)
+        m = _STICK_RUN.search(head)
+        if not m:
+            raise ValueError(f"No stick data parsed from {logfile!r}")
+        f.seek(at + m.start())
+        rest = b""
+        while True:
+            data = f.read(chunk_bytes)
+            buf = rest + data
+            cut = len(buf) if not data else buf.rfind(b"\n") + 1
+            body, rest = buf[:cut], buf[cut:]
+            run = _STICK_RUN.match(body)
+            run = run.group(0) if run else b""
+            if run.strip():
+                binned.add(*_stick_arrays(run, logfile))
+            if len(run) < len(body) or not data:
+                break
+    if not binned.n:
         raise ValueError(f"No stick data parsed from {logfile!r}")
+    return binned
+
 
-    nu = np.array(nu)
-    I  = np.array(I)
-    if normalize and I.max() > 0:
-        I = I / I.max()
-    return nu, I
+def _cache_path(logfile):
+    return os.path.splitext(logfile)[0] + ".sticks.npz"
+
+
+def load_sticks(logfile, cache=False):
+    """
+    (ν_cm, I, heights) of the 'Final Spectrum' block of a .log; raises
+    ValueError when there is none, so a successful call also validates
+    the log.  The marker is found by reading backwards from the end and
+    only the block after it is parsed.  Stick blocks over STREAM_BYTES
+    are streamed into STREAM_WIDTH bins (ν: bin centres, I: summed
+    intensity, heights: tallest stick per bin); otherwise heights is I.
+    An up-to-date <base>.sticks.npz next to the log (same mtime and size)
+    is used instead of parsing; only with `cache` is it written, so plain
+    reads leave the log's directory untouched.
+    """
+    st = os.stat(logfile)
+    key = np.array([st.st_mtime_ns, st.st_size])
+    cpath = _cache_path(logfile)
+    try:
+        with np.load(cpath) as z:
+            if np.array_equal(z["key"], key):
+                return z["nu"], z["I"], z["heights"] if "heights" in z else z["I"]
+    except (OSError, KeyError, ValueError):
+        pass
+    with open(logfile, "rb") as f:
+        at = _find_last(f, _MARKER, st.st_size)
+        if at < 0:
+            raise ValueError(f"No 'Final Spectrum' in {logfile!r}")
+        if st.st_size - at > STREAM_BYTES:
+            block = None
+        else:
+            f.seek(at)
+            block = f.read()
+    if block is None:
+        nu, I, heights = stream_sticks(logfile).arrays()
+        extra = {"heights": heights}
+    else:
+        m = _STICK_RUN.search(block)
+        if not m:
+            raise ValueError(f"No stick data parsed from {logfile!r}")
+        nu, I = _stick_arrays(m.group(0), logfile)
+        heights, extra = I, {}
+    if cache:
+        try:
+            tmp = cpath + ".tmp.npz"
+            np.savez(tmp, key=key, nu=nu, I=I, **extra)
+            os.replace(tmp, cpath)
+        except OSError:
+            pass
+    return nu, I, heights
+
+
+def read_sticks(logfile, cache=False):
+    """Raw (ν_cm, I) sticks of a .log (binned for huge blocks, see load_sticks())."""
+    return load_sticks(logfile, cache)[:2]
+
+
+def spectrum_sticks(logfile, shift=0.0, normalize=False, cache=False):
+    """(ν, I, heights) with the shift applied and, if asked, scaled so the tallest stick is 1."""
+    nu, I, heights = load_sticks(logfile, cache)
+    nu = nu + shift
+    top = heights.max()
+    if normalize and top > 0:
+        I, heights = I / top, heights / top
+    return nu, I, heights
+
+
+def parse_spectrum(logfile, shift=0.0, normalize=False):
+    """
+    Extract (ν_cm, I) arrays from the 'Final Spectrum' block of a .log
+    (an up-to-date load_sticks() cache is used, none is written).
+    Applies an energy shift and optional normalization.
+    """
+    return spectrum_sticks(logfile, shift, normalize)[:2]
+
+
+def decimate_sticks(x, y, pixels=MAX_DRAWN):
+    """
+    At most `pixels` sticks for drawing: the tallest one in each of
+    `pixels` equal slices of the x range (unchanged when already fewer).
+    """
+    if x.size <= pixels:
+        return x, y
+    lo, hi = x.min(), x.max()
+    idx = np.minimum(((x - lo) / (hi - lo) * pixels).astype(np.int64), pixels - 1)
+    best = np.full(pixels, -np.inf)
+    np.maximum.at(best, idx, y)
+    used = np.isfinite(best)
+    centres = lo + (np.arange(pixels) + 0.5) * (hi - lo) / pixels
+    return centres[used], best[used]
+
+
+def valid_fc_logs(paths, cache=False):
+    """(valid, bad): logs with a parsable Final Spectrum (parsed, and with `cache` cached, on the way) and the rest."""
+    valid, bad = [], []
+    for f in paths:
+        try:
+            load_sticks(f, cache)
+            valid.append(f)
+        except (OSError, ValueError):
+            bad.append(f)
+    return valid, bad
 
 def parse_exp_data(path, input_unit='ev', normalize=False, mode='1'):
     """
@@ -122,13 +337,13 @@ def parse_exp_data(path, input_unit='ev', normalize=False, mode='1'):
 
 def plot_log_spectra(logs, broad, normalize, shift, axis,
                      overlay_sticks, csv_out, png_out,
-                     auto_xlim=False, xlim=None):
+                     auto_xlim=False, xlim=None, lineshape='gaussian', lorentz_fwhm=None):
     all_x, all_y = [], []
     plt.figure()
     xlabel = None
 
     for log in logs:
-        nu, I = parse_spectrum(log, shift, normalize)
+        nu, I, H = spectrum_sticks(log, shift, normalize)
         base = os.path.splitext(os.path.basename(log))[0]
 
         # export CSV?
@@ -142,23 +357,22 @@ def plot_log_spectra(logs, broad, normalize, shift, axis,
             print(f"🔖 Wrote CSV: {fn}")
 
         if broad is not None:
-            grid = np.linspace(nu.min(), nu.max(), 2000)
-            sigma = broad / (2*np.sqrt(2*np.log(2)))
-            prof  = sum(i*np.exp(-0.5*((grid - x)/sigma)**2)
-                        for x,i in zip(nu, I))
+            grid, prof = broadened_profile(nu, I, broad, lineshape, lorentz_fwhm)
             xplt, xlabel = convert_axis(grid, axis)
             plt.plot(xplt, prof, label=base)
             all_x.append(xplt); all_y.append(prof)
 
             if overlay_sticks:
                 sx, _ = convert_axis(nu, axis)
-                plt.vlines(sx, 0, I, linestyles='dashed')
-                all_x.append(sx); all_y.append(I)
+                sx, sy = decimate_sticks(sx, H)
+                plt.vlines(sx, 0, sy, linestyles='dashed')
+                all_x.append(sx); all_y.append(sy)
 
         else:
             sx, xlabel = convert_axis(nu, axis)
+            sx, sy = decimate_sticks(sx, H)
             idx = np.argsort(sx)
-            yv = I[idx]
+            yv = sy[idx]
             plt.vlines(sx[idx], 0, yv, linestyles='solid')
             all_x.append(sx[idx]); all_y.append(yv)
 
@@ -258,7 +472,7 @@ def plot_exp_spectra(exps, input_unit, axis,
 
 def plot_combined(logs, exps, broad, normalize_log, shift, axis,
                   overlay_sticks, normalize_exp, mode, csv_out, png_out,
-                  auto_xlim=False, xlim=None):
+                  auto_xlim=False, xlim=None, lineshape='gaussian', lorentz_fwhm=None):
     colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
     all_x = np.empty(0); all_y = np.empty(0)
     plt.figure()
@@ -266,26 +480,25 @@ def plot_combined(logs, exps, broad, normalize_log, shift, axis,
 
     # logs first
     for i, log in enumerate(logs):
-        nu, I = parse_spectrum(log, shift, normalize_log)
+        nu, I, H = spectrum_sticks(log, shift, normalize_log)
         base = os.path.splitext(os.path.basename(log))[0]
         c = colors[i % len(colors)]
 
         if broad is not None:
-            grid = np.linspace(nu.min(), nu.max(), 2000)
-            sigma = broad / (2*np.sqrt(2*np.log(2)))
-            prof  = sum(i_val*np.exp(-0.5*((grid - nu_val)/sigma)**2)
-                        for nu_val,i_val in zip(nu,I))
+            grid, prof = broadened_profile(nu, I, broad, lineshape, lorentz_fwhm)
             xplt, _ = convert_axis(grid, axis)
             plt.plot(xplt, prof, color=c, label=base)
             all_x = np.concatenate((all_x, xplt))
             all_y = np.concatenate((all_y, prof))
             if overlay_sticks:
                 sx,_ = convert_axis(nu, axis)
-                plt.vlines(sx, 0, I, color=c, alpha=0.6)
+                sx, sy = decimate_sticks(sx, H)
+                plt.vlines(sx, 0, sy, color=c, alpha=0.6)
         else:
             sx,_ = convert_axis(nu, axis)
+            sx, sy = decimate_sticks(sx, H)
             idx = np.argsort(sx)
-            xv, yv = sx[idx], I[idx]
+            xv, yv = sx[idx], sy[idx]
             plt.vlines(xv, 0, yv, color=c)
             all_x = np.concatenate((all_x, xv))
             all_y = np.concatenate((all_y, yv))
@@ -377,19 +590,15 @@ def main():
         raw = prompt("Log files (comma-sep): ",
                      completer=PathCompleter(file_filter=lambda f:f.endswith('.log'))).strip()
         logs = [s.strip() for s in raw.split(',') if s.strip()]
-        # filter invalid
-        valid, bad = [], []
-        for f in logs:
-            if not os.path.exists(f) or "Final Spectrum" not in open(f, errors='ignore').read():
-                bad.append(f)
-            else:
-                valid.append(f)
+        # filter invalid (parses and caches the sticks of the valid ones)
+        valid, bad = valid_fc_logs(logs, cache=True)
         if bad:
             print(f"⚠️ Skipping {len(bad)} bad logs: {', '.join(bad)}")
         if not valid:
             print("❌ No valid FC logs."); return
         bf    = prompt("Broadening FWHM (cm⁻¹) [ENTER=stick only]: ").strip()
         broad = float(bf) if bf else None
+        shape, lfwhm = _prompt_lineshape() if broad is not None else ('gaussian', None)
         norm  = prompt("Normalize? (y/n) [default=y]: ").strip().lower()!='n'
         shift = float(prompt("Shift (cm⁻¹) [default=0]: ").strip() or "0")
         ov    = broad is not None and prompt("Overlay sticks? (y/n) [default=y]: ").strip().lower()!='n'
@@ -406,7 +615,7 @@ def main():
             except:
                 print("⚠️ Invalid limits, ignoring.")
         plot_log_spectra(valid, broad, norm, shift, axis, ov, csv_o, out,
-                         auto_xlim=auto_xlim, xlim=xlim)
+                         auto_xlim=auto_xlim, xlim=xlim, lineshape=shape, lorentz_fwhm=lfwhm)
 
     elif mode == '2':
         raw = prompt("CSV files (comma-sep): ",
@@ -445,12 +654,7 @@ def main():
         raw = prompt("Log files (comma-sep): ",
                      completer=PathCompleter(file_filter=lambda f:f.endswith('.log'))).strip()
         logs = [s.strip() for s in raw.split(',') if s.strip()]
-        valid_logs, bad = [], []
-        for f in logs:
-            if not os.path.exists(f) or "Final Spectrum" not in open(f, errors='ignore').read():
-                bad.append(f)
-            else:
-                valid_logs.append(f)
+        valid_logs, bad = valid_fc_logs(logs, cache=True)
         if bad:
             print(f"⚠️ Skipping bad logs: {', '.join(bad)}")
         if not valid_logs:
@@ -472,6 +676,7 @@ def main():
 
         bf       = prompt("Broadening FWHM (cm⁻¹) [ENTER=stick only]: ").strip()
         broad    = float(bf) if bf else None
+        shape, lfwhm = _prompt_lineshape() if broad is not None else ('gaussian', None)
         norm_log = prompt("Normalize logs? (y/n) [default=y]: ").strip().lower()!='n'
         shift    = float(prompt("Shift (cm⁻¹) [default=0]: ").strip() or "0")
         ov       = broad is not None and prompt("Overlay sticks? (y/n) [default=y]: ").strip().lower()!='n'
@@ -497,7 +702,7 @@ def main():
 
         plot_combined(valid_logs, valid_exps, broad, norm_log, shift, axis,
                       ov, norm_exp, modec, csv_o, out,
-                      auto_xlim=auto_xlim, xlim=xlim)
+                      auto_xlim=auto_xlim, xlim=xlim, lineshape=shape, lorentz_fwhm=lfwhm)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,226 @@
+# gausskit/vibronic_batch.py
+"""
+Non-interactive vibronic spectra for whole campaigns.
+
+    gausskit vibronic batch "runs/**/*_fc.log" [--fwhm 300 [--shape voigt]]
+                            [--axis ev] [--shift 0] [--no-normalize]
+                            [--xlim MIN,MAX] [--out DIR] [--npz FILE]
+                            [--no-png] [--jobs N] [--force]
+
+Each Franck–Condon log is handled by one worker of a process pool: parse
+the 'Final Spectrum' sticks, broaden them (gausskit.lineshape), write
+<base>_spectrum.csv (sticks, as Mode 7 does) and <base>_broadened_<axis>.csv,
+and render <base>.png with the Agg backend (with --out, under DIR in the
+same subdirectories as the logs, so a/x.log and b/x.log do not collide).
+The parent collects every spectrum into one compressed NPZ (names — the
+log paths relative to their common directory —, nu_i/I_i sticks in cm⁻¹,
+x_i / profile_i on the plot axis, and the settings used).
+
+A log whose CSV/PNG outputs are newer than it is not rendered again (its
+sticks come from the <base>.sticks.npz cache for the NPZ); use --force
+after changing the options.
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .vibronic import broadened_profile, convert_axis, decimate_sticks, spectrum_sticks
+
+
+def find_fc_logs(patterns):
+    """Logs matching the glob patterns (directories: every .log inside), in order, without duplicates."""
+    seen, out = set(), []
+    for pat in patterns:
+        paths = [os.path.join(pat, f) for f in sorted(os.listdir(pat)) if f.endswith(".log")] \
+            if os.path.isdir(pat) else sorted(glob.glob(pat, recursive=True))
+        for p in paths:
+            if p not in seen:
+                seen.add(p)
+                out.append(p)
+    return out
+
+
+def _outputs(log, opts):
+    base = os.path.splitext(os.path.basename(log))[0]
+    d = os.path.dirname(log) or "."
+    if opts["out"]:
+        # mirror the log's directory below the common root: a/x.log and b/x.log stay apart
+        d = os.path.normpath(os.path.join(opts["out"], os.path.relpath(os.path.abspath(d), opts["root"])))
+    out = {"sticks": os.path.join(d, f"{base}_spectrum.csv")}
+    if opts["fwhm"] is not None:
+        out["broadened"] = os.path.join(d, f"{base}_broadened_{opts['axis']}.csv")
+    if opts["png"]:
+        out["png"] = os.path.join(d, f"{base}.png")
+    return base, out
+
+
+def _up_to_date(log, outputs):
+    try:
+        t = os.path.getmtime(log)
+        return all(os.path.getmtime(p) >= t for p in outputs.values())
+    except OSError:
+        return False
+
+
+def _write_sticks(path, nu, I):
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["Energy_cm^-1", "Intensity"])
+        for x, i in zip(nu, I):
+            w.writerow([f"{x:.6f}", f"{i:.6e}"])
+
+
+def _xlim(x, y, broadened):
+    thr = y.max() * (0.001 if broadened else 0.0)
+    mask = y > thr
+    if not mask.any():
+        return None
+    mn, mx = x[mask].min(), x[mask].max()
+    pad = 0.05 * (mx - mn)
+    return mn - pad, mx + pad
+
+
+def render_png(path, title, nu, H, x, prof, opts):
+    """One spectrum → PNG with the Agg canvas (no pyplot state, safe in any worker)."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    sx, xlabel = convert_axis(nu, opts["axis"])
+    sx, H = decimate_sticks(sx, H)
+    if prof is not None:
+        ax.plot(x, prof, label=title)
+        if opts["sticks"]:
+            ax.vlines(sx, 0, H, linestyles="dashed")
+        lim = _xlim(x, prof, True)
+    else:
+        ax.vlines(sx, 0, H, linestyles="solid", label=title)
+        lim = _xlim(sx, H, False)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("Intensity (arb.)")
+    ax.legend()
+    if opts["xlim"] is not None:
+        ax.set_xlim(opts["xlim"])
+    elif lim is not None:
+        ax.set_xlim(lim)
+    fig.tight_layout()
+    fig.savefig(path, dpi=opts["dpi"])
+
+
+def process_log(log, opts):
+    """Worker: parse/broaden/write/render one log. Returns a result dict (arrays included)."""
+    base, outputs = _outputs(log, opts)
+    name = os.path.splitext(os.path.relpath(os.path.abspath(log), opts["root"]))[0]
+    res = {"log": log, "name": name, "status": "rendered", "error": None}
+    try:
+        os.makedirs(os.path.dirname(outputs["sticks"]), exist_ok=True)
+        fresh = not opts["force"] and _up_to_date(log, outputs)
+        nu, I, H = spectrum_sticks(log, opts["shift"], opts["normalize"], cache=True)
+        if fresh:
+            res["status"] = "up to date"
+        else:
+            _write_sticks(outputs["sticks"], nu, I)
+        x = prof = None
+        if opts["fwhm"] is not None:
+            grid, prof = broadened_profile(nu, I, opts["fwhm"], opts["shape"], opts["lorentz_fwhm"],
+                                           opts["points"])
+            x, xlabel = convert_axis(grid, opts["axis"])
+            if not fresh:
+                np.savetxt(outputs["broadened"], np.column_stack([x, prof]), delimiter=",",
+                           header=f"{xlabel},Intensity", comments="", fmt=["%.6f", "%.6e"])
+        if not fresh and opts["png"]:
+            render_png(outputs["png"], base, nu, H, x, prof, opts)
+    except (OSError, ValueError) as e:
+        res.update(status="failed", error=str(e))
+        return res
+    res.update(nu=nu, I=I, x=x, profile=prof)
+    return res
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def run_batch(logs, opts, jobs=None):
+    """process_log() for every log on a process pool; results in input order."""
+    if not logs:
+        return []
+    # outputs and NPZ names are relative to the logs' common directory
+    opts = dict(opts, root=os.path.commonpath([os.path.dirname(os.path.abspath(l)) for l in logs]))
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 4, initializer=_init_worker) as ex:
+        return list(ex.map(process_log, logs, [opts] * len(logs), chunksize=max(1, len(logs) // 64)))
+
+
+def write_npz(path, results, opts):
+    """All successful spectra in one compressed NPZ."""
+    ok = [r for r in results if r["status"] != "failed"]
+    arrays = {"names": np.array([r["name"] for r in ok]), "logs": np.array([r["log"] for r in ok]),
+              "settings": np.array(json.dumps({k: v for k, v in opts.items() if k not in ("out", "root")}))}
+    for i, r in enumerate(ok):
+        arrays[f"nu_{i}"], arrays[f"I_{i}"] = r["nu"], r["I"]
+        if r["profile"] is not None:
+            arrays[f"x_{i}"], arrays[f"profile_{i}"] = r["x"], r["profile"]
+    np.savez_compressed(path, **arrays)
+
+
+def batch_cli(argv=None):
+    ap = argparse.ArgumentParser(prog="gausskit vibronic batch",
+                                 description="Render vibronic spectra of many FC logs in parallel.")
+    ap.add_argument("logs", nargs="+", help="FC logs: files, directories or glob patterns (quote them)")
+    ap.add_argument("--fwhm", type=float, default=None, help="broadening FWHM in cm⁻¹ [sticks only]")
+    ap.add_argument("--shape", choices=["gaussian", "lorentzian", "voigt"], default="gaussian")
+    ap.add_argument("--lorentz-fwhm", type=float, default=None, help="Lorentzian FWHM of a Voigt [= --fwhm]")
+    ap.add_argument("--points", type=int, default=2000, help="grid points of the broadened profile [2000]")
+    ap.add_argument("--axis", choices=["cm", "nm", "ev"], default="ev", help="x axis of plots [ev]")
+    ap.add_argument("--shift", type=float, default=0.0, help="energy shift in cm⁻¹ [0]")
+    ap.add_argument("--no-normalize", action="store_true", help="keep raw intensities")
+    ap.add_argument("--no-sticks", action="store_true", help="do not overlay sticks on broadened plots")
+    ap.add_argument("--xlim", help="x limits MIN,MAX on the plot axis [auto-trim]")
+    ap.add_argument("--dpi", type=int, default=300)
+    ap.add_argument("--no-png", action="store_true", help="only write CSV/NPZ")
+    ap.add_argument("--out", help="output directory, mirroring the logs' subdirectories [next to each log]")
+    ap.add_argument("--npz", default="vibronic_spectra.npz", help="combined NPZ [vibronic_spectra.npz]")
+    ap.add_argument("--jobs", type=int, default=None, help="worker processes [CPU count]")
+    ap.add_argument("--force", action="store_true", help="redo logs whose outputs are up to date")
+    args = ap.parse_args(argv)
+
+    xlim = None
+    if args.xlim:
+        try:
+            lo, hi = args.xlim.split(",", 1)
+            xlim = (float(lo), float(hi))
+        except ValueError:
+            ap.error("--xlim must be MIN,MAX")
+    opts = {"fwhm": args.fwhm, "shape": args.shape, "lorentz_fwhm": args.lorentz_fwhm,
+            "points": args.points, "axis": args.axis, "shift": args.shift,
+            "normalize": not args.no_normalize, "sticks": not args.no_sticks, "xlim": xlim,
+            "dpi": args.dpi, "png": not args.no_png, "out": args.out, "force": args.force}
+
+    logs = find_fc_logs(args.logs)
+    if not logs:
+        print("❌ No logs matched.")
+        return 1
+    t0 = time.time()
+    results = run_batch(logs, opts, args.jobs)
+    for r in results:
+        if r["status"] == "failed":
+            print(f"❌ {r['log']}: {r['error']}")
+    write_npz(args.npz, results, opts)
+    count = {s: sum(1 for r in results if r["status"] == s) for s in ("rendered", "up to date", "failed")}
+    print(f"✅ {count['rendered']} rendered, {count['up to date']} up to date, {count['failed']} failed "
+          f"in {time.time() - t0:.1f} s → {args.npz}")
+    return 1 if count["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(batch_cli())
@@ -0,0 +1,30 @@
+from gausskit.checkpoints import plan_checkpoints
+
+COM = """%chk={name}.chk
+#p b3lyp/6-31g(d) opt
+
+{name}
+
+0 1
+O 0.0 0.0 0.0
+
+"""
+
+
+def _job(d, name, tail):
+    (d / f"{name}.com").write_text(COM.format(name=name))
+    (d / f"{name}.chk").write_bytes(b"\0" * 16)
+    (d / f"{name}.log").write_text(f" Entering Gaussian System\n {tail} termination\n")
+
+
+def test_failed_writer_keeps_its_checkpoint(tmp_path):
+    _job(tmp_path, "a", "Error")
+    info = plan_checkpoints([str(tmp_path)])[str(tmp_path / "a.chk")]
+    assert info.status == "needed"
+    assert "writer failed" in info.reason
+
+
+def test_finished_writer_without_readers_is_done(tmp_path):
+    _job(tmp_path, "b", "Normal")
+    info = plan_checkpoints([str(tmp_path)])[str(tmp_path / "b.chk")]
+    assert (info.status, info.reason) == ("done", "no readers")
@@ -0,0 +1,62 @@
+import pytest
+
+from gausskit.comfile import Route
+from gausskit.error_fixer import fix_ladder, fix_route_lines, load_error_db
+
+ROUTES = [
+    "#p b3lyp/6-31g(d) opt SCF=QC int=ultrafine",
+    "#p b3lyp/6-31g(d) opt scf=(xqc,maxcycle=64) int=(grid=ultrafine)",
+    "#p b3lyp/6-31g(d) opt scf=yqc int=ultrafinegrid",
+]
+
+
+def _rungs(link, name):
+    return [pytest.param(fix, id=f"{link}-rung{i}")
+            for i, fix in enumerate(fix_ladder(load_error_db()[link][name]))]
+
+
+LADDERS = _rungs("L502", "Convergence failure --run terminated") + _rungs("L508", "Convergence failure")
+
+
+# options Gaussian will not take together (any spelling)
+GROUPS = {
+    "scf": {"qc", "xqc", "yqc"},
+    "int": {"ultrafine", "ultrafinegrid", "superfine", "superfinegrid", "fine", "finegrid", "grid"},
+}
+
+
+def _conflicts(route):
+    out = []
+    for key, group in GROUPS.items():
+        kw = route.get(key)
+        found = [o.name.lower() for o in (kw.options if kw else []) if o.name.lower() in group]
+        if len(found) > 1:
+            out.append((key, found))
+    return out
+
+
+def test_scf_algorithms_are_exclusive():
+    r = Route.parse("#p b3lyp/6-31g(d) SCF=QC")
+    r.add("scf=xqc")
+    assert str(r) == "#p b3lyp/6-31g(d) SCF=xqc"
+
+
+def test_integration_grids_are_exclusive():
+    r = Route.parse("#p b3lyp/6-31g(d) int=ultrafine")
+    r.add("int=(grid=superfine)")
+    assert [o.key for o in r.get("int").options] == ["grid"]
+
+
+def test_grid_aliases_are_removed():
+    r = Route.parse("#p b3lyp/6-31g(d) int=ultrafine")
+    r.remove("int=ultrafinegrid")
+    assert r.get("int").options == []
+
+
+@pytest.mark.parametrize("fix", LADDERS)
+@pytest.mark.parametrize("route", ROUTES)
+def test_ladder_rung_leaves_no_conflicting_options(route, fix):
+    lines, found = fix_route_lines([route, "", "t", "", "0 1", "H 0 0 0", "H 0 0 0.74", ""], fix,
+                                   log=lambda msg: None)
+    assert found
+    assert _conflicts(Route.parse(lines[0])) == []
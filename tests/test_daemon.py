@@ -0,0 +1,49 @@
+from gausskit import fixdb
+from gausskit.daemon import SchedulerDaemon
+
+COM = """%chk={name}.chk
+{oldchk}#p b3lyp/6-31g(d) sp
+
+{name}
+
+0 1
+O 0.0 0.0 0.0
+
+"""
+
+
+class CancellingBackend:
+    """Every job is CANCELLED before it writes a log."""
+
+    name = "stub"
+
+    def __init__(self):
+        self.ids = []
+
+    def submit(self, com, **kw):
+        self.ids.append(str(1000 + len(self.ids)))
+        return self.ids[-1]
+
+    def bulk_status(self, jobids):
+        return {j: "CANCELLED" for j in jobids}
+
+    def count_jobs(self, partition=None):
+        return 0
+
+
+def test_cancelled_job_fails_and_skips_children(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(fixdb, "_default", False)
+    for name in ("gs", "es"):
+        (tmp_path / f"{name}.com").write_text(COM.format(name=name, oldchk=""))
+        (tmp_path / f"{name}.chk").write_bytes(b"\0")
+    (tmp_path / "fc.com").write_text(COM.format(name="fc", oldchk="%oldchk=gs.chk\n"))
+    daemon = SchedulerDaemon(poll_interval=0, journal=str(tmp_path / "journal.jsonl"))
+    daemon.backends[("Hgbatch", "gdvj30+", None)] = CancellingBackend()
+    reply = daemon.add_workflow(str(tmp_path), "chain", ["gs", "es", "fc"], {})
+    assert reply["ok"], reply
+    for _ in range(2):      # submit, then one poll settles the whole chain
+        daemon.step()
+    states = {b: daemon.jobs[(reply["workflow"], b)]["state"] for b in ("gs", "es", "fc")}
+    assert states == {"gs": "failed", "es": "failed", "fc": "skipped"}
+    assert not daemon._live(reply["workflow"])
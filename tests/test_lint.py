@@ -0,0 +1,54 @@
+from gausskit.lint import lint_input
+
+WATER_INT = """%chk=w.chk
+#p hf/sto-3g opt
+
+water
+
+0 1
+O 0 0 0
+H 0 0 1
+H 0 1 0
+
+"""
+
+BORON_OXIDE = """#p hf/sto-3g sp
+
+BO
+
+0 2
+B 0 0 0
+O 0 0 1
+
+"""
+
+STRAY = """#p hf/sto-3g opt
+
+water
+
+0 1
+O 0.0 0.0 0.0
+H 0.0 0.0 1.0
+H 0.0 1.0 0.0
+B 1 2 F
+
+"""
+
+
+def _errors(tmp_path, text):
+    com = tmp_path / "job.com"
+    com.write_text(text)
+    return [i for i in lint_input(str(com)) if i.level == "error"]
+
+
+def test_integer_cartesians_are_atoms(tmp_path):
+    assert _errors(tmp_path, WATER_INT) == []
+
+
+def test_boron_and_oxygen_atoms_are_not_modredundant(tmp_path):
+    assert _errors(tmp_path, BORON_OXIDE) == []
+
+
+def test_modredundant_line_in_molecule_block(tmp_path):
+    errors = _errors(tmp_path, STRAY)
+    assert [i.line for i in errors] == [9]
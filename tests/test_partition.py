@@ -0,0 +1,40 @@
+import pytest
+
+from gausskit.partition import SlurmPartitionMonitor, parse_costs, rank_partitions
+
+SINFO = """\
+a|up|1-00:00:00|1|mix|100/28/0/128
+a|up|1-00:00:00|1|mix|64/64/0/128
+a|up|1-00:00:00|1|alloc|128/0/0/128
+b*|up|1-00:00:00|1|idle|0/128/0/128
+b|up|1-00:00:00|1|mix|120/8/0/128
+"""
+
+
+def _monitor(job_cpus, costs=None):
+    mon = SlurmPartitionMonitor(job_cpus=job_cpus, costs=costs)
+    mon._run = lambda cmd: SINFO if cmd[0] == "sinfo" else ""
+    mon.queue.jobs = lambda: []
+    return mon
+
+
+def test_mixed_nodes_count_by_free_cpus():
+    states = _monitor(56).snapshot()
+    assert (states["a"].idle_nodes, states["a"].total_nodes) == (1, 3)
+    assert (states["b"].idle_nodes, states["b"].total_nodes) == (1, 2)
+
+
+def test_mixed_nodes_too_full_for_the_job():
+    states = _monitor(96).snapshot()
+    assert states["a"].idle_nodes == 0
+
+
+def test_cheapest_uses_costs():
+    states = _monitor(8, costs=parse_costs("a=1,b=2.5")).snapshot()
+    assert rank_partitions("cheapest", states, {}) == ["a", "b"]
+
+
+def test_parse_costs_rejects_bad_entries():
+    assert parse_costs(" short=1, medium=2.5 ,") == {"short": 1.0, "medium": 2.5}
+    with pytest.raises(ValueError):
+        parse_costs("short")
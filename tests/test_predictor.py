@@ -0,0 +1,50 @@
+from gausskit.predictor import ResourcePredictor, parse_log_record
+
+LOG = """ Entering Gaussian System, Link 0=g16
+ Input=water.com
+ Output=water.log
+ Initial command:
+ /opt/g16/l1.exe "/scratch/Gau-12345.inp" -scrdir="/scratch/"
+ Entering Link 1 = /opt/g16/l1.exe PID=     12345.
+
+ Copyright (c) 1988-2019, Gaussian, Inc.  All Rights Reserved.
+
+ ******************************************
+ Gaussian 16:  ES64L-G16RevC.01  3-Jul-2019
+                 1-Jan-2024
+ ******************************************
+ %nprocshared=8
+ Will use up to    8 processors via shared memory.
+ %mem=16GB
+ %chk=water.chk
+ ----------------------
+ #p b3lyp/6-31g(d) opt
+ ----------------------
+ 1/18=20,19=15,38=1/1,3;
+ Symbolic Z-matrix:
+ Charge =  0 Multiplicity = 1
+ NAtoms=      3 NQM=        3 NQMF=       0 NMMI=      0 NMMIF=      0
+ Standard basis: 6-31G(d) (6D, 7F)
+    19 basis functions,    36 primitive gaussians,    19 cartesian basis functions
+ Job cpu time:       0 days  0 hours  4 minutes  0.0 seconds.
+ Elapsed time:       0 days  0 hours  0 minutes 40.0 seconds.
+ Normal termination of Gaussian 16 at Mon Jan  1 00:05:00 2024.
+"""
+
+
+def test_log_header(tmp_path):
+    log = tmp_path / "water.log"
+    log.write_text(LOG)
+    rec = parse_log_record(log)
+    assert rec["nproc"] == 8
+    assert (rec["natoms"], rec["nbasis"]) == (3, 19)
+    assert (rec["cpu"], rec["wall"]) == (240.0, 40.0)
+    assert rec["functional"] == "b3lyp" and "opt" in rec["job_types"]
+
+
+def test_alpha_fitted_from_speedup(tmp_path):
+    log = tmp_path / "water.log"
+    log.write_text(LOG)
+    model = ResourcePredictor().fit([parse_log_record(log)])
+    # speedup 6 on 8 cores: (8/6 - 1) / 7
+    assert abs(model.alpha - (8 / 6 - 1) / 7) < 1e-9
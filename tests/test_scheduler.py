@@ -0,0 +1,122 @@
+import pytest
+
+from gausskit import fixdb
+from gausskit.backends import SubmissionError
+from gausskit.scheduler import GaussianJobScheduler
+
+WATER_SP = """%chk=job.chk
+#p b3lyp/6-31g(d) sp
+
+water
+
+0 1
+O   0.000000   0.000000   0.117300
+H   0.000000   0.757160  -0.469200
+H   0.000000  -0.757160  -0.469200
+
+"""
+
+ZSYMB_LOG = """ Entering Gaussian System
+ End of file in ZSymb.
+ Error termination via Lnk1e in /g16/l101.exe at Mon Jan  1 00:00:00 2024.
+"""
+
+
+class StubBackend:
+    name = "stub"
+
+    def __init__(self, refuse=False, states=None):
+        self.refuse = refuse
+        self.states = states or {}
+        self.calls = []
+
+    def submit(self, com, **kw):
+        self.calls.append(com)
+        self.kwargs = kw
+        if self.refuse:
+            raise SubmissionError("sbatch: error: Batch job submission failed")
+        return "123"
+
+    def bulk_status(self, jobids):
+        return {j: self.states.get(j, "UNKNOWN") for j in jobids}
+
+
+@pytest.fixture
+def failed_job(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(fixdb, "_default", False)
+    (tmp_path / "job.com").write_text(WATER_SP)
+    (tmp_path / "job.log").write_text(ZSYMB_LOG)
+    return tmp_path
+
+
+def test_fix_refused_by_lint_leaves_input_and_log(failed_job):
+    backend = StubBackend()
+    sched = GaussianJobScheduler(None, None, None, backend=backend,
+                                 fix_failures=True, max_retries=2)
+    # the only fix adds geom=check, but job.chk does not exist
+    assert not sched._fix_and_resubmit("job")
+    assert backend.calls == []
+    assert sched.retries["job"] == 1
+    assert (failed_job / "job.com").read_text() == WATER_SP
+    assert (failed_job / "job.log").read_text() == ZSYMB_LOG
+    assert not list(failed_job.glob("job.log.fail*"))
+
+
+def test_fix_refused_by_queue_leaves_log(failed_job):
+    (failed_job / "job.chk").write_text("")
+    backend = StubBackend(refuse=True)
+    sched = GaussianJobScheduler(None, None, None, backend=backend,
+                                 fix_failures=True, max_retries=2)
+    assert not sched._fix_and_resubmit("job")
+    assert backend.calls == ["job.com"]
+    assert (failed_job / "job.com").read_text() == WATER_SP
+    assert (failed_job / "job.log").read_text() == ZSYMB_LOG
+
+
+def test_fix_resubmits(failed_job):
+    (failed_job / "job.chk").write_text("")
+    backend = StubBackend()
+    sched = GaussianJobScheduler(None, None, None, backend=backend,
+                                 fix_failures=True, max_retries=2)
+    assert sched._fix_and_resubmit("job")
+    assert "geom=check" in (failed_job / "job.com").read_text()
+    assert (failed_job / "job.log.fail1").read_text() == ZSYMB_LOG
+
+
+class StubPredictor:
+    def suggest(self, com, default_nproc=56, default_time="23:50:00"):
+        return {"nproc": 8, "time": "02:00:00", "mem_mb": 16456}
+
+
+def test_predicted_memory_is_requested_and_reused(failed_job):
+    (failed_job / "job.chk").write_text("")
+    backend = StubBackend()
+    sched = GaussianJobScheduler(None, None, None, backend=backend,
+                                 fix_failures=True, max_retries=2)
+    sched.predictor = StubPredictor()
+    assert sched.submit_job("job") == "123"
+    assert backend.kwargs["mem"] == 16456
+    assert sched.job_resources["job"] == (8, "02:00:00", 16456)
+    sched.predictor = None
+    assert sched._fix_and_resubmit("job")
+    assert (backend.kwargs["nproc"], backend.kwargs["mem"]) == (8, 16456)
+
+
+@pytest.mark.parametrize("state, log", [
+    ("CANCELLED", None),                                    # cancelled while pending
+    ("FAILED", " Entering Gaussian System\n SCF Done\n"),   # OOM kill mid-run
+])
+def test_jobs_ended_by_the_backend_fail(tmp_path, monkeypatch, state, log):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(fixdb, "_default", False)
+    (tmp_path / "job.com").write_text(WATER_SP)
+    if log:
+        (tmp_path / "job.log").write_text(log)
+    backend = StubBackend(states={"123": state})
+    sched = GaussianJobScheduler(None, None, None, backend=backend, poll_interval=0,
+                                 fix_failures=True)
+    sched.submit_job("job")
+    assert sched.wait_for("job", [("job", "Normal termination")]) == {"job": "failed"}
+    assert sched.killed == {"job": state}
+    assert sched._job_outcome("job") == "failed"
@@ -0,0 +1,37 @@
+from gausskit import fixdb
+from gausskit.triage import bulk_fix, triage
+
+WATER_SP = """%chk={name}.chk
+#p b3lyp/6-31g(d) sp
+
+water
+
+0 1
+O   0.000000   0.000000   0.117300
+H   0.000000   0.757160  -0.469200
+H   0.000000  -0.757160  -0.469200
+
+"""
+
+ZSYMB = " End of file in ZSymb.\n Error termination via Lnk1e in /g16/l101.exe.\n"
+
+
+def _campaign(d, monkeypatch):
+    monkeypatch.setattr(fixdb, "_default", False)
+    for name, tail in (("bad", ZSYMB), ("run", " SCF Done:  E(RB3LYP) =  -76.4\n"), ("good", ZSYMB)):
+        (d / f"{name}.com").write_text(WATER_SP.format(name=name))
+        (d / f"{name}.log").write_text(" Entering Gaussian System\n" + tail)
+    (d / "good.chk").write_bytes(b"\0")     # geom=check can read it
+    return {r.log.split("/")[-1]: r for r in triage([str(d)])}
+
+
+def test_fix_only_failed_logs_that_pass_lint(tmp_path, monkeypatch):
+    recs = _campaign(tmp_path, monkeypatch)
+    bulk_fix(list(recs.values()))
+    assert recs["run.log"].result == "not failed; left alone"
+    assert recs["bad.log"].result == "fix fails lint"
+    assert recs["good.log"].result == "fixed"
+    assert (tmp_path / "run.log").exists() and (tmp_path / "bad.log").exists()
+    assert (tmp_path / "bad.com").read_text() == WATER_SP.format(name="bad")
+    assert "geom=check" in (tmp_path / "good.com").read_text()
+    assert (tmp_path / "good.log.fail1").exists()